@@ -0,0 +1,506 @@
+import asyncio
+import itertools
+import json
+import logging
+import time
+from typing import Dict, List, Optional
+
+from config import (
+    HOST, PHILOSOPHERS, SOCKET_TIMEOUT, CONNECTION_RETRY, ASYNC_NODE_TIMEOUT,
+    MSG_TYPE_REQUEST, MSG_TYPE_HEARTBEAT, MSG_TYPE_HELLO, MSG_TYPE_HELLO_ACK,
+    PROTOCOL_VERSION, LEGACY_PROTOCOL_VERSION, MAX_FRAME_SIZE,
+    NODE_MAX_MESSAGE_SIZE, REQUEST_DEADLINE
+)
+from utils import parse_message, merge_timings
+from consensus import ConsensusSession
+from latency_tracker import LatencyTracker, jittered_backoff
+from tracing import tracer, trace_span, annotate, current_context
+from protocol import (
+    FRAME_HEADER, ProtocolError, LegacyNodeError, decode_payload, encode_frame
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    from profiling import profiler, ProfileResult, node_timings_from, node_phase_timings_from
+    PROFILING_ENABLED = True
+except ImportError:
+    PROFILING_ENABLED = False
+
+
+class AsyncNodeConnection:
+    """Connexion v2 multiplexée vers un nœud, basée sur les streams asyncio"""
+
+    def __init__(self, philosopher_id: int, host: str, port: int, timeout: float):
+        self.philosopher_id = philosopher_id
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.protocol_version = None
+        self.closed = False
+
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._reader_task = None
+
+    async def connect(self):
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+
+        try:
+            writer.write(encode_frame(0, {
+                "type": MSG_TYPE_HELLO,
+                "version": PROTOCOL_VERSION
+            }))
+            await writer.drain()
+
+            try:
+                _, ack = await asyncio.wait_for(self._read_frame(reader), self.timeout)
+            except asyncio.IncompleteReadError:
+                raise LegacyNodeError(
+                    f"Le nœud sur le port {self.port} a refusé la poignée de main v{PROTOCOL_VERSION}"
+                )
+
+            if ack.get("type") != MSG_TYPE_HELLO_ACK:
+                raise ProtocolError(f"Réponse de poignée de main inattendue: {ack.get('type')}")
+
+            self.protocol_version = ack.get("version", 1)
+            if self.protocol_version < PROTOCOL_VERSION:
+                raise LegacyNodeError(
+                    f"Le nœud sur le port {self.port} annonce la version {self.protocol_version}"
+                )
+        except BaseException:
+            writer.close()
+            raise
+
+        self.reader = reader
+        self.writer = writer
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    @property
+    def alive(self) -> bool:
+        return not self.closed and self.writer is not None
+
+    @staticmethod
+    async def _read_raw_frame(reader: asyncio.StreamReader):
+        header = await reader.readexactly(FRAME_HEADER.size)
+        length, request_id = FRAME_HEADER.unpack(header)
+        if length > MAX_FRAME_SIZE:
+            raise ProtocolError(f"Trame trop volumineuse: {length} octets")
+        return request_id, await reader.readexactly(length)
+
+    @classmethod
+    async def _read_frame(cls, reader: asyncio.StreamReader):
+        request_id, payload = await cls._read_raw_frame(reader)
+        return request_id, decode_payload(payload)
+
+    async def request(self, message: Dict, timeout: Optional[float] = None) -> Dict:
+        if not self.alive:
+            raise ConnectionError(f"Connexion vers le port {self.port} fermée")
+
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        try:
+            sent_at = time.perf_counter()
+            self.writer.write(encode_frame(request_id, message))
+            await self.writer.drain()
+            send_time = time.perf_counter() - sent_at
+            response, parse_time, resolved_at = await asyncio.wait_for(
+                future, timeout if timeout is not None else self.timeout
+            )
+            compute = response.get("timings", {}).get("compute", 0.0)
+            return merge_timings(
+                response,
+                send=send_time,
+                compute=compute,
+                receive=max(resolved_at - sent_at - send_time - parse_time - compute, 0.0),
+                parse=parse_time
+            )
+        except asyncio.TimeoutError:
+            raise
+        except OSError as e:
+            self._fail(ConnectionError(f"Échec d'envoi vers le port {self.port}: {e}"))
+            raise ConnectionError(str(e))
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_loop(self):
+        try:
+            while True:
+                request_id, payload = await self._read_raw_frame(self.reader)
+                parse_start = time.perf_counter()
+                message = decode_payload(payload)
+                resolved_at = time.perf_counter()
+                future = self._pending.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result((message, resolved_at - parse_start, resolved_at))
+        except asyncio.CancelledError:
+            self._fail(ConnectionError("Connexion fermée"))
+            raise
+        except Exception as e:
+            if not self.closed:
+                logger.debug(f"Lecteur asynchrone {self.port} arrêté: {e}")
+            self._fail(ConnectionError(f"Connexion perdue avec le port {self.port}: {e}"))
+
+    def _fail(self, error: Exception):
+        self.closed = True
+        pending = list(self._pending.values())
+        self._pending.clear()
+
+        for future in pending:
+            if not future.done():
+                future.set_exception(error)
+
+        writer, self.writer = self.writer, None
+        if writer is not None:
+            writer.close()
+
+    async def close(self):
+        task = self._reader_task
+        if task is not None and not task.done():
+            task.cancel()
+        self._fail(ConnectionError("Connexion fermée"))
+        if task is not None and task is not asyncio.current_task():
+            await asyncio.gather(task, return_exceptions=True)
+
+
+class AsyncSocketManager:
+
+    def __init__(
+        self,
+        active_nodes: Optional[Dict] = None,
+        latency: Optional[LatencyTracker] = None,
+        philosophers: Optional[Dict[int, Dict]] = None,
+        host: str = HOST
+    ):
+        self.philosophers = philosophers or PHILOSOPHERS
+        self.host = host
+        self.active_nodes = active_nodes if active_nodes is not None else {}
+        self.latency = latency or LatencyTracker(self.philosophers.keys())
+
+        self.connections: Dict[int, AsyncNodeConnection] = {}
+        self.protocol_versions: Dict[int, int] = {}
+        self._connect_locks = {
+            phil_id: asyncio.Lock() for phil_id in self.philosophers
+        }
+        logger.info("AsyncSocketManager initialisé")
+
+    async def _get_connection(self, philosopher_id: int) -> Optional[AsyncNodeConnection]:
+        if self.protocol_versions.get(philosopher_id) == LEGACY_PROTOCOL_VERSION:
+            return None
+
+        async with self._connect_locks[philosopher_id]:
+            conn = self.connections.get(philosopher_id)
+            if conn is not None and conn.alive:
+                return conn
+            if conn is not None:
+                # Connexion morte remplacée: son lecteur doit être arrêté avant d'être oublié
+                del self.connections[philosopher_id]
+                await conn.close()
+
+            port = self.philosophers[philosopher_id]["port"]
+            name = self.philosophers[philosopher_id]["name"]
+
+            conn = AsyncNodeConnection(philosopher_id, self.host, port, SOCKET_TIMEOUT)
+            try:
+                await conn.connect()
+            except LegacyNodeError as e:
+                logger.info(f"Nœud {name} détecté en protocole v{LEGACY_PROTOCOL_VERSION}: {e}")
+                self.protocol_versions[philosopher_id] = LEGACY_PROTOCOL_VERSION
+                return None
+
+            self.protocol_versions[philosopher_id] = conn.protocol_version
+            self.connections[philosopher_id] = conn
+            return conn
+
+    async def _drop_connection(
+        self,
+        philosopher_id: int,
+        forget_version: bool = False,
+        conn: Optional[AsyncNodeConnection] = None
+    ):
+        current = self.connections.get(philosopher_id)
+        closing = []
+        if current is not None and (conn is None or conn is current):
+            del self.connections[philosopher_id]
+            closing.append(current)
+        if conn is not None and conn is not current:
+            closing.append(conn)
+        if forget_version:
+            self.protocol_versions.pop(philosopher_id, None)
+        for dropped in closing:
+            await dropped.close()
+
+    async def _exchange(self, philosopher_id: int, message: Dict, timeout: float) -> Optional[Dict]:
+        connect_start = time.perf_counter()
+        conn = await self._get_connection(philosopher_id)
+        if conn is None:
+            return await self._legacy_exchange(philosopher_id, message, timeout)
+        connect_time = time.perf_counter() - connect_start
+
+        try:
+            response = await conn.request(message, timeout)
+        except (ConnectionError, ProtocolError):
+            await self._drop_connection(philosopher_id, conn=conn)
+            raise
+        return merge_timings(response, connect=connect_time)
+
+    async def _legacy_exchange(self, philosopher_id: int, message: Dict, timeout: float) -> Optional[Dict]:
+        port = self.philosophers[philosopher_id]["port"]
+
+        phases = {}
+
+        async def exchange() -> bytes:
+            start = time.perf_counter()
+            reader, writer = await asyncio.open_connection(self.host, port)
+            try:
+                connected = time.perf_counter()
+                writer.write(json.dumps(message).encode('utf-8'))
+                await writer.drain()
+                sent = time.perf_counter()
+
+                buffer = bytearray()
+                while len(buffer) <= NODE_MAX_MESSAGE_SIZE:
+                    chunk = await reader.read(65536)
+                    if not chunk:
+                        break
+                    buffer += chunk
+                phases.update(
+                    connect=connected - start,
+                    send=sent - connected,
+                    receive=time.perf_counter() - sent
+                )
+                return bytes(buffer)
+            finally:
+                writer.close()
+
+        data = await asyncio.wait_for(exchange(), timeout)
+        if not data:
+            return None
+        parse_start = time.perf_counter()
+        response = parse_message(data.decode('utf-8'))
+        if not isinstance(response, dict):
+            return response
+
+        compute = response.get("timings", {}).get("compute", 0.0)
+        phases["receive"] = max(phases["receive"] - compute, 0.0)
+        return merge_timings(response, parse=time.perf_counter() - parse_start, **phases)
+
+    async def check_node_availability(self, philosopher_id: int) -> bool:
+        if philosopher_id not in self.philosophers:
+            return False
+
+        name = self.philosophers[philosopher_id]["name"]
+        try:
+            response = await self._exchange(philosopher_id, {"type": MSG_TYPE_HEARTBEAT}, 1.0)
+            return bool(response)
+        except Exception as e:
+            logger.warning(f"Nœud {name} indisponible (async): {e}")
+            await self._drop_connection(philosopher_id, forget_version=True)
+            return False
+
+    async def send_request_to_node(
+        self,
+        philosopher_id: int,
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str]
+    ) -> Optional[Dict]:
+        with trace_span("node_request", node=philosopher_id):
+            return await self._send_request_to_node(
+                philosopher_id, context, keywords, category_name
+            )
+
+    async def _send_request_to_node(
+        self,
+        philosopher_id: int,
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str]
+    ) -> Optional[Dict]:
+        if philosopher_id not in self.philosophers:
+            logger.error(f"ID philosophe invalide: {philosopher_id}")
+            return None
+
+        port = self.philosophers[philosopher_id]["port"]
+        name = self.philosophers[philosopher_id]["name"]
+
+        request = {
+            "type": MSG_TYPE_REQUEST,
+            "context": context or "",
+            "keywords": keywords,
+            "category": category_name or ""
+        }
+        trace = current_context()
+        if trace:
+            request["trace"] = trace
+
+        loop = asyncio.get_running_loop()
+        call_start = loop.time()
+        deadline = call_start + REQUEST_DEADLINE
+
+        for attempt in range(CONNECTION_RETRY):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.warning(f"Échéance atteinte pour {name} avant la tentative {attempt + 1}")
+                break
+
+            timeout = min(self.latency.timeout_for(philosopher_id), remaining)
+            started = loop.time()
+            try:
+                response = await self._exchange(philosopher_id, request, timeout)
+
+                if not response:
+                    logger.warning(f"Réponse vide de {name}")
+                    continue
+
+                self.latency.record(philosopher_id, loop.time() - started)
+                merge_timings(response, total=loop.time() - call_start)
+                tracer.add_spans(response.pop("spans", None))
+                annotate(attempts=attempt + 1, vote=response.get("vote"))
+                logger.info(
+                    f"Réponse reçue de {name}: "
+                    f"vote={response.get('vote')}, score={response.get('score')}"
+                )
+                return response
+
+            except asyncio.TimeoutError:
+                self.latency.record_timeout(philosopher_id, loop.time() - started)
+                logger.warning(f"Timeout en attendant {name} (tentative {attempt + 1})")
+                if attempt < CONNECTION_RETRY - 1:
+                    await asyncio.sleep(jittered_backoff(attempt, deadline - loop.time()))
+
+            except ConnectionRefusedError:
+                logger.error(f"Connexion refusée par {name} sur le port {port}")
+                await self._drop_connection(philosopher_id, forget_version=True)
+                break
+
+            except (ConnectionError, ProtocolError) as e:
+                logger.warning(f"Connexion perdue avec {name} (tentative {attempt + 1}): {e}")
+                if attempt < CONNECTION_RETRY - 1:
+                    await asyncio.sleep(jittered_backoff(attempt, deadline - loop.time()))
+
+            except Exception as e:
+                logger.error(f"Erreur de communication avec {name}: {e}")
+                break
+
+        logger.error(f"Échec de réception de réponse de {name} après {CONNECTION_RETRY} tentatives")
+        return None
+
+    async def _send_with_deadline(
+        self,
+        philosopher_id: int,
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str],
+        node_timeout: float
+    ) -> Optional[Dict]:
+        try:
+            return await asyncio.wait_for(
+                self.send_request_to_node(philosopher_id, context, keywords, category_name),
+                node_timeout
+            )
+        except asyncio.TimeoutError:
+            name = self.philosophers[philosopher_id]["name"]
+            logger.warning(f"[ASYNC] Délai global dépassé pour {name}")
+            return None
+
+    async def broadcast_request_async(
+        self,
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str],
+        node_timeout: float = ASYNC_NODE_TIMEOUT,
+        session: Optional[ConsensusSession] = None
+    ) -> Dict[int, Optional[Dict]]:
+        node_ids = list(self.active_nodes.keys())
+        logger.info(f"[ASYNC] Diffusion de la requête à {len(node_ids)} nœuds actifs...")
+        start_time = time.time()
+
+        if session is None:
+            results = await asyncio.gather(*(
+                self._send_with_deadline(phil_id, context, keywords, category_name, node_timeout)
+                for phil_id in node_ids
+            ))
+            responses = dict(zip(node_ids, results))
+        else:
+            responses = await self._broadcast_until_final(
+                node_ids, context, keywords, category_name, node_timeout, session
+            )
+
+        elapsed = time.time() - start_time
+        successful = sum(1 for r in responses.values() if r is not None)
+
+        logger.info(
+            f"[ASYNC] Diffusion terminée: {successful}/{len(node_ids)} nœuds "
+            f"ont répondu en {elapsed:.3f}s"
+        )
+
+        if PROFILING_ENABLED:
+            try:
+                result = ProfileResult(
+                    method="async",
+                    start_time=start_time,
+                    end_time=time.time(),
+                    duration=elapsed,
+                    active_nodes=len(node_ids),
+                    successful_responses=successful,
+                    failed_responses=len(responses) - successful,
+                    node_timings=node_timings_from(responses),
+                    context=context or "",
+                    timestamp=time.time(),
+                    node_phase_timings=node_phase_timings_from(responses)
+                )
+                profiler.record_result(result)
+                logger.info(f"[PROFILING] Async result recorded: {elapsed:.3f}s")
+            except Exception as e:
+                logger.error(f"Error recording profiling result: {e}")
+
+        return responses
+
+    async def _broadcast_until_final(
+        self,
+        node_ids: List[int],
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str],
+        node_timeout: float,
+        session: ConsensusSession
+    ) -> Dict[int, Optional[Dict]]:
+        session.expect(node_ids)
+        tasks = {
+            asyncio.ensure_future(
+                self._send_with_deadline(phil_id, context, keywords, category_name, node_timeout)
+            ): phil_id
+            for phil_id in node_ids
+        }
+
+        responses = {}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                final = False
+                for task in done:
+                    phil_id = tasks[task]
+                    responses[phil_id] = task.result()
+                    final = session.add_response(phil_id, responses[phil_id]) or final
+                if final:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return responses
+
+    async def close(self):
+        await asyncio.gather(
+            *(self._drop_connection(phil_id) for phil_id in list(self.connections.keys())),
+            return_exceptions=True
+        )
@@ -0,0 +1,318 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import QUOTES_JSON, PHILOSOPHERS
+from load_test import ContextCorpus
+from quote_index import QuoteIndex
+from utils import (
+    load_json_file, get_philosopher_quotes, calculate_keyword_match,
+    calculate_context_match, calculate_relevance_score, select_best_quote,
+    format_request_message, format_response_message, parse_message,
+    request_fingerprint
+)
+from vector_scoring import VectorizedScorer, NUMPY_AVAILABLE
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "bench_baseline.json")
+MICRO_SAMPLE = 2000
+
+Query = Tuple[str, List[str], Optional[str]]
+
+
+def scale_corpus(quotes: List[Dict], factor: int, seed: int = 0) -> List[Dict]:
+    """
+    Real quotes plus (factor - 1) synthetic copies whose keywords and text are
+    resampled from the vocabulary of the same category, so the scaled corpus
+    keeps realistic term overlap instead of exact duplicates.
+    """
+    rng = random.Random(seed + factor)
+    keyword_pool: Dict[str, List[str]] = {}
+    text_pool: Dict[str, List[str]] = {}
+    for quote in quotes:
+        keyword_pool.setdefault(quote["categoryName"], []).extend(quote.get("keywords", []))
+        text_pool.setdefault(quote["categoryName"], []).extend(quote.get("quote", "").split())
+
+    scaled = list(quotes)
+    id_offset = max(q["quoteId"] for q in quotes) + 1
+    for copy in range(1, factor):
+        for quote in quotes:
+            category = quote["categoryName"]
+            keywords = keyword_pool[category]
+            words = text_pool[category]
+            scaled.append({
+                **quote,
+                "quoteId": quote["quoteId"] + copy * id_offset,
+                "keywords": rng.sample(keywords, min(len(keywords), len(quote.get("keywords", [])))),
+                "quote": " ".join(rng.choices(words, k=len(quote.get("quote", "").split())))
+            })
+    return scaled
+
+
+def measure(
+    func: Callable[[], object],
+    number: int,
+    repeat: int,
+    budget: Optional[float] = None
+) -> Dict[str, float]:
+    """
+    Per-call time of `func` over up to `repeat` runs of `number` calls. With a
+    `budget` (seconds), stops repeating once it is spent so the linear scan
+    on the largest corpora stays affordable.
+    """
+    func()
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        runs.append((time.perf_counter() - start) / number)
+        if budget is not None and sum(runs) * number >= budget:
+            break
+    return {
+        "median": statistics.median(runs),
+        "min": min(runs),
+        "max": max(runs),
+        "calls": number * len(runs)
+    }
+
+
+def cycle(items: List) -> Callable[[], object]:
+    state = {"i": 0}
+
+    def next_item():
+        item = items[state["i"] % len(items)]
+        state["i"] += 1
+        return item
+    return next_item
+
+
+def bench_functions(quotes: List[Dict], queries: List[Query], repeat: int) -> Dict[str, Dict]:
+    """Single-quote scoring functions over a fixed sample of (quote, query) pairs"""
+    rng = random.Random(1)
+    sample = rng.sample(quotes, min(len(quotes), MICRO_SAMPLE))
+    pairs = [(quote, query) for quote in sample[:200] for query in queries[:10]]
+    next_pair = cycle(pairs)
+    weights = PHILOSOPHERS[1]["weight_categories"]
+
+    def keyword():
+        quote, (_, keywords, _) = next_pair()
+        return calculate_keyword_match(quote, keywords)
+
+    def context():
+        quote, (text, _, _) = next_pair()
+        return calculate_context_match(quote, text)
+
+    def relevance():
+        quote, (text, keywords, category) = next_pair()
+        return calculate_relevance_score(quote, text, keywords, category, weights)
+
+    number = len(pairs)
+    return {
+        "calculate_keyword_match": measure(keyword, number, repeat),
+        "calculate_context_match": measure(context, number, repeat),
+        "calculate_relevance_score": measure(relevance, number, repeat)
+    }
+
+
+def bench_messages(quotes: List[Dict], queries: List[Query], repeat: int) -> Dict[str, Dict]:
+    next_query = cycle(queries)
+    next_quote = cycle(quotes[:100])
+    encoded = [
+        format_response_message(1, "Aristotle", quote, 7.5, "Accept", "raisonnement")
+        for quote in quotes[:100]
+    ]
+    next_encoded = cycle(encoded)
+    number = 2000
+
+    return {
+        "format_request_message": measure(lambda: format_request_message(*next_query()), number, repeat),
+        "format_response_message": measure(
+            lambda: format_response_message(1, "Aristotle", next_quote(), 7.5, "Accept", "raisonnement"),
+            number, repeat
+        ),
+        "parse_message": measure(lambda: parse_message(next_encoded()), number, repeat),
+        "request_fingerprint": measure(lambda: request_fingerprint(*next_query()), number, repeat)
+    }
+
+
+def result_key(quote: Optional[Dict]) -> Optional[Tuple[int, float]]:
+    return (quote["quoteId"], quote["relevance_score"]) if quote else None
+
+
+def bench_engines(
+    quotes: List[Dict],
+    queries: List[Query],
+    repeat: int,
+    budget: Optional[float] = None
+) -> Tuple[Dict[str, Dict], Dict]:
+    """
+    select_best_quote on one philosopher's corpus for every engine, plus a
+    check that each engine picks the same quote with the same score as the
+    linear reference
+    """
+    weights = PHILOSOPHERS[1]["weight_categories"]
+    timings: Dict[str, Dict] = {}
+
+    build_start = time.perf_counter()
+    index = QuoteIndex(quotes)
+    timings["quote_index_build"] = {"median": time.perf_counter() - build_start, "calls": 1}
+
+    engines: Dict[str, Callable[[Query], Optional[Dict]]] = {
+        "linear": lambda q: select_best_quote(quotes, q[0], q[1], q[2], weights),
+        "index": lambda q: index.select_best_quote(q[0], q[1], q[2], weights)
+    }
+    if NUMPY_AVAILABLE:
+        build_start = time.perf_counter()
+        scorer = VectorizedScorer(quotes, index)
+        timings["vectorized_build"] = {"median": time.perf_counter() - build_start, "calls": 1}
+        engines["numpy"] = lambda q: scorer.select_best_quote(q[0], q[1], q[2], weights)
+
+    reference = [result_key(engines["linear"](query)) for query in queries]
+    equivalence = {}
+    for name, engine in engines.items():
+        results = reference if name == "linear" else [result_key(engine(query)) for query in queries]
+        mismatches = [i for i, (got, want) in enumerate(zip(results, reference)) if got != want]
+        equivalence[name] = {
+            "queries": len(queries),
+            "mismatches": len(mismatches),
+            "first_mismatch": queries[mismatches[0]] if mismatches else None
+        }
+
+        next_query = cycle(queries)
+        timings[f"select_best_quote[{name}]"] = measure(
+            lambda: engine(next_query()), len(queries), repeat, budget
+        )
+
+    checksum = {
+        "matched": sum(1 for key in reference if key),
+        "score_sum": round(sum(key[1] for key in reference if key), 2),
+        "quote_ids": [key[0] if key else None for key in reference]
+    }
+    return timings, {"engines": equivalence, "checksum": checksum}
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Timings slower than baseline * (1 + tolerance), and scoring checksums that changed"""
+    problems = []
+    same_queries = baseline.get("config", {}).get("queries") == results["config"]["queries"] \
+        and baseline.get("config", {}).get("seed") == results["config"]["seed"]
+    if not same_queries:
+        print("\nBaseline was recorded with other --queries/--seed: scoring checksums not compared")
+
+    for scale, current in results["scales"].items():
+        previous = baseline.get("scales", {}).get(scale)
+        if previous is None:
+            continue
+        for name, timing in current["timings"].items():
+            before = previous["timings"].get(name)
+            if before and before["median"] > 0 and timing["median"] > before["median"] * (1 + tolerance):
+                problems.append(
+                    f"[{scale}] {name}: {timing['median'] * 1e6:.1f}us vs baseline "
+                    f"{before['median'] * 1e6:.1f}us (+{(timing['median'] / before['median'] - 1) * 100:.0f}%)"
+                )
+        if same_queries and previous.get("checksum") and previous["checksum"] != current["checksum"]:
+            problems.append(f"[{scale}] scoring results differ from the baseline checksum")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scoring and message helper microbenchmarks")
+    parser.add_argument("--scales", default="1,10,100,1000",
+                        help="Corpus scale factors relative to data/quotes.json")
+    parser.add_argument("--queries", type=int, default=20, help="Number of sampled queries")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per benchmark")
+    parser.add_argument("--budget", type=float, default=10.0,
+                        help="Seconds after which a select_best_quote benchmark stops repeating")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for queries and synthetic corpora")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file (machine-specific, ignored by git)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Record this run as the new baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown relative to the baseline (0.25 = +25%%)")
+    parser.add_argument("--output", default=None, help="Also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    quotes = load_json_file(QUOTES_JSON).get("quotes", [])
+    if not quotes:
+        print(f"No quotes found in {QUOTES_JSON}")
+        sys.exit(2)
+
+    corpus = ContextCorpus(seed=args.seed)
+    queries = []
+    for _ in range(args.queries):
+        sample = corpus.sample()
+        queries.append((sample["context"], sample["keywords"], sample["category"]))
+
+    results = {
+        "timestamp": time.time(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": NUMPY_AVAILABLE
+        },
+        "config": {"queries": args.queries, "repeat": args.repeat, "seed": args.seed},
+        # Message helpers do not depend on the corpus size; kept beside the
+        # scales so compare() treats them like any other group of timings
+        "scales": {"messages": {"timings": bench_messages(quotes, queries, args.repeat)}}
+    }
+    failures = []
+
+    for factor in [int(s) for s in args.scales.split(",") if s]:
+        scaled = scale_corpus(quotes, factor, args.seed)
+        philosopher_quotes = get_philosopher_quotes({"quotes": scaled}, 1)
+        timings = bench_functions(scaled, queries, args.repeat)
+        engine_timings, correctness = bench_engines(philosopher_quotes, queries, args.repeat, args.budget)
+        timings.update(engine_timings)
+
+        results["scales"][f"{factor}x"] = {
+            "corpus_size": len(scaled),
+            "philosopher_quotes": len(philosopher_quotes),
+            "timings": timings,
+            "equivalence": correctness["engines"],
+            "checksum": correctness["checksum"]
+        }
+
+        print(f"\n== {factor}x: {len(scaled)} quotes, {len(philosopher_quotes)} for philosopher 1 ==")
+        for name, timing in timings.items():
+            print(f"  {name:<32} {timing['median'] * 1e6:>12.1f} us")
+        for name, check in correctness["engines"].items():
+            status = "ok" if check["mismatches"] == 0 else f"{check['mismatches']} MISMATCHES"
+            print(f"  equivalence[{name}]: {status}")
+            if check["mismatches"]:
+                failures.append(f"[{factor}x] engine '{name}' disagrees with the linear reference")
+
+    print("\n== message helpers ==")
+    for name, timing in results["scales"]["messages"]["timings"].items():
+        print(f"  {name:<32} {timing['median'] * 1e6:>12.1f} us")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            failures += compare(results, json.load(f), args.tolerance)
+    else:
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one")
+
+    if failures:
+        print("\nFAILED:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
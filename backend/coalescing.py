@@ -0,0 +1,68 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class RequestCoalescer:
+    """
+    Single-flight: les appels concurrents partageant la même clé attendent
+    une seule exécution en cours au lieu d'en lancer une chacun.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, _Flight] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+
+    async def run(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]]
+    ) -> Tuple[Any, bool]:
+        """Retourne (résultat, True si l'appel a rejoint une exécution déjà en cours)"""
+        flight = self._in_flight.get(key)
+        if flight is not None:
+            flight.waiters += 1
+            self.coalesced += 1
+            self.max_waiters = max(self.max_waiters, flight.waiters)
+            return await asyncio.shield(flight.task), True
+
+        flight = _Flight(asyncio.ensure_future(factory()))
+        self._in_flight[key] = flight
+        self.leaders += 1
+        flight.task.add_done_callback(lambda task: self._finish(key, flight))
+
+        return await asyncio.shield(flight.task), False
+
+    def _finish(self, key: Hashable, flight: _Flight):
+        if self._in_flight.get(key) is flight:
+            del self._in_flight[key]
+
+        if not flight.task.cancelled() and flight.task.exception() is not None:
+            logger.warning(f"Exécution partagée en échec ({flight.waiters} en attente): {flight.task.exception()}")
+        elif flight.waiters:
+            logger.info(f"Exécution partagée avec {flight.waiters} requête(s) en attente")
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.leaders + self.coalesced
+        return {
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._in_flight),
+            "current_waiters": sum(flight.waiters for flight in self._in_flight.values()),
+            "max_waiters": self.max_waiters,
+            "avg_waiters_per_flight": round(self.coalesced / self.leaders, 2) if self.leaders else 0.0,
+            "coalescing_ratio": round(self.coalesced / total * 100, 1) if total else 0.0
+        }
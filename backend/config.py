@@ -81,14 +81,74 @@ COORDINATOR_PORT = 8000
 
 SOCKET_TIMEOUT = 2.0 
 CONNECTION_RETRY = 3
+REQUEST_DEADLINE = 3.0
+ASYNC_NODE_TIMEOUT = REQUEST_DEADLINE
+
+LATENCY_WINDOW = 200
+LATENCY_MIN_SAMPLES = 20
+LATENCY_TIMEOUT_FACTOR = 3.0
+LATENCY_MIN_TIMEOUT = 0.25
+HEDGE_ENABLED = True
+HEDGE_PERCENTILE = 95
+HEDGE_MIN_DELAY = 0.02
+RETRY_BACKOFF_BASE = 0.05
+RETRY_BACKOFF_MAX = 0.5
+
 HEARTBEAT_INTERVAL = 5.0  
 
+NODE_SERVER_MODE = "selector"
+NODE_BACKLOG = 128
+NODE_WORKER_POOL_SIZE = 4
+NODE_SELECT_TIMEOUT = 0.5
+NODE_MAX_MESSAGE_SIZE = 1024 * 1024
+NODE_CACHE_SIZE = 1024
+NODE_CACHE_TTL = 300.0
+NODE_DRAIN_TIMEOUT = 5.0
+NODE_STATS_PROBES = 4
+
+CONSENSUS_CACHE_SIZE = 256
+CONSENSUS_CACHE_TTL = 60.0
+SCORE_BOUNDS_CACHE_SIZE = 256
+
+EMBEDDED_EXECUTOR = "thread"
+EMBEDDED_WORKERS = 6
+
+SUPERVISOR_WORKERS = 1
+SUPERVISOR_POLL_INTERVAL = 0.5
+SUPERVISOR_RESTART_BACKOFF = 0.5
+SUPERVISOR_MAX_BACKOFF = 30.0
+SUPERVISOR_STABLE_AFTER = 10.0
+
+HISTOGRAM_MIN_VALUE = 1e-6
+HISTOGRAM_MAX_VALUE = 60.0
+HISTOGRAM_PRECISION = 0.01
+HISTOGRAM_WINDOWS = [60, 300]
+HISTOGRAM_WINDOW_SLOTS = 6
+PROMETHEUS_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+TRACING_ENABLED = True
+TRACE_HISTORY_SIZE = 100
+
+EVENT_QUEUE_SIZE = 100
+EVENT_KEEPALIVE_INTERVAL = 15.0
+EVENT_METRICS_INTERVAL = 2.0
+EVENT_HISTORY_SIZE = 200
+LONG_POLL_MAX_TIMEOUT = 30.0
+
+POOL_MAX_SIZE = 4
+POOL_IDLE_TIMEOUT = 60.0
+POOL_HEALTH_CHECK_INTERVAL = 10.0
+POOL_HEALTH_CHECK_TIMEOUT = 0.5
+
 QUORUM_THRESHOLD = 0.50    
 MIN_VOTES_REQUIRED = 2      
 MAX_VOTES = 6
 
 MIN_RELEVANCE_SCORE = 2.0   
 ACCEPT_THRESHOLD = 3.0     
+EARLY_TERMINATION_BOUNDS = "quotes"
+
+SCORING_ENGINE = "index"
 
 
 import os
@@ -98,6 +158,14 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 PHILOSOPHERS_JSON = os.path.join(DATA_DIR, "philosophers.json")
 QUOTES_JSON = os.path.join(DATA_DIR, "quotes.json")
 
+HISTORY_BACKEND = "sqlite"
+HISTORY_DB_PATH = os.path.join(BASE_DIR, "history.db")
+HISTORY_MEMORY_SIZE = 100
+HISTORY_MAX_ENTRIES = 100000
+HISTORY_BATCH_SIZE = 50
+HISTORY_FLUSH_INTERVAL = 0.5
+HISTORY_QUEUE_SIZE = 1000
+
 CATEGORIES = {
     1: "Wisdom",
     2: "Knowledge and learning",
@@ -115,6 +183,14 @@ MSG_TYPE_REQUEST = "REQUEST"
 MSG_TYPE_RESPONSE = "RESPONSE"
 MSG_TYPE_HEARTBEAT = "HEARTBEAT"
 MSG_TYPE_SHUTDOWN = "SHUTDOWN"
+MSG_TYPE_HELLO = "HELLO"
+MSG_TYPE_HELLO_ACK = "HELLO_ACK"
+MSG_TYPE_RELOAD = "RELOAD"
+MSG_TYPE_STATS = "STATS"
+
+PROTOCOL_VERSION = 2
+LEGACY_PROTOCOL_VERSION = 1
+MAX_FRAME_SIZE = 16 * 1024 * 1024
 
 
 LOG_LEVEL = "INFO"  
@@ -0,0 +1,195 @@
+import threading
+import time
+import logging
+from typing import Dict, List, Optional
+
+from config import (
+    SOCKET_TIMEOUT, MSG_TYPE_HEARTBEAT,
+    POOL_MAX_SIZE, POOL_IDLE_TIMEOUT,
+    POOL_HEALTH_CHECK_INTERVAL, POOL_HEALTH_CHECK_TIMEOUT
+)
+from node_connection import NodeConnection
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPool:
+    """Pool de connexions persistantes (protocole v2) par nœud philosophe"""
+
+    def __init__(
+        self,
+        host: str,
+        philosophers: Dict[int, Dict],
+        max_size: int = POOL_MAX_SIZE,
+        idle_timeout: float = POOL_IDLE_TIMEOUT,
+        health_check_interval: float = POOL_HEALTH_CHECK_INTERVAL,
+        connect_timeout: float = SOCKET_TIMEOUT
+    ):
+        self.host = host
+        self.philosophers = philosophers
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.connect_timeout = connect_timeout
+
+        self._connections: Dict[int, List[NodeConnection]] = {
+            phil_id: [] for phil_id in philosophers
+        }
+        self._locks = {phil_id: threading.Lock() for phil_id in philosophers}
+        self._needs_reconnect = {phil_id: False for phil_id in philosophers}
+        self._probing = {phil_id: set() for phil_id in philosophers}
+        self._stats = {
+            phil_id: {
+                "hits": 0,
+                "misses": 0,
+                "reconnects": 0,
+                "evictions": 0,
+                "health_check_failures": 0
+            }
+            for phil_id in philosophers
+        }
+
+    def acquire(self, philosopher_id: int, exclude: Optional[NodeConnection] = None) -> NodeConnection:
+        """
+        Connexion vers le nœud, autre que `exclude` (requête de couverture). Une
+        connexion inactive depuis health_check_interval est d'abord sondée par
+        un HEARTBEAT, hors du verrou: elle est réservée pendant la sonde pour que
+        les autres appelants passent à une autre connexion sans l'attendre.
+        """
+        stats = self._stats[philosopher_id]
+        probing = self._probing[philosopher_id]
+
+        while True:
+            with self._locks[philosopher_id]:
+                now = time.time()
+                self._evict_idle_locked(philosopher_id, now)
+                pool = self._connections[philosopher_id]
+                candidates = [c for c in pool if c is not exclude and c not in probing]
+
+                probe = None
+                for conn in candidates:
+                    if conn.in_flight != 0:
+                        continue
+                    if now - conn.last_used > self.health_check_interval:
+                        probe = conn
+                        probing.add(conn)
+                        break
+
+                    stats["hits"] += 1
+                    conn.last_used = now
+                    return conn
+
+                if probe is None:
+                    if len(pool) >= self.max_size and candidates:
+                        conn = min(candidates, key=lambda c: c.in_flight)
+                        stats["hits"] += 1
+                        conn.last_used = now
+                        return conn
+                    return self._open_locked(philosopher_id)
+
+            healthy = self._is_healthy(probe)
+
+            with self._locks[philosopher_id]:
+                probing.discard(probe)
+                if healthy:
+                    stats["hits"] += 1
+                    probe.last_used = time.time()
+                    return probe
+                stats["health_check_failures"] += 1
+                self._remove_locked(philosopher_id, probe)
+                self._needs_reconnect[philosopher_id] = True
+
+    def _open_locked(self, philosopher_id: int) -> NodeConnection:
+        """Ouvre une connexion; elle peut dépasser max_size quand seule `exclude` était disponible"""
+        stats = self._stats[philosopher_id]
+        stats["misses"] += 1
+        conn = NodeConnection(
+            philosopher_id,
+            self.host,
+            self.philosophers[philosopher_id]["port"],
+            self.connect_timeout
+        )
+        conn.connect()
+
+        if self._needs_reconnect[philosopher_id]:
+            stats["reconnects"] += 1
+            self._needs_reconnect[philosopher_id] = False
+
+        self._connections[philosopher_id].append(conn)
+        return conn
+
+    def discard(self, philosopher_id: int, conn: NodeConnection):
+        """Retire une connexion défaillante; la prochaine ouverture compte comme reconnexion"""
+        with self._locks[philosopher_id]:
+            self._remove_locked(philosopher_id, conn)
+            self._needs_reconnect[philosopher_id] = True
+
+    def close_node(self, philosopher_id: int):
+        with self._locks[philosopher_id]:
+            for conn in list(self._connections[philosopher_id]):
+                self._remove_locked(philosopher_id, conn)
+
+    def close_all(self):
+        for phil_id in self._connections:
+            self.close_node(phil_id)
+
+    def evict_idle(self):
+        now = time.time()
+        for phil_id in self._connections:
+            with self._locks[phil_id]:
+                self._evict_idle_locked(phil_id, now)
+
+    def _evict_idle_locked(self, philosopher_id: int, now: float):
+        for conn in list(self._connections[philosopher_id]):
+            if not conn.alive:
+                self._remove_locked(philosopher_id, conn)
+                self._needs_reconnect[philosopher_id] = True
+            elif (
+                conn.in_flight == 0 and now - conn.last_used > self.idle_timeout
+                and conn not in self._probing[philosopher_id]
+            ):
+                self._stats[philosopher_id]["evictions"] += 1
+                self._remove_locked(philosopher_id, conn)
+
+    def _remove_locked(self, philosopher_id: int, conn: NodeConnection):
+        pool = self._connections[philosopher_id]
+        if conn in pool:
+            pool.remove(conn)
+        conn.close()
+
+    def _is_healthy(self, conn: NodeConnection) -> bool:
+        if not conn.alive:
+            return False
+        try:
+            conn.request({"type": MSG_TYPE_HEARTBEAT}, POOL_HEALTH_CHECK_TIMEOUT)
+            return True
+        except Exception as e:
+            logger.debug(f"Vérification de santé échouée pour le port {conn.port}: {e}")
+            return False
+
+    def get_stats(self, philosopher_id: Optional[int] = None) -> Dict:
+        if philosopher_id is not None:
+            pool = self._connections[philosopher_id]
+            return {
+                **self._stats[philosopher_id],
+                "open_connections": len(pool),
+                "in_flight": sum(c.in_flight for c in pool)
+            }
+
+        nodes = {phil_id: self.get_stats(phil_id) for phil_id in self._connections}
+        totals = {
+            key: sum(node[key] for node in nodes.values())
+            for key in (
+                "hits", "misses", "reconnects", "evictions",
+                "health_check_failures", "open_connections", "in_flight"
+            )
+        }
+        lookups = totals["hits"] + totals["misses"]
+        totals["hit_rate"] = round(totals["hits"] / lookups * 100, 1) if lookups else 0.0
+
+        return {
+            "max_size": self.max_size,
+            "idle_timeout": self.idle_timeout,
+            "nodes": nodes,
+            "totals": totals
+        }
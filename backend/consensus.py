@@ -1,7 +1,19 @@
+import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple
+import os
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 
-from config import QUORUM_THRESHOLD, MIN_VOTES_REQUIRED, MAX_VOTES
+from config import (
+    QUORUM_THRESHOLD, MIN_VOTES_REQUIRED, MAX_VOTES,
+    PHILOSOPHERS, ACCEPT_THRESHOLD, QUOTES_JSON, EARLY_TERMINATION_BOUNDS,
+    SCORE_BOUNDS_CACHE_SIZE
+)
+from cache import LRUCache
+from utils import (
+    load_json_file, get_philosopher_quotes, combine_scores, request_fingerprint,
+    calculate_keyword_match, calculate_category_match, calculate_context_match
+)
 
 logger = logging.getLogger(__name__)
 
@@ -42,16 +54,8 @@ class ConsensusProtocol:
             score = response.get("score", 0.0)
             quote = response.get("quote")
             philosopher_name = response.get("philosopher_name", "Inconnu")
-            reasoning = response.get("reasoning", "")
             
-            votes_detail.append({
-                "philosopher_id": phil_id,
-                "philosopher_name": philosopher_name,
-                "vote": vote,
-                "score": score,
-                "reasoning": reasoning,
-                "quote_id": quote.get("quoteId") if quote else None
-            })
+            votes_detail.append(self.vote_detail(phil_id, response))
             
             if vote == "Accept":
                 accepts += 1
@@ -122,6 +126,19 @@ class ConsensusProtocol:
             quorum_reached=quorum_reached
         )
     
+    @staticmethod
+    def vote_detail(philosopher_id: int, response: Dict) -> Dict:
+        """Entrée de votes_detail correspondant à la réponse d'un nœud"""
+        quote = response.get("quote")
+        return {
+            "philosopher_id": philosopher_id,
+            "philosopher_name": response.get("philosopher_name", "Inconnu"),
+            "vote": response.get("vote", "Abstain"),
+            "score": response.get("score", 0.0),
+            "reasoning": response.get("reasoning", ""),
+            "quote_id": quote.get("quoteId") if quote else None
+        }
+    
     def _select_winner(self, candidates: Dict) -> Optional[Dict]:
         if not candidates:
             return None
@@ -200,6 +217,340 @@ class ConsensusProtocol:
             "error": "Aucune réponse valide des nœuds philosophes"
         }
 
+
+def max_possible_score(philosopher_id: int, category_name: Optional[str]) -> float:
+    """Borne supérieure du score qu'un philosophe peut attribuer (voir utils.combine_scores)"""
+    boost = 1.0
+    if category_name:
+        boost = PHILOSOPHERS[philosopher_id]["weight_categories"].get(category_name, 1.0)
+    return 10.0 * 0.4 + 10.0 * boost * 0.4 + 10.0 * 0.2
+
+
+class QuoteScoreBounds:
+    """
+    Borne supérieure, pour une requête donnée, du score que chaque philosophe
+    peut attribuer: chaque composante (mots-clés, catégorie, contexte) est
+    majorée par son maximum sur les citations du philosophe. Bien plus serrée
+    que max_possible_score, elle permet de conclure avant la dernière réponse.
+    Le calcul parcourt tout le corpus: les bornes sont mises en cache par
+    version du corpus (rechargé quand le fichier change) et empreinte de requête.
+    """
+    
+    def __init__(self, quotes_path: str = QUOTES_JSON, cache_size: int = SCORE_BOUNDS_CACHE_SIZE):
+        self.quotes_path = quotes_path
+        self.corpus_version = 0
+        self.cache = LRUCache(cache_size)
+        self._quotes: Optional[Dict[int, List[Dict]]] = None
+        self._owners: Optional[Dict] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._lock = threading.Lock()
+    
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.quotes_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def _refresh(self):
+        """Recharge les citations si le fichier a changé depuis le dernier chargement"""
+        signature = self._file_signature()
+        if self._quotes is not None and signature == self._signature:
+            return
+        with self._lock:
+            if self._quotes is not None and signature == self._signature:
+                return
+            quotes_data = load_json_file(self.quotes_path)
+            self._quotes = {
+                phil_id: get_philosopher_quotes(quotes_data, phil_id) for phil_id in PHILOSOPHERS
+            }
+            self._owners = {
+                quote["quoteId"]: phil_id
+                for phil_id, quotes in self._quotes.items() for quote in quotes
+            }
+            self._signature = signature
+            self.corpus_version += 1
+            self.cache.clear()
+    
+    @property
+    def quotes(self) -> Dict[int, List[Dict]]:
+        self._refresh()
+        return self._quotes
+    
+    @property
+    def owners(self) -> Dict:
+        """Philosophe auteur de chaque citation: lui seul peut la proposer"""
+        self._refresh()
+        return self._owners
+    
+    def _cache_key(
+        self,
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str]
+    ) -> tuple:
+        return self.corpus_version, request_fingerprint(context, keywords, category_name)
+    
+    def cached(
+        self,
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str]
+    ) -> Optional[Dict[int, float]]:
+        self._refresh()
+        return self.cache.get(self._cache_key(context, keywords, category_name))
+    
+    def for_request(
+        self,
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str]
+    ) -> Dict[int, float]:
+        quotes = self.quotes
+        key = self._cache_key(context, keywords, category_name)
+        bounds = self.cache.get(key)
+        if bounds is not None:
+            return bounds
+        
+        bounds = {}
+        for phil_id, phil_quotes in quotes.items():
+            if not phil_quotes:
+                # Citations inconnues du coordinateur: seule la borne générale est sûre
+                bounds[phil_id] = max_possible_score(phil_id, category_name)
+                continue
+            bounds[phil_id] = combine_scores(
+                max(calculate_keyword_match(quote, keywords) for quote in phil_quotes),
+                max(calculate_category_match(quote, category_name) for quote in phil_quotes),
+                max(calculate_context_match(quote, context) for quote in phil_quotes),
+                category_name,
+                PHILOSOPHERS[phil_id]["weight_categories"]
+            )
+        self.cache.put(key, bounds)
+        return bounds
+    
+    async def for_request_async(
+        self,
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str]
+    ) -> Dict[int, float]:
+        """Comme for_request, mais un calcul non mis en cache s'exécute hors de la boucle d'événements"""
+        bounds = self.cached(context, keywords, category_name)
+        if bounds is None:
+            bounds = await asyncio.to_thread(self.for_request, context, keywords, category_name)
+        return bounds
+    
+    def get_stats(self) -> Dict:
+        return {"corpus_version": self.corpus_version, **self.cache.get_stats()}
+
+
+quote_score_bounds = QuoteScoreBounds()
+
+
+class ConsensusSession:
+    """
+    Agrégation incrémentale des votes: is_final() devient vrai dès que les
+    réponses encore attendues ne peuvent plus changer l'issue du consensus,
+    qu'elles arrivent ou non (ou seulement quand toutes sont arrivées, sans
+    early_termination). finalize() renvoie alors tel quel le résultat
+    d'aggregate_votes sur les réponses reçues.
+    `score_bounds` majore le score de chaque philosophe pour la requête (à
+    défaut, la borne générale max_possible_score) et `quote_owners` associe
+    chaque citation à son auteur; for_request() les calcule sur les citations.
+    `listener(philosopher_id, response)` est appelé à chaque réponse ingérée.
+    """
+    
+    def __init__(
+        self,
+        protocol: ConsensusProtocol,
+        category_name: Optional[str] = None,
+        early_termination: bool = True,
+        listener: Optional[Callable[[int, Optional[Dict]], None]] = None,
+        score_bounds: Optional[Dict[int, float]] = None,
+        quote_owners: Optional[Dict] = None
+    ):
+        self.protocol = protocol
+        self.category_name = category_name
+        self.early_termination = early_termination
+        self.listener = listener
+        self.request_bounds = score_bounds or {}
+        self.quote_owners = quote_owners or {}
+        
+        self.responses: Dict[int, Optional[Dict]] = {}
+        self.pending: set = set()
+        self.score_bounds: Dict[int, float] = {}
+        
+        self.accepts = 0
+        self.rejects = 0
+        self.total_votes = 0
+        self.candidates: Dict = {}
+        self.final_reason: Optional[str] = None
+    
+    @classmethod
+    def for_request(
+        cls,
+        protocol: ConsensusProtocol,
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str],
+        **options
+    ) -> "ConsensusSession":
+        """Session bornée par les citations de chaque philosophe (si EARLY_TERMINATION_BOUNDS == "quotes")"""
+        if EARLY_TERMINATION_BOUNDS == "quotes":
+            options.setdefault("score_bounds", quote_score_bounds.for_request(context, keywords, category_name))
+            options.setdefault("quote_owners", quote_score_bounds.owners)
+        return cls(protocol, category_name, **options)
+    
+    @classmethod
+    async def for_request_async(
+        cls,
+        protocol: ConsensusProtocol,
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str],
+        **options
+    ) -> "ConsensusSession":
+        """for_request depuis la boucle d'événements: les bornes sont calculées dans un thread"""
+        if EARLY_TERMINATION_BOUNDS == "quotes" and "score_bounds" not in options:
+            options["score_bounds"] = await quote_score_bounds.for_request_async(context, keywords, category_name)
+        return cls.for_request(protocol, context, keywords, category_name, **options)
+    
+    def expect(self, philosopher_ids: Iterable[int]):
+        for phil_id in philosopher_ids:
+            if phil_id not in self.responses:
+                self.pending.add(phil_id)
+                bound = self.request_bounds.get(phil_id)
+                if bound is None:
+                    bound = max_possible_score(phil_id, self.category_name)
+                self.score_bounds[phil_id] = bound
+    
+    def add_response(self, philosopher_id: int, response: Optional[Dict]) -> bool:
+        self.pending.discard(philosopher_id)
+        self.responses[philosopher_id] = response
+        
+        if response is not None:
+            self.total_votes += 1
+            quote = response.get("quote")
+            vote = response.get("vote", "Abstain")
+            if vote == "Accept":
+                self.accepts += 1
+                if quote:
+                    candidate = self.candidates.setdefault(quote.get("quoteId"), [0.0, 0])
+                    candidate[0] += response.get("score", 0.0)
+                    candidate[1] += 1
+            elif vote == "Reject":
+                self.rejects += 1
+        
+        final = self.is_final()
+        if self.listener is not None:
+            self.listener(philosopher_id, response)
+        return final
+    
+    def tally(self) -> Dict:
+        """Décompte provisoire des votes reçus"""
+        leader = None
+        if self.candidates:
+            leader = max(self.candidates, key=lambda q: self.candidates[q][0] / self.candidates[q][1])
+        return {
+            "received": len(self.responses),
+            "pending": len(self.pending),
+            "total_votes": self.total_votes,
+            "accepts": self.accepts,
+            "rejects": self.rejects,
+            "abstains": self.total_votes - self.accepts - self.rejects,
+            "quorum_percentage": round(self.accepts / self.total_votes * 100, 1) if self.total_votes else 0.0,
+            "leader_quote_id": leader,
+            "final": self.final_reason
+        }
+    
+    def is_final(self) -> bool:
+        if self.final_reason is not None:
+            return True
+        
+        remaining = len(self.pending)
+        if remaining == 0:
+            self.final_reason = "complete"
+        elif self.early_termination:
+            if not self._quorum_reachable():
+                self.final_reason = "quorum_unreachable"
+            elif self._quorum_guaranteed(remaining) and self._winner_locked():
+                self.final_reason = "winner_locked"
+        
+        return self.final_reason is not None
+    
+    def _could_accept(self) -> List[int]:
+        """Nœuds en attente dont le score peut atteindre le seuil d'acceptation"""
+        return [phil_id for phil_id in self.pending if self.score_bounds[phil_id] >= ACCEPT_THRESHOLD]
+    
+    def _quorum_reachable(self) -> bool:
+        """
+        Un nœud en attente peut aussi ne jamais répondre (délai, échec) et
+        aggregate_votes l'exclut alors du total: le cas le plus favorable au
+        quorum est celui où seuls les nœuds capables d'accepter votent, tous Accept.
+        """
+        contenders = len(self._could_accept())
+        best_accepts = self.accepts + contenders
+        best_total = self.total_votes + contenders
+        return (
+            best_accepts >= self.protocol.min_votes_required and
+            best_total > 0 and
+            best_accepts / best_total >= self.protocol.quorum_threshold
+        )
+    
+    def _quorum_guaranteed(self, remaining: int) -> bool:
+        return (
+            self.accepts >= self.protocol.min_votes_required and
+            self.accepts / (self.total_votes + remaining) >= self.protocol.quorum_threshold
+        )
+    
+    def _winner_locked(self) -> bool:
+        """
+        Le meneur doit rester strictement en tête même si tous les votes restants
+        lui sont défavorables: soutiens au score minimal d'acceptation pour lui,
+        borne de score de chaque nœud en attente pour un rival (existant ou
+        nouveau). Un nœud dont la borne est sous le seuil d'acceptation ne peut
+        soutenir aucune citation, et seul l'auteur d'une citation peut la soutenir
+        quand `quote_owners` est connu.
+        """
+        if not self.candidates:
+            return False
+        
+        contenders = self._could_accept()
+        
+        averages = {
+            quote_id: total / count for quote_id, (total, count) in self.candidates.items()
+        }
+        leader = max(averages, key=averages.get)
+        total, count = self.candidates[leader]
+        owner = self.quote_owners.get(leader)
+        if owner is not None:
+            supporters = 1 if owner in contenders else 0
+        else:
+            supporters = len(contenders)
+        
+        worst_leader = min(averages[leader], (total + supporters * ACCEPT_THRESHOLD) / (count + supporters))
+        best_rival = max((self.score_bounds[phil_id] for phil_id in contenders), default=0.0)
+        for quote_id, average in averages.items():
+            if quote_id != leader:
+                best_rival = max(best_rival, average)
+        
+        return worst_leader > best_rival
+    
+    def finalize(self) -> Dict:
+        self.is_final()
+        result = self.protocol.aggregate_votes(self.responses)
+        result["early_termination"] = {
+            "terminated": bool(self.pending),
+            "reason": (self.final_reason or "incomplete") if self.pending else "complete",
+            "skipped": sorted(self.pending)
+        }
+        if self.pending:
+            logger.info(
+                f"Consensus anticipé ({self.final_reason}): "
+                f"{len(self.pending)} réponse(s) ignorée(s)"
+            )
+        return result
+
 if __name__ == "__main__":
     
     logging.basicConfig(
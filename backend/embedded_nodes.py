@@ -0,0 +1,58 @@
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Optional
+
+from config import PHILOSOPHERS, EMBEDDED_EXECUTOR, EMBEDDED_WORKERS
+from node_philosopher import PhilosopherNode
+
+logger = logging.getLogger(__name__)
+
+_worker_nodes: Dict[int, PhilosopherNode] = {}
+
+
+def _worker_handle_request(philosopher_id: int, request: Dict) -> Dict:
+    """Point d'entrée des processus du pool: un cœur de scoring par philosophe et par processus"""
+    node = _worker_nodes.get(philosopher_id)
+    if node is None:
+        node = _worker_nodes[philosopher_id] = PhilosopherNode(philosopher_id)
+    return node.handle_request(request)
+
+
+class EmbeddedCluster:
+    """Cœurs de scoring des philosophes exécutés dans le processus du coordinateur"""
+
+    def __init__(
+        self,
+        philosophers: Optional[Dict] = None,
+        executor_type: Optional[str] = None,
+        workers: Optional[int] = None
+    ):
+        self.philosophers = philosophers or PHILOSOPHERS
+        self.executor_type = executor_type or EMBEDDED_EXECUTOR
+        self.workers = workers or EMBEDDED_WORKERS
+        self.nodes: Dict[int, PhilosopherNode] = {}
+
+        if self.executor_type == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        elif self.executor_type == "thread":
+            self.nodes = {
+                phil_id: PhilosopherNode(phil_id) for phil_id in self.philosophers
+            }
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="embedded"
+            )
+        else:
+            raise ValueError(f"Exécuteur embarqué inconnu: {self.executor_type}")
+
+        logger.info(
+            f"Cluster embarqué initialisé: {len(self.philosophers)} philosophes, "
+            f"pool {self.executor_type} de {self.workers} workers"
+        )
+
+    def submit(self, philosopher_id: int, request: Dict) -> Future:
+        if self.executor_type == "process":
+            return self._executor.submit(_worker_handle_request, philosopher_id, request)
+        return self._executor.submit(self.nodes[philosopher_id].handle_request, request)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
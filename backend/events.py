@@ -0,0 +1,147 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+from config import EVENT_QUEUE_SIZE, EVENT_KEEPALIVE_INTERVAL, EVENT_HISTORY_SIZE
+
+
+def format_sse(event: Dict) -> str:
+    """Sérialise un événement au format text/event-stream"""
+    lines = [f"id: {event['id']}"] if event.get("id") is not None else []
+    lines.append(f"event: {event['type']}")
+    lines.append(f"data: {json.dumps(event['data'], default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    """File bornée d'un abonné: quand elle est pleine, les plus anciens événements sont perdus"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, types: Optional[Iterable[str]], max_size: int):
+        self.loop = loop
+        self.types = set(types) if types else None
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.dropped = 0
+        self.reported_dropped = 0
+        self.connected_at = time.time()
+
+    def wants(self, event_type: str) -> bool:
+        return self.types is None or event_type in self.types
+
+    def offer(self, event: Dict):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self.loop:
+            self._put(event)
+        else:
+            try:
+                self.loop.call_soon_threadsafe(self._put, event)
+            except RuntimeError:
+                pass
+
+    def _put(self, event: Dict):
+        while self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+
+
+class EventBroker:
+    """Diffuse les événements du coordinateur (recommandations, messages, nœuds, métriques) aux abonnés"""
+
+    def __init__(
+        self,
+        queue_size: int = EVENT_QUEUE_SIZE,
+        keepalive: float = EVENT_KEEPALIVE_INTERVAL,
+        history_size: int = EVENT_HISTORY_SIZE
+    ):
+        self.queue_size = queue_size
+        self.keepalive = keepalive
+        self.sequence = 0
+        self.published = 0
+        self.replayed = 0
+        self._subscribers: List[Subscription] = []
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self, types: Optional[Iterable[str]] = None, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        Abonne l'appelant; avec `last_event_id` (reconnexion SSE), les événements
+        plus récents encore en mémoire sont rejoués avant les nouveaux
+        """
+        subscription = Subscription(asyncio.get_running_loop(), types, self.queue_size)
+        with self._lock:
+            self._subscribers.append(subscription)
+            if last_event_id is not None:
+                oldest = self._history[0]["id"] if self._history else self.sequence + 1
+                if oldest > last_event_id + 1:
+                    # Des événements ne sont plus rejouables: signalés comme perdus
+                    subscription.dropped += oldest - last_event_id - 1
+                for event in self._history:
+                    if event["id"] > last_event_id and subscription.wants(event["type"]):
+                        subscription._put(event)
+                        self.replayed += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def publish(self, event_type: str, data: Dict) -> Dict:
+        with self._lock:
+            self.sequence += 1
+            self.published += 1
+            event = {"id": self.sequence, "type": event_type, "timestamp": time.time(), "data": data}
+            self._history.append(event)
+            subscribers = [sub for sub in self._subscribers if sub.wants(event_type)]
+
+        for subscription in subscribers:
+            subscription.offer(event)
+        return event
+
+    async def stream(self, subscription: Subscription) -> AsyncIterator[str]:
+        """Flux SSE d'un abonné, avec commentaires keep-alive et signalement des pertes"""
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), self.keepalive)
+                except TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+
+                if subscription.dropped != subscription.reported_dropped:
+                    # Le client a perdu des événements: il doit se resynchroniser par les endpoints REST
+                    yield format_sse({
+                        "type": "overflow",
+                        "data": {"dropped": subscription.dropped - subscription.reported_dropped}
+                    })
+                    subscription.reported_dropped = subscription.dropped
+                yield format_sse(event)
+        finally:
+            self.unsubscribe(subscription)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        return {
+            "subscribers": len(subscribers),
+            "published": self.published,
+            "last_event_id": self.sequence,
+            "replayed": self.replayed,
+            "queued": sum(sub.queue.qsize() for sub in subscribers),
+            "dropped": sum(sub.dropped for sub in subscribers)
+        }
+
+
+event_broker = EventBroker()
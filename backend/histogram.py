@@ -0,0 +1,220 @@
+import math
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from config import (
+    HISTOGRAM_MIN_VALUE, HISTOGRAM_MAX_VALUE, HISTOGRAM_PRECISION,
+    HISTOGRAM_WINDOW_SLOTS
+)
+
+REPORTED_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    Fixed-memory histogram with logarithmic buckets: each bucket is
+    `precision` wider than the previous one, so any percentile is reported
+    within that relative error whatever the number of recorded values.
+    """
+
+    def __init__(
+        self,
+        min_value: float = HISTOGRAM_MIN_VALUE,
+        max_value: float = HISTOGRAM_MAX_VALUE,
+        precision: float = HISTOGRAM_PRECISION
+    ):
+        self.min_value = min_value
+        self.max_value = max_value
+        self.precision = precision
+        self._log_growth = math.log1p(precision)
+        self.buckets: List[int] = [0] * (self._bucket_index(max_value) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _bucket_index(self, value: float) -> int:
+        if value <= self.min_value:
+            return 0
+        return int(math.log(value / self.min_value) / self._log_growth) + 1
+
+    def _bucket_value(self, index: int) -> float:
+        if index == 0:
+            return self.min_value
+        # Geometric midpoint of bucket [min * g^(i-1), min * g^i)
+        return self.min_value * math.exp((index - 0.5) * self._log_growth)
+
+    def record(self, value: float):
+        index = min(self._bucket_index(value), len(self.buckets) - 1)
+        with self._lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.total += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+
+    def compatible_with(self, other: "LatencyHistogram") -> bool:
+        return (
+            self.min_value == other.min_value
+            and self.max_value == other.max_value
+            and self.precision == other.precision
+        )
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Adds the counts of `other` into this histogram (same bucket layout required)"""
+        if not self.compatible_with(other):
+            raise ValueError("Cannot merge histograms with different bucket layouts")
+
+        with other._lock:
+            buckets = list(other.buckets)
+            count, total = other.count, other.total
+            low, high = other.min, other.max
+
+        with self._lock:
+            for index, bucket_count in enumerate(buckets):
+                if bucket_count:
+                    self.buckets[index] += bucket_count
+            self.count += count
+            self.total += total
+            if low is not None:
+                self.min = low if self.min is None else min(self.min, low)
+                self.max = high if self.max is None else max(self.max, high)
+        return self
+
+    @classmethod
+    def merged(cls, histograms: Iterable["LatencyHistogram"]) -> "LatencyHistogram":
+        histograms = list(histograms)
+        if not histograms:
+            return cls()
+        first = histograms[0]
+        result = cls(first.min_value, first.max_value, first.precision)
+        for histogram in histograms:
+            result.merge(histogram)
+        return result
+
+    def percentile(self, percent: float) -> Optional[float]:
+        with self._lock:
+            if self.count == 0:
+                return None
+            rank = max(math.ceil(percent / 100 * self.count), 1)
+            seen = 0
+            for index, bucket_count in enumerate(self.buckets):
+                seen += bucket_count
+                if seen >= rank:
+                    return min(max(self._bucket_value(index), self.min), self.max)
+            return self.max
+
+    def cumulative_counts(self, bounds: Iterable[float]) -> List[int]:
+        """
+        Number of values <= each bound (sorted ascending), for exporting into
+        coarser fixed buckets. A bucket straddling a bound is counted below it,
+        so counts round up: they include every value <= bound, plus possibly
+        values of the same bucket, at most `precision` above the bound (values
+        above max_value share the last bucket and count below any bound in it).
+        """
+        bounds = list(bounds)
+        limits = [self._bucket_index(bound) for bound in bounds]
+        counts = []
+        with self._lock:
+            seen = 0
+            index = 0
+            for limit in limits:
+                while index <= min(limit, len(self.buckets) - 1):
+                    seen += self.buckets[index]
+                    index += 1
+                counts.append(seen)
+        return counts
+
+    def clear(self):
+        with self._lock:
+            self.buckets = [0] * len(self.buckets)
+            self.count = 0
+            self.total = 0.0
+            self.min = None
+            self.max = None
+
+    def to_dict(self) -> Dict:
+        """Sparse, JSON-serialisable form that can be merged on another process"""
+        with self._lock:
+            return {
+                "min_value": self.min_value,
+                "max_value": self.max_value,
+                "precision": self.precision,
+                "count": self.count,
+                "total": self.total,
+                "min": self.min,
+                "max": self.max,
+                "buckets": {str(i): c for i, c in enumerate(self.buckets) if c}
+            }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "LatencyHistogram":
+        histogram = cls(data["min_value"], data["max_value"], data["precision"])
+        for index, count in data["buckets"].items():
+            histogram.buckets[int(index)] = count
+        histogram.count = data["count"]
+        histogram.total = data["total"]
+        histogram.min = data["min"]
+        histogram.max = data["max"]
+        return histogram
+
+    def summary(self, percentiles: Iterable[float] = REPORTED_PERCENTILES) -> Dict:
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return round(value, 6) if value is not None else None
+
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 6) if self.count else None,
+            "min": rounded(self.min),
+            "max": rounded(self.max),
+            **{f"p{p:g}": rounded(self.percentile(p)) for p in percentiles}
+        }
+
+
+class WindowedHistogram:
+    """
+    Histogram over the last `window` seconds: the window is split into
+    `slots` sub-histograms that are recycled as they expire, so values age
+    out with a granularity of window / slots.
+    """
+
+    def __init__(self, window: float, slots: int = HISTOGRAM_WINDOW_SLOTS, **layout):
+        self.window = window
+        self.slot_duration = window / slots
+        self._layout = layout
+        self._slots = [LatencyHistogram(**layout) for _ in range(slots)]
+        self._epochs = [-1] * slots
+        self._lock = threading.Lock()
+
+    def _slot(self, now: float) -> LatencyHistogram:
+        epoch = int(now // self.slot_duration)
+        index = epoch % len(self._slots)
+        with self._lock:
+            if self._epochs[index] != epoch:
+                self._slots[index].clear()
+                self._epochs[index] = epoch
+            return self._slots[index]
+
+    def record(self, value: float, now: Optional[float] = None):
+        self._slot(now if now is not None else time.time()).record(value)
+
+    def snapshot(self, now: Optional[float] = None) -> LatencyHistogram:
+        """Merged histogram of the slots that are still inside the window"""
+        current = int((now if now is not None else time.time()) // self.slot_duration)
+        result = LatencyHistogram(**self._layout)
+        with self._lock:
+            live = [
+                histogram for histogram, epoch in zip(self._slots, self._epochs)
+                if current - epoch < len(self._slots)
+            ]
+        for histogram in live:
+            result.merge(histogram)
+        return result
+
+    def clear(self):
+        with self._lock:
+            for histogram in self._slots:
+                histogram.clear()
+            self._epochs = [-1] * len(self._slots)
@@ -0,0 +1,359 @@
+import itertools
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from config import (
+    HISTORY_BACKEND, HISTORY_DB_PATH, HISTORY_MEMORY_SIZE, HISTORY_MAX_ENTRIES,
+    HISTORY_BATCH_SIZE, HISTORY_FLUSH_INTERVAL, HISTORY_QUEUE_SIZE
+)
+
+logger = logging.getLogger(__name__)
+
+
+def entry_quote_id(entry: Dict) -> Optional[int]:
+    winner = entry.get("winner")
+    return winner.get("quote_id") if winner else None
+
+
+def entry_category(entry: Dict) -> Optional[str]:
+    """Catégorie demandée, à défaut celle de la citation gagnante"""
+    category = (entry.get("context") or {}).get("category")
+    if category:
+        return category
+    winner = entry.get("winner")
+    return (winner.get("quote") or {}).get("categoryName") if winner else None
+
+
+def matches(
+    entry: Dict,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    quote_id: Optional[int] = None,
+    category: Optional[str] = None
+) -> bool:
+    timestamp = entry.get("timestamp", 0)
+    return (
+        (start is None or timestamp >= start)
+        and (end is None or timestamp < end)
+        and (quote_id is None or entry_quote_id(entry) == quote_id)
+        and (category is None or entry_category(entry) == category)
+    )
+
+
+class MemoryHistoryStore:
+    """Historique en mémoire borné à `max_size` entrées (perdu au redémarrage)"""
+
+    backend = "memory"
+
+    def __init__(self, max_size: int = HISTORY_MEMORY_SIZE):
+        self._entries = deque(maxlen=max_size)
+        self._lock = threading.Lock()
+        self.sequence = 0
+
+    def append(self, entry: Dict):
+        with self._lock:
+            self.sequence += 1
+            entry["seq"] = self.sequence
+            self._entries.appendleft(entry)
+
+    def recent(self, limit: int = 50, offset: int = 0) -> List[Dict]:
+        with self._lock:
+            return list(itertools.islice(self._entries, offset, offset + limit))
+
+    def query(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        quote_id: Optional[int] = None,
+        category: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        with self._lock:
+            found = (e for e in self._entries if matches(e, start, end, quote_id, category))
+            return list(itertools.islice(found, limit))
+
+    def after(self, seq: int, limit: int = 50) -> List[Dict]:
+        """Entrées de numéro de séquence supérieur à `seq`, de la plus ancienne à la plus récente"""
+        with self._lock:
+            newer = list(itertools.takewhile(lambda e: e["seq"] > seq, self._entries))
+        newer.reverse()
+        return newer[:limit]
+
+    def count(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+        return count
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+    def get_stats(self) -> Dict:
+        return {
+            "backend": self.backend,
+            "entries": self.count(),
+            "max_size": self._entries.maxlen,
+            "sequence": self.sequence
+        }
+
+
+class SQLiteHistoryStore:
+    """
+    Historique persistant dans SQLite. Les écritures sont mises en file et
+    insérées par lots par un thread dédié, hors du chemin des requêtes; les
+    lectures forcent d'abord l'écriture des entrées en attente. Seule la file
+    (bornée) réside en mémoire, quelle que soit la taille de l'historique.
+    """
+
+    backend = "sqlite"
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS recommendations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp INTEGER NOT NULL,
+            quote_id INTEGER,
+            category TEXT,
+            quorum_reached INTEGER NOT NULL DEFAULT 0,
+            payload TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_recommendations_timestamp ON recommendations (timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_recommendations_quote ON recommendations (quote_id, timestamp)",
+        "CREATE INDEX IF NOT EXISTS idx_recommendations_category ON recommendations (category, timestamp)"
+    )
+
+    def __init__(
+        self,
+        path: str = HISTORY_DB_PATH,
+        max_entries: Optional[int] = HISTORY_MAX_ENTRIES,
+        batch_size: int = HISTORY_BATCH_SIZE,
+        flush_interval: float = HISTORY_FLUSH_INTERVAL,
+        queue_size: int = HISTORY_QUEUE_SIZE
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self._writer_db = self._connect()
+        for statement in self.SCHEMA:
+            self._writer_db.execute(statement)
+        self._writer_db.commit()
+        self._writer_lock = threading.Lock()
+        self._reader_db = self._connect()
+        self._reader_lock = threading.Lock()
+
+        self._count = self._reader_db.execute("SELECT COUNT(*) FROM recommendations").fetchone()[0]
+        # sqlite_sequence conserve le dernier id attribué, même après un effacement de l'historique
+        self.sequence = self._reader_db.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'recommendations'"
+        ).fetchone()[0]
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="history-writer", daemon=True)
+        self._writer.start()
+        logger.info(f"Historique SQLite ouvert: {path} ({self._count} entrées)")
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def append(self, entry: Dict):
+        with self._pending_lock:
+            self.sequence += 1
+            entry["seq"] = self.sequence
+            self._pending += 1
+        try:
+            self._queue.put_nowait(("entry", entry))
+        except queue.Full:
+            with self._pending_lock:
+                self._pending -= 1
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning(f"File d'écriture de l'historique pleine ({self.dropped} entrées ignorées)")
+
+    def _write_loop(self):
+        while True:
+            batch, waiters, stop = [], [], False
+            try:
+                kind, item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+
+            while True:
+                if kind == "entry":
+                    batch.append(item)
+                elif kind == "flush":
+                    waiters.append(item)
+                else:
+                    stop = True
+                if len(batch) >= self.batch_size or stop:
+                    break
+                try:
+                    kind, item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                try:
+                    self._insert(batch)
+                except sqlite3.Error as e:
+                    logger.error(f"Échec d'écriture de {len(batch)} entrées d'historique: {e}")
+                with self._pending_lock:
+                    self._pending -= len(batch)
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                return
+
+    def _insert(self, batch: List[Dict]):
+        rows = [
+            (
+                entry["seq"],
+                entry.get("timestamp", int(time.time() * 1000)),
+                entry_quote_id(entry),
+                entry_category(entry),
+                int(bool((entry.get("consensus") or {}).get("quorum_reached"))),
+                json.dumps(entry, default=str)
+            )
+            for entry in batch
+        ]
+        with self._writer_lock, self._writer_db:
+            self._writer_db.executemany(
+                "INSERT INTO recommendations (id, timestamp, quote_id, category, quorum_reached, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._count += len(rows)
+            if self.max_entries is not None and self._count > self.max_entries:
+                pruned = self._writer_db.execute(
+                    "DELETE FROM recommendations WHERE id <= "
+                    "(SELECT id FROM recommendations ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (self.max_entries,)
+                ).rowcount
+                self._count -= pruned
+        self.written += len(rows)
+        self.batches += 1
+
+    def flush(self, timeout: float = 5.0):
+        """Attend que les entrées déjà mises en file soient écrites"""
+        with self._pending_lock:
+            if self._pending == 0 or self._closed:
+                return
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        done.wait(timeout)
+
+    def _select(
+        self,
+        where: str = "",
+        params: tuple = (),
+        limit: int = 50,
+        offset: int = 0,
+        order: str = "timestamp DESC, id DESC"
+    ) -> List[Dict]:
+        self.flush()
+        with self._reader_lock:
+            rows = self._reader_db.execute(
+                f"SELECT id, payload FROM recommendations {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + (limit, offset)
+            ).fetchall()
+        entries = []
+        for seq, payload in rows:
+            entry = json.loads(payload)
+            entry.setdefault("seq", seq)
+            entries.append(entry)
+        return entries
+
+    def recent(self, limit: int = 50, offset: int = 0) -> List[Dict]:
+        return self._select(limit=limit, offset=offset)
+
+    def query(
+        self,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        quote_id: Optional[int] = None,
+        category: Optional[str] = None,
+        limit: int = 50
+    ) -> List[Dict]:
+        conditions, params = [], []
+        for clause, value in (
+            ("timestamp >= ?", start), ("timestamp < ?", end),
+            ("quote_id = ?", quote_id), ("category = ?", category)
+        ):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        where = "WHERE " + " AND ".join(conditions) if conditions else ""
+        return self._select(where, tuple(params), limit)
+
+    def after(self, seq: int, limit: int = 50) -> List[Dict]:
+        """Entrées de numéro de séquence supérieur à `seq`, de la plus ancienne à la plus récente"""
+        return self._select("WHERE id > ?", (seq,), limit, order="id ASC")
+
+    def count(self) -> int:
+        with self._pending_lock:
+            return self._count + self._pending
+
+    def clear(self) -> int:
+        self.flush()
+        with self._writer_lock, self._writer_db:
+            count = self._writer_db.execute("DELETE FROM recommendations").rowcount
+            self._count = 0
+        return count
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(("stop", None))
+        self._writer.join(timeout=5.0)
+        self._writer_db.close()
+        self._reader_db.close()
+
+    def get_stats(self) -> Dict:
+        return {
+            "backend": self.backend,
+            "path": self.path,
+            "entries": self.count(),
+            "max_entries": self.max_entries,
+            "sequence": self.sequence,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped
+        }
+
+
+def create_history_store(backend: Optional[str] = None, **options):
+    backend = backend or HISTORY_BACKEND
+    if backend == "sqlite":
+        return SQLiteHistoryStore(**options)
+    if backend == "memory":
+        return MemoryHistoryStore(**options)
+    raise ValueError(f"Backend d'historique inconnu: {backend}")
@@ -0,0 +1,125 @@
+import random
+import threading
+from collections import deque
+from typing import Dict, Iterable, Optional
+
+from config import (
+    SOCKET_TIMEOUT, LATENCY_WINDOW, LATENCY_MIN_SAMPLES, LATENCY_TIMEOUT_FACTOR,
+    LATENCY_MIN_TIMEOUT, HEDGE_ENABLED, HEDGE_PERCENTILE, HEDGE_MIN_DELAY,
+    RETRY_BACKOFF_BASE, RETRY_BACKOFF_MAX
+)
+
+
+def jittered_backoff(attempt: int, remaining: Optional[float] = None) -> float:
+    """Backoff exponentiel à jitter complet, borné par le temps restant avant l'échéance"""
+    delay = random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_BASE * 2 ** attempt))
+    if remaining is not None:
+        delay = min(delay, max(remaining, 0.0))
+    return delay
+
+
+class _NodeLatency:
+    def __init__(self, window: int):
+        self.samples = deque(maxlen=window)
+        self.requests = 0
+        self.timeouts = 0
+        self.consecutive_timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+
+class LatencyTracker:
+    """
+    Distribution glissante des latences de chaque nœud: les timeouts et le
+    délai de hedging sont dérivés des percentiles observés. Seules les réponses
+    reçues alimentent la fenêtre; les timeouts sont comptés à part.
+    """
+
+    def __init__(
+        self,
+        node_ids: Iterable[int],
+        window: int = LATENCY_WINDOW,
+        min_samples: int = LATENCY_MIN_SAMPLES
+    ):
+        self.min_samples = min_samples
+        self._nodes: Dict[int, _NodeLatency] = {
+            node_id: _NodeLatency(window) for node_id in node_ids
+        }
+        self._lock = threading.Lock()
+
+    def record(self, node_id: int, latency: float):
+        with self._lock:
+            node = self._nodes[node_id]
+            node.samples.append(latency)
+            node.requests += 1
+            node.consecutive_timeouts = 0
+
+    def record_timeout(self, node_id: int, elapsed: float):
+        # Échantillon censuré (la vraie latence est > elapsed): l'ajouter à la fenêtre
+        # ferait du timeout lui-même le p99 dès 1% de pertes
+        with self._lock:
+            node = self._nodes[node_id]
+            node.requests += 1
+            node.timeouts += 1
+            node.consecutive_timeouts += 1
+
+    def record_hedge(self, node_id: int, won: bool = False):
+        with self._lock:
+            node = self._nodes[node_id]
+            if won:
+                node.hedge_wins += 1
+            else:
+                node.hedges += 1
+
+    def percentile(
+        self, node_id: int, percent: float, min_samples: Optional[int] = None
+    ) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._nodes[node_id].samples)
+        if not samples or len(samples) < (self.min_samples if min_samples is None else min_samples):
+            return None
+        rank = max(int(round(percent / 100 * len(samples))) - 1, 0)
+        return samples[min(rank, len(samples) - 1)]
+
+    def timeout_for(self, node_id: int) -> float:
+        p99 = self.percentile(node_id, 99)
+        if p99 is None:
+            return SOCKET_TIMEOUT
+        with self._lock:
+            consecutive = self._nodes[node_id].consecutive_timeouts
+        # Un nœud réellement ralenti ne produit plus d'échantillons: le timeout
+        # double à chaque timeout consécutif jusqu'à la prochaine réponse
+        timeout = max(p99 * LATENCY_TIMEOUT_FACTOR, LATENCY_MIN_TIMEOUT) * 2 ** min(consecutive, 16)
+        return min(timeout, SOCKET_TIMEOUT)
+
+    def hedge_delay(self, node_id: int) -> Optional[float]:
+        if not HEDGE_ENABLED:
+            return None
+        threshold = self.percentile(node_id, HEDGE_PERCENTILE)
+        if threshold is None:
+            return None
+        return max(threshold, HEDGE_MIN_DELAY)
+
+    def get_stats(self, node_id: int) -> Dict:
+        with self._lock:
+            node = self._nodes[node_id]
+            requests, timeouts = node.requests, node.timeouts
+            hedges, hedge_wins = node.hedges, node.hedge_wins
+            samples = len(node.samples)
+
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return round(value, 4) if value is not None else None
+
+        return {
+            "samples": samples,
+            "latency_p50": rounded(self.percentile(node_id, 50)),
+            "latency_p95": rounded(self.percentile(node_id, 95)),
+            "latency_p99": rounded(self.percentile(node_id, 99)),
+            "effective_timeout": round(self.timeout_for(node_id), 4),
+            "hedge_delay": rounded(self.hedge_delay(node_id)),
+            "timeouts": timeouts,
+            "timeout_rate": round(timeouts / requests * 100, 1) if requests else 0.0,
+            "hedges": hedges,
+            "hedge_wins": hedge_wins,
+            "hedge_rate": round(hedges / requests * 100, 1) if requests else 0.0
+        }
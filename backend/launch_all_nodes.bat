@@ -8,12 +8,7 @@ if exist "..\venv\Scripts\activate.bat" call ..\venv\Scripts\activate.bat
 
 REM 
 echo Démarrage des nœuds...
-start /B python node_philosopher.py 1
-start /B python node_philosopher.py 2
-start /B python node_philosopher.py 3
-start /B python node_philosopher.py 4
-start /B python node_philosopher.py 5
-start /B python node_philosopher.py 6
+start /B python supervisor.py
 
 echo.
 echo Tous les 6 nœuds démarrés en arrière-plan!
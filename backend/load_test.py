@@ -0,0 +1,339 @@
+import argparse
+import json
+import os
+import platform
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+from config import CATEGORIES, QUOTES_JSON, PHILOSOPHERS
+from histogram import LatencyHistogram
+from utils import load_json_file
+
+API_BASE = "http://127.0.0.1:8000"
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+METHODS = ["sequential", "parallel", "async", "embedded"]
+
+BASE_CONTEXTS = [
+    ("se sentir stressé au travail", ["stress", "travail", "pression"], "Happiness and well-being"),
+    ("comment vivre une vie vertueuse", ["vertu", "éthique", "moralité"], "Ethics and behavior"),
+    ("trouver la sagesse dans la vie", ["sagesse", "connaissance", "vérité"], "Wisdom"),
+    ("comprendre la liberté humaine", ["liberté", "choix", "autonomie"], "Freedom"),
+    ("chercher le bonheur authentique", ["bonheur", "joie", "satisfaction"], "Happiness and well-being"),
+    ("préparer un examen difficile", ["apprentissage", "étude", "discipline"], "Knowledge and learning"),
+    ("rester motivé malgré l'échec", ["persévérance", "échec", "action"], "Action and discipline"),
+    ("douter de ses croyances", ["foi", "doute", "croyance"], "Faith"),
+    ("prendre une décision rationnelle", ["raison", "logique", "jugement"], "Reason and logic"),
+    ("réagir face à une injustice", ["justice", "société", "loi"], "Society and Justice"),
+    ("accepter de vieillir", ["vie", "temps", "nature humaine"], "Life and human nature"),
+    ("feeling lost after a breakup", ["love", "suffering", "meaning"], "Life and human nature"),
+    ("building a daily habit", ["habit", "discipline", "excellence"], "Action and discipline"),
+    ("learning to know myself", ["self-knowledge", "introspection", "wisdom"], "Wisdom"),
+    ("standing up to an unfair boss", ["courage", "justice", "dignity"], "Society and Justice"),
+    ("choosing between duty and desire", ["duty", "will", "morality"], "Ethics and behavior"),
+    ("looking for meaning in suffering", ["suffering", "faith", "hope"], "Faith"),
+    ("wanting to be free of others' expectations", ["freedom", "independence", "will"], "Freedom"),
+]
+
+
+class ContextCorpus:
+    """Realistic /recommend payloads: hand-written situations enriched with keywords from the quote corpus"""
+
+    def __init__(self, seed: int = 42, category_drop_rate: float = 0.3):
+        self.rng = random.Random(seed)
+        self.category_drop_rate = category_drop_rate
+        self.vocabulary: Dict[str, List[str]] = {name: [] for name in CATEGORIES.values()}
+
+        for quote in load_json_file(QUOTES_JSON).get("quotes", []):
+            words = self.vocabulary.setdefault(quote["categoryName"], [])
+            words.extend(quote.get("keywords", []))
+        self._lock = threading.Lock()
+
+    def sample(self) -> Dict:
+        with self._lock:
+            context, keywords, category = self.rng.choice(BASE_CONTEXTS)
+            vocabulary = self.vocabulary.get(category) or []
+            extra = self.rng.sample(vocabulary, min(len(vocabulary), self.rng.randint(0, 3)))
+            drop_category = self.rng.random() < self.category_drop_rate
+
+        return {
+            "context": context,
+            "keywords": list(dict.fromkeys(keywords + extra)),
+            "category": None if drop_category else category
+        }
+
+
+class LevelResult:
+    """Client-side measurements for one (method, mode, level) run"""
+
+    def __init__(self, method: str, mode: str, level: float):
+        self.method = method
+        self.mode = mode
+        self.level = level
+        self.latency = LatencyHistogram()
+        self.server_time = LatencyHistogram()
+        self.errors: Dict[str, int] = {}
+        self.ok = 0
+        self.cached = 0
+        self.coalesced = 0
+        self.started = 0.0
+        self.finished = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self, latency: float, data: Dict):
+        self.latency.record(latency)
+        self.server_time.record(data.get("processing_time") or 0.0)
+        with self._lock:
+            self.ok += 1
+            self.cached += bool(data.get("cached"))
+            self.coalesced += bool(data.get("coalesced"))
+
+    def record_error(self, kind: str):
+        with self._lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+    def to_dict(self) -> Dict:
+        errors = sum(self.errors.values())
+        total = self.ok + errors
+        elapsed = max(self.finished - self.started, 1e-9)
+        return {
+            "method": self.method,
+            "mode": self.mode,
+            "level": self.level,
+            "requests": total,
+            "successes": self.ok,
+            "errors": dict(self.errors),
+            "error_rate": round(errors / total * 100, 2) if total else 0.0,
+            "duration": round(elapsed, 3),
+            "throughput": round(self.ok / elapsed, 2),
+            "cached": self.cached,
+            "coalesced": self.coalesced,
+            "latency": self.latency.summary(),
+            "server_processing": self.server_time.summary()
+        }
+
+
+class LoadGenerator:
+    def __init__(self, base_url: str, corpus: ContextCorpus, timeout: float = 10.0, use_cache: bool = False):
+        self.base_url = base_url.rstrip("/")
+        self.corpus = corpus
+        self.timeout = timeout
+        self.use_cache = use_cache
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def send(self, method: str, result: LevelResult, scheduled_at: Optional[float] = None):
+        """One /recommend call; open-loop latency is measured from the scheduled arrival time"""
+        payload = {**self.corpus.sample(), "method": method, "use_cache": self.use_cache}
+        start = scheduled_at if scheduled_at is not None else time.perf_counter()
+        try:
+            response = self._session().post(
+                f"{self.base_url}/recommend", json=payload, timeout=self.timeout
+            )
+            latency = time.perf_counter() - start
+            if response.status_code == 200:
+                result.record_success(latency, response.json())
+            else:
+                result.record_error(f"http_{response.status_code}")
+        except requests.Timeout:
+            result.record_error("timeout")
+        except requests.RequestException as e:
+            result.record_error(type(e).__name__)
+
+    def run_closed_loop(self, method: str, concurrency: int, duration: float, max_requests: Optional[int]) -> LevelResult:
+        """`concurrency` clients each issuing the next request as soon as the previous one returns"""
+        result = LevelResult(method, "closed", concurrency)
+        deadline = time.perf_counter() + duration
+        issued = iter(range(max_requests)) if max_requests else None
+        issued_lock = threading.Lock()
+
+        def client():
+            while time.perf_counter() < deadline:
+                if issued is not None:
+                    with issued_lock:
+                        if next(issued, None) is None:
+                            return
+                self.send(method, result)
+
+        result.started = time.perf_counter()
+        threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result.finished = time.perf_counter()
+        return result
+
+    def run_open_loop(self, method: str, rate: float, duration: float, max_in_flight: int, seed: int) -> LevelResult:
+        """Poisson arrivals at `rate` req/s, independent of how fast the server answers"""
+        result = LevelResult(method, "open", rate)
+        rng = random.Random(seed)
+        in_flight = threading.BoundedSemaphore(max_in_flight)
+
+        def task(scheduled_at: float):
+            try:
+                self.send(method, result, scheduled_at)
+            finally:
+                in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+            result.started = time.perf_counter()
+            next_arrival = result.started
+            end = result.started + duration
+            while next_arrival < end:
+                delay = next_arrival - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                if in_flight.acquire(blocking=False):
+                    executor.submit(task, next_arrival)
+                else:
+                    result.record_error("dropped")
+                next_arrival += rng.expovariate(rate)
+        result.finished = time.perf_counter()
+        return result
+
+
+def spawn_cluster(port: int, startup_timeout: float = 30.0) -> List[subprocess.Popen]:
+    """Starts the supervised nodes and the coordinator locally and waits for every node to be active"""
+    processes = [
+        subprocess.Popen([sys.executable, "supervisor.py"], cwd=BACKEND_DIR),
+        subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "server:app", "--port", str(port), "--log-level", "warning"],
+            cwd=BACKEND_DIR
+        )
+    ]
+    deadline = time.time() + startup_timeout
+    while time.time() < deadline:
+        try:
+            requests.post(f"http://127.0.0.1:{port}/scan", timeout=2)
+            status = requests.get(f"http://127.0.0.1:{port}/status", timeout=2).json()
+            if status["active_nodes"] == len(PHILOSOPHERS):
+                return processes
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+
+    stop_cluster(processes)
+    raise RuntimeError("Cluster did not become ready in time")
+
+
+def stop_cluster(processes: List[subprocess.Popen]):
+    for process in reversed(processes):
+        if process.poll() is None:
+            process.send_signal(signal.SIGINT)
+            try:
+                process.wait(15)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+def print_result(result: Dict):
+    latency = result["latency"]
+
+    def ms(value: Optional[float]) -> str:
+        return f"{value * 1000:8.1f}" if value is not None else "       -"
+
+    unit = "clients" if result["mode"] == "closed" else "req/s"
+    print(
+        f"{result['method']:<11} {result['mode']:<6} {result['level']:>6g} {unit:<7} "
+        f"{result['throughput']:>8.1f} req/s  "
+        f"p50{ms(latency['p50'])}ms p90{ms(latency['p90'])}ms "
+        f"p99{ms(latency['p99'])}ms p99.9{ms(latency['p99.9'])}ms  "
+        f"errors {result['error_rate']:5.1f}%"
+    )
+
+
+def parse_levels(value: str) -> List[float]:
+    return [float(level) for level in value.split(",") if level.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator and throughput benchmark for /recommend")
+    parser.add_argument("--url", default=API_BASE, help="Coordinator base URL")
+    parser.add_argument("--methods", default=",".join(METHODS), help="Comma-separated broadcast methods")
+    parser.add_argument("--concurrency", default="1,4,16",
+                        help="Closed-loop concurrency levels (empty to skip)")
+    parser.add_argument("--rates", default="",
+                        help="Open-loop arrival rates in req/s, e.g. 10,50,100 (empty to skip)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--requests", type=int, default=None,
+                        help="Stop a closed-loop level after this many requests")
+    parser.add_argument("--warmup", type=int, default=5, help="Warm-up requests per method")
+    parser.add_argument("--max-in-flight", type=int, default=256,
+                        help="Open-loop cap on outstanding requests (excess arrivals are dropped)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="HTTP timeout per request")
+    parser.add_argument("--use-cache", action="store_true",
+                        help="Let the coordinator serve repeated requests from its consensus cache")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for contexts and arrivals")
+    parser.add_argument("--output", default="load_results.json", help="JSON results file")
+    parser.add_argument("--spawn", action="store_true",
+                        help="Start the nodes and the coordinator locally for the run")
+    parser.add_argument("--port", type=int, default=8000, help="Coordinator port with --spawn")
+    args = parser.parse_args()
+
+    methods = [m for m in args.methods.split(",") if m]
+    unknown = [m for m in methods if m not in METHODS]
+    if unknown:
+        parser.error(f"Unknown methods: {unknown}")
+
+    processes = []
+    base_url = args.url
+    if args.spawn:
+        base_url = f"http://127.0.0.1:{args.port}"
+        print(f"Starting nodes and coordinator on port {args.port}...")
+        processes = spawn_cluster(args.port)
+
+    corpus = ContextCorpus(seed=args.seed)
+    generator = LoadGenerator(base_url, corpus, timeout=args.timeout, use_cache=args.use_cache)
+    results = []
+
+    try:
+        for method in methods:
+            warmup = LevelResult(method, "warmup", 1)
+            for _ in range(args.warmup):
+                generator.send(method, warmup)
+
+            for concurrency in parse_levels(args.concurrency):
+                result = generator.run_closed_loop(method, int(concurrency), args.duration, args.requests)
+                results.append(result.to_dict())
+                print_result(results[-1])
+
+            for rate in parse_levels(args.rates):
+                result = generator.run_open_loop(method, rate, args.duration, args.max_in_flight, args.seed)
+                results.append(result.to_dict())
+                print_result(results[-1])
+    finally:
+        if processes:
+            print("Stopping local cluster...")
+            stop_cluster(processes)
+
+    report = {
+        "timestamp": time.time(),
+        "target": base_url,
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count()
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
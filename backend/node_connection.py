@@ -0,0 +1,191 @@
+import socket
+import threading
+import time
+import itertools
+import logging
+from concurrent.futures import Future
+from typing import Dict, Optional
+
+from config import (
+    PROTOCOL_VERSION, MSG_TYPE_HELLO, MSG_TYPE_HELLO_ACK
+)
+from protocol import (
+    FrameDecoder, ProtocolError, LegacyNodeError, decode_payload, encode_frame
+)
+from utils import merge_timings
+
+logger = logging.getLogger(__name__)
+
+
+class NodeConnection:
+    """Connexion persistante et multiplexée vers un nœud philosophe (protocole v2)"""
+
+    def __init__(self, philosopher_id: int, host: str, port: int, timeout: float):
+        self.philosopher_id = philosopher_id
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+        self.sock = None
+        self.protocol_version = None
+        self.closed = False
+        self.created_at = time.time()
+        self.last_used = self.created_at
+
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._reader = None
+
+    def connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        try:
+            sock.sendall(encode_frame(0, {
+                "type": MSG_TYPE_HELLO,
+                "version": PROTOCOL_VERSION
+            }))
+
+            decoder = FrameDecoder()
+            frames = []
+            while not frames:
+                data = sock.recv(4096)
+                if not data:
+                    raise LegacyNodeError(
+                        f"Le nœud sur le port {self.port} a refusé la poignée de main v{PROTOCOL_VERSION}"
+                    )
+                frames = decoder.feed(data)
+
+            _, ack = frames[0]
+            if ack.get("type") != MSG_TYPE_HELLO_ACK:
+                raise ProtocolError(f"Réponse de poignée de main inattendue: {ack.get('type')}")
+
+            self.protocol_version = ack.get("version", 1)
+            if self.protocol_version < PROTOCOL_VERSION:
+                raise LegacyNodeError(
+                    f"Le nœud sur le port {self.port} annonce la version {self.protocol_version}"
+                )
+        except Exception:
+            sock.close()
+            raise
+
+        sock.settimeout(None)
+        self.sock = sock
+        self._reader = threading.Thread(
+            target=self._read_loop,
+            args=(decoder,),
+            name=f"node-conn-{self.philosopher_id}",
+            daemon=True
+        )
+        self._reader.start()
+
+    @property
+    def alive(self) -> bool:
+        return not self.closed and self.sock is not None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def submit(self, message: Dict) -> Future:
+        future = Future()
+
+        with self._lock:
+            if not self.alive:
+                raise ConnectionError(f"Connexion vers le port {self.port} fermée")
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            sock = self.sock
+
+        future.request_id = request_id
+        future.parse_time = 0.0
+        send_start = time.perf_counter()
+        try:
+            frame = encode_frame(request_id, message)
+            with self._send_lock:
+                sock.sendall(frame)
+            future.sent_at = time.perf_counter()
+            future.send_time = future.sent_at - send_start
+        except OSError as e:
+            self.discard(request_id)
+            self._fail(ConnectionError(f"Échec d'envoi vers le port {self.port}: {e}"))
+            raise ConnectionError(str(e))
+
+        return future
+
+    def request(self, message: Dict, timeout: Optional[float] = None) -> Dict:
+        future = self.submit(message)
+        try:
+            response = future.result(timeout if timeout is not None else self.timeout)
+            return merge_timings(response, **self.phase_timings(future))
+        finally:
+            self.discard(future.request_id)
+
+    def discard(self, request_id: int):
+        with self._lock:
+            self._pending.pop(request_id, None)
+
+    @staticmethod
+    def phase_timings(future: Future) -> Dict[str, float]:
+        """Phases envoi / attente réseau / décodage d'une requête résolue"""
+        response = future.result()
+        compute = response.get("timings", {}).get("compute", 0.0)
+        waited = future.resolved_at - future.sent_at - future.parse_time
+        return {
+            "send": future.send_time,
+            "compute": compute,
+            "receive": max(waited - compute, 0.0),
+            "parse": future.parse_time
+        }
+
+    def _read_loop(self, decoder: FrameDecoder):
+        try:
+            data = b""
+            while True:
+                for request_id, payload in decoder.feed_raw(data):
+                    parse_start = time.perf_counter()
+                    message = decode_payload(payload)
+                    self._resolve(request_id, message, time.perf_counter() - parse_start)
+
+                data = self.sock.recv(65536)
+                if not data:
+                    raise ConnectionError(f"Connexion fermée par le nœud sur le port {self.port}")
+        except Exception as e:
+            if not self.closed:
+                logger.debug(f"Lecteur de connexion {self.port} arrêté: {e}")
+            self._fail(e if isinstance(e, ConnectionError) else ConnectionError(str(e)))
+
+    def _resolve(self, request_id: int, message: Dict, parse_time: float = 0.0):
+        with self._lock:
+            future = self._pending.pop(request_id, None)
+
+        if future is not None and not future.done():
+            future.parse_time = parse_time
+            future.resolved_at = time.perf_counter()
+            future.set_result(message)
+
+    def _fail(self, error: Exception):
+        with self._lock:
+            self.closed = True
+            pending = list(self._pending.values())
+            self._pending.clear()
+
+        for future in pending:
+            if not future.done():
+                future.set_exception(error)
+        self._close_socket()
+
+    def close(self):
+        self._fail(ConnectionError("Connexion fermée"))
+
+    def _close_socket(self):
+        sock, self.sock = self.sock, None
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        sock.close()
@@ -1,18 +1,37 @@
 import socket
+import selectors
+import queue
 import json
 import logging
-import sys
+import signal
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from typing import Dict, List, Optional
 
 from config import (
     HOST, SOCKET_TIMEOUT, PHILOSOPHERS, 
     MSG_TYPE_REQUEST, MSG_TYPE_HEARTBEAT, MSG_TYPE_SHUTDOWN,
-    ACCEPT_THRESHOLD, QUOTES_JSON
+    MSG_TYPE_HELLO, MSG_TYPE_HELLO_ACK, MSG_TYPE_RELOAD, MSG_TYPE_STATS, PROTOCOL_VERSION,
+    ACCEPT_THRESHOLD, QUOTES_JSON, SCORING_ENGINE,
+    NODE_SERVER_MODE, NODE_BACKLOG, NODE_WORKER_POOL_SIZE,
+    NODE_SELECT_TIMEOUT, NODE_MAX_MESSAGE_SIZE,
+    NODE_CACHE_SIZE, NODE_CACHE_TTL, NODE_DRAIN_TIMEOUT
 )
 from utils import (
     load_json_file, get_philosopher_quotes, select_best_quote,
-    format_response_message, parse_message, determine_vote
+    build_response_message, parse_message, determine_vote,
+    request_fingerprint
 )
+from cache import LRUCache
+from histogram import LatencyHistogram
+from tracing import SpanRecorder, trace_span, annotate
+from quote_index import QuoteIndex
+from vector_scoring import VectorizedScorer, NUMPY_AVAILABLE
+from protocol import FrameDecoder, ProtocolError, encode_raw_frame, is_framed
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,8 +40,33 @@ logging.basicConfig(
 )
 
 
+class ClientConnection:
+    """État d'une connexion cliente dans la boucle selector"""
+
+    def __init__(self, sock: socket.socket, address):
+        self.sock = sock
+        self.address = address
+        self.inbuf = bytearray()
+        self.outbuf = bytearray()
+        self.framed = None
+        self.decoder = None
+        self.reading = True
+        self.close_after_write = False
+        self.closed = False
+        self.events = 0
+
+
 class PhilosopherNode:
-    def __init__(self, philosopher_id: int):
+    def __init__(
+        self,
+        philosopher_id: int,
+        server_mode: Optional[str] = None,
+        backlog: Optional[int] = None,
+        worker_pool_size: Optional[int] = None,
+        scoring_engine: Optional[str] = None,
+        reuse_port: bool = False,
+        processes: int = 1
+    ):
         self.philosopher_id = philosopher_id
         self.config = PHILOSOPHERS[philosopher_id]
         
@@ -34,11 +78,42 @@ class PhilosopherNode:
         
         self.logger = logging.getLogger(f"Nœud-{self.name}")
         
+        self.scoring_engine = scoring_engine or SCORING_ENGINE
         self.quotes = []
+        self.index = None
+        self.scorer = None
+        self.corpus_version = 0
+        self.cache = LRUCache(NODE_CACHE_SIZE, NODE_CACHE_TTL)
         self._load_quotes()
         
+        self.server_mode = server_mode or NODE_SERVER_MODE
+        self.backlog = backlog or NODE_BACKLOG
+        self.worker_pool_size = worker_pool_size or NODE_WORKER_POOL_SIZE
+        self.reuse_port = reuse_port
+        self.processes = processes
+        
         self.socket = None
         self.running = False
+        self.start_error = None
+        
+        self._draining = False
+        self._drain_deadline = 0.0
+        self._shutdown_requested = False
+        self._in_flight = 0
+        
+        self.started_at = time.time()
+        self.requests_served = 0
+        self.requests_failed = 0
+        self.scoring_histogram = LatencyHistogram()
+        self._computing = 0
+        self._stats_lock = threading.Lock()
+        
+        self._selector = None
+        self._executor = None
+        self._completed = queue.Queue()
+        self._wakeup_recv = None
+        self._wakeup_send = None
+        self._connections = {}
         
         self.logger.info(
             f"Nœud philosophe initialisé: {self.name} "
@@ -47,42 +122,374 @@ class PhilosopherNode:
     
     def _load_quotes(self):
         quotes_data = load_json_file(QUOTES_JSON)
-        self.quotes = get_philosopher_quotes(quotes_data, self.philosopher_id)
-        self.logger.info(f"Chargement de {len(self.quotes)} citations pour {self.name}")
+        quotes = get_philosopher_quotes(quotes_data, self.philosopher_id)
+        self.logger.info(f"Chargement de {len(quotes)} citations pour {self.name}")
+        
+        if self.scoring_engine == "numpy" and not NUMPY_AVAILABLE:
+            self.logger.warning("NumPy indisponible, repli sur le moteur 'index'")
+            self.scoring_engine = "index"
+        
+        index = None
+        scorer = None
+        if self.scoring_engine in ("index", "numpy"):
+            index = QuoteIndex(quotes)
+            self.logger.info(f"Index inversé construit: {len(index.terms)} termes")
+        
+        if self.scoring_engine == "numpy":
+            scorer = VectorizedScorer(quotes, index)
+            self.logger.info("Moteur de scoring vectoriel (NumPy) activé")
+        
+        self.quotes, self.index, self.scorer = quotes, index, scorer
+        self.corpus_version += 1
+        self.cache.clear()
+    
+    def reload_quotes(self) -> int:
+        self._load_quotes()
+        self.logger.info(f"Corpus rechargé (version {self.corpus_version}), cache invalidé")
+        return len(self.quotes)
     
     def start(self):
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.reuse_port:
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
             
             self.socket.bind((HOST, self.port))
-            self.socket.listen(5)
+            self.socket.listen(self.backlog)
             
             self.running = True
             self.logger.info(
-                f" {self.name} écoute sur {HOST}:{self.port}"
+                f" {self.name} écoute sur {HOST}:{self.port} "
+                f"(mode={self.server_mode}, backlog={self.backlog}, "
+                f"reuse_port={self.reuse_port})"
             )
             
-            while self.running:
-                try:
-                    client_socket, address = self.socket.accept()
-                    self.logger.debug(f"Connexion depuis {address}")
-                    
-                    self._handle_client(client_socket)
-                    
-                except socket.timeout:
-                    continue
-                except Exception as e:
-                    self.logger.error(f"Erreur lors du traitement du client: {e}")
+            if self.server_mode == "legacy":
+                self._serve_blocking()
+            else:
+                self._serve_selector()
                     
         except Exception as e:
+            self.start_error = e
             self.logger.error(f"Échec du démarrage du nœud: {e}")
         finally:
             self.stop()
     
+    def _serve_blocking(self):
+        while self.running:
+            try:
+                client_socket, address = self.socket.accept()
+                self.logger.debug(f"Connexion depuis {address}")
+                
+                self._handle_client(client_socket)
+                
+            except socket.timeout:
+                continue
+            except Exception as e:
+                if not self.running:
+                    break
+                self.logger.error(f"Erreur lors du traitement du client: {e}")
+    
+    def _serve_selector(self):
+        self._selector = selectors.DefaultSelector()
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.worker_pool_size,
+            thread_name_prefix=f"scoring-{self.philosopher_id}"
+        )
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        
+        self.socket.setblocking(False)
+        self._selector.register(self.socket, selectors.EVENT_READ)
+        self._selector.register(self._wakeup_recv, selectors.EVENT_READ)
+        
+        while self.running or self._draining:
+            if self._shutdown_requested and self.running:
+                self._begin_drain()
+            if self._draining and self._drain_finished():
+                break
+            
+            for key, mask in self._selector.select(timeout=NODE_SELECT_TIMEOUT):
+                try:
+                    if key.fileobj is self.socket:
+                        if self.running:
+                            self._accept_connections()
+                    elif key.fileobj is self._wakeup_recv:
+                        self._drain_completed()
+                    else:
+                        self._service_connection(key.data, mask)
+                except Exception as e:
+                    self.logger.error(f"Erreur lors du traitement du client: {e}")
+                    if isinstance(key.data, ClientConnection):
+                        self._close_connection(key.data)
+    
+    def request_shutdown(self):
+        """Demande un arrêt propre depuis un autre thread ou un gestionnaire de signal"""
+        self._shutdown_requested = True
+        
+        if self.server_mode == "legacy":
+            self.running = False
+            if self.socket:
+                self.socket.close()
+        elif self._wakeup_send:
+            try:
+                self._wakeup_send.send(b"\0")
+            except OSError:
+                pass
+    
+    def _begin_drain(self):
+        """Cesse d'accepter des connexions et laisse terminer les requêtes en cours"""
+        if not self.running:
+            return
+        
+        self._accept_connections()
+        self._selector.unregister(self.socket)
+        self.socket.close()
+        self.socket = None
+        
+        self.running = False
+        self._draining = True
+        self._drain_deadline = time.time() + NODE_DRAIN_TIMEOUT
+        self.logger.info(f"Vidage en cours: {self._in_flight} requête(s) en traitement")
+    
+    def _drain_finished(self) -> bool:
+        pending_writes = any(conn.outbuf for conn in self._connections.values())
+        if self._in_flight == 0 and not pending_writes:
+            self.logger.info("Vidage terminé")
+            return True
+        if time.time() >= self._drain_deadline:
+            self.logger.warning(
+                f"Délai de vidage dépassé, {self._in_flight} requête(s) abandonnée(s)"
+            )
+            return True
+        return False
+    
+    def _accept_connections(self):
+        while True:
+            try:
+                client_socket, address = self.socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            
+            self.logger.debug(f"Connexion depuis {address}")
+            client_socket.setblocking(False)
+            conn = ClientConnection(client_socket, address)
+            self._connections[client_socket.fileno()] = conn
+            self._update_interest(conn)
+    
+    def _service_connection(self, conn: ClientConnection, mask: int):
+        if mask & selectors.EVENT_READ:
+            self._read_from(conn)
+        if mask & selectors.EVENT_WRITE and not conn.closed:
+            self._write_to(conn)
+    
+    def _read_from(self, conn: ClientConnection):
+        try:
+            data = conn.sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self._close_connection(conn)
+            return
+        
+        if not data:
+            if conn.inbuf:
+                self.logger.warning("Message invalide reçu")
+            self._close_connection(conn)
+            return
+        
+        if conn.framed is None:
+            conn.framed = is_framed(data)
+            if conn.framed:
+                conn.decoder = FrameDecoder()
+        
+        if conn.framed:
+            self._read_frames(conn, data)
+            return
+        
+        conn.inbuf += data
+        if len(conn.inbuf) > NODE_MAX_MESSAGE_SIZE:
+            self.logger.warning(f"Message trop volumineux depuis {conn.address}")
+            self._close_connection(conn)
+            return
+        
+        try:
+            message = json.loads(conn.inbuf.decode('utf-8'))
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            return
+        
+        conn.inbuf.clear()
+        conn.reading = False
+        self._update_interest(conn)
+        
+        if not isinstance(message, dict):
+            self.logger.warning("Message invalide reçu")
+            self._close_connection(conn)
+            return
+        
+        self._dispatch(conn, message)
+    
+    def _read_frames(self, conn: ClientConnection, data: bytes):
+        try:
+            frames = conn.decoder.feed(data)
+        except ProtocolError as e:
+            self.logger.warning(f"Trame invalide depuis {conn.address}: {e}")
+            self._close_connection(conn)
+            return
+        
+        for request_id, message in frames:
+            if conn.closed:
+                return
+            self._dispatch(conn, message, request_id)
+    
+    def _dispatch(
+        self, conn: ClientConnection, message: Dict, request_id: Optional[int] = None
+    ):
+        msg_type = message.get("type")
+        
+        if msg_type == MSG_TYPE_REQUEST:
+            self._in_flight += 1
+            future = self._executor.submit(self._process_request, message)
+            future.add_done_callback(
+                lambda f, conn=conn, request_id=request_id: self._complete(conn, request_id, f)
+            )
+        
+        elif msg_type == MSG_TYPE_RELOAD:
+            self._in_flight += 1
+            future = self._executor.submit(self._process_reload)
+            future.add_done_callback(
+                lambda f, conn=conn, request_id=request_id: self._complete(conn, request_id, f)
+            )
+        
+        elif msg_type == MSG_TYPE_HEARTBEAT:
+            self._queue_response(conn, self._heartbeat_response(), request_id)
+        
+        elif msg_type == MSG_TYPE_STATS:
+            self._queue_response(conn, self._stats_response(), request_id)
+        
+        elif msg_type == MSG_TYPE_HELLO and conn.framed:
+            self._queue_response(conn, json.dumps({
+                "type": MSG_TYPE_HELLO_ACK,
+                "version": min(message.get("version", 1), PROTOCOL_VERSION),
+                "philosopher_id": self.philosopher_id,
+                "philosopher": self.name
+            }), request_id)
+        
+        elif msg_type == MSG_TYPE_SHUTDOWN:
+            self.logger.info("Signal d'arrêt reçu")
+            self._close_connection(conn)
+            self._begin_drain()
+        
+        else:
+            self.logger.warning(f"Type de message inconnu: {msg_type}")
+            if not conn.framed:
+                self._close_connection(conn)
+    
+    def _complete(self, conn: ClientConnection, request_id: Optional[int], future):
+        try:
+            response = future.result()
+        except Exception as e:
+            self.logger.error(f"Erreur dans _process_request: {e}")
+            response = None
+        
+        self._completed.put((conn, request_id, response))
+        wakeup = self._wakeup_send
+        if wakeup is None:
+            return
+        try:
+            wakeup.send(b"\0")
+        except OSError:
+            pass
+    
+    def _drain_completed(self):
+        try:
+            while self._wakeup_recv.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+        
+        while True:
+            try:
+                conn, request_id, response = self._completed.get_nowait()
+            except queue.Empty:
+                return
+            
+            self._in_flight -= 1
+            if conn.closed:
+                continue
+            if response is None:
+                if not conn.framed:
+                    self._close_connection(conn)
+            else:
+                self._queue_response(conn, response, request_id)
+    
+    def _queue_response(
+        self, conn: ClientConnection, response: str, request_id: Optional[int] = None
+    ):
+        payload = response.encode('utf-8')
+        if conn.framed:
+            conn.outbuf += encode_raw_frame(request_id or 0, payload)
+        else:
+            conn.outbuf += payload
+            conn.close_after_write = True
+        self._update_interest(conn)
+    
+    def _write_to(self, conn: ClientConnection):
+        try:
+            sent = conn.sock.send(conn.outbuf)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            self._close_connection(conn)
+            return
+        
+        del conn.outbuf[:sent]
+        if not conn.outbuf and conn.close_after_write:
+            self._close_connection(conn)
+        else:
+            self._update_interest(conn)
+    
+    def _update_interest(self, conn: ClientConnection):
+        if conn.closed:
+            return
+        
+        events = 0
+        if conn.reading:
+            events |= selectors.EVENT_READ
+        if conn.outbuf:
+            events |= selectors.EVENT_WRITE
+        
+        if events == conn.events:
+            return
+        if conn.events == 0:
+            self._selector.register(conn.sock, events, conn)
+        elif events == 0:
+            self._selector.unregister(conn.sock)
+        else:
+            self._selector.modify(conn.sock, events, conn)
+        conn.events = events
+    
+    def _close_connection(self, conn: ClientConnection):
+        if conn.closed:
+            return
+        
+        if conn.events:
+            try:
+                self._selector.unregister(conn.sock)
+            except (KeyError, ValueError):
+                pass
+        conn.events = 0
+        conn.closed = True
+        self._connections.pop(conn.sock.fileno(), None)
+        try:
+            conn.sock.close()
+        except OSError:
+            pass
+    
     def _handle_client(self, client_socket: socket.socket):
         try:
-            data = client_socket.recv(4096).decode('utf-8')
+            data = self._recv_legacy_message(client_socket)
             
             if not data:
                 return
@@ -99,12 +506,13 @@ class PhilosopherNode:
                 client_socket.sendall(response.encode('utf-8'))
                 
             elif msg_type == MSG_TYPE_HEARTBEAT:
-                response = json.dumps({
-                    "type": "HEARTBEAT_ACK",
-                    "philosopher": self.name,
-                    "status": "en vie"
-                })
-                client_socket.sendall(response.encode('utf-8'))
+                client_socket.sendall(self._heartbeat_response().encode('utf-8'))
+            
+            elif msg_type == MSG_TYPE_RELOAD:
+                client_socket.sendall(self._process_reload().encode('utf-8'))
+            
+            elif msg_type == MSG_TYPE_STATS:
+                client_socket.sendall(self._stats_response().encode('utf-8'))
                 
             elif msg_type == MSG_TYPE_SHUTDOWN:
                 self.logger.info("Signal d'arrêt reçu")
@@ -115,7 +523,111 @@ class PhilosopherNode:
         finally:
             client_socket.close()
     
+    def _recv_legacy_message(self, client_socket: socket.socket) -> str:
+        buffer = bytearray()
+        
+        while len(buffer) <= NODE_MAX_MESSAGE_SIZE:
+            chunk = client_socket.recv(65536)
+            if not chunk:
+                break
+            buffer += chunk
+            if is_framed(buffer):
+                break
+            
+            try:
+                text = buffer.decode('utf-8')
+                json.loads(text)
+                return text
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                continue
+        
+        return buffer.decode('utf-8', errors='replace')
+    
+    def _heartbeat_response(self) -> str:
+        return json.dumps({
+            "type": "HEARTBEAT_ACK",
+            "philosopher": self.name,
+            "status": "en vie"
+        })
+    
+    def get_stats(self) -> Dict:
+        """Compteurs internes du nœud: charge, temps de scoring, cache et corpus"""
+        with self._stats_lock:
+            served, failed, computing = self.requests_served, self.requests_failed, self._computing
+        
+        return {
+            "philosopher_id": self.philosopher_id,
+            "philosopher": self.name,
+            "pid": os.getpid(),
+            "processes": self.processes,
+            "uptime": round(time.time() - self.started_at, 1),
+            "server_mode": self.server_mode,
+            "scoring_engine": self.scoring_engine,
+            "requests_served": served,
+            "requests_failed": failed,
+            "in_flight": max(self._in_flight, computing),
+            "computing": computing,
+            "scoring": self.scoring_histogram.summary(),
+            "scoring_histogram": self.scoring_histogram.to_dict(),
+            "cache": self.cache.get_stats(),
+            "corpus": {
+                "quotes": len(self.quotes),
+                "version": self.corpus_version,
+                "terms": len(self.index.terms) if self.index is not None else None
+            }
+        }
+    
+    def _stats_response(self) -> str:
+        return json.dumps({"type": "STATS_ACK", **self.get_stats()})
+    
+    def _process_reload(self) -> str:
+        count = self.reload_quotes()
+        return json.dumps({
+            "type": "RELOAD_ACK",
+            "philosopher": self.name,
+            "quotes": count,
+            "corpus_version": self.corpus_version,
+            "cache": self.cache.get_stats()
+        })
+    
     def _process_request(self, request: Dict) -> str:
+        return json.dumps(self._timed_response(request))
+    
+    def handle_request(self, request: Dict) -> Dict:
+        """Traite une requête sans passer par le réseau (mode embarqué)"""
+        return self._timed_response(request)
+    
+    def _timed_response(self, request: Dict) -> Dict:
+        trace = request.get("trace")
+        recorder = SpanRecorder(
+            trace["trace_id"], trace.get("parent_id"), self.name, self.philosopher_id
+        ) if trace else None
+        
+        with self._stats_lock:
+            self._computing += 1
+        start = time.perf_counter()
+        try:
+            with recorder.span("handle_request", philosopher=self.name) if recorder else nullcontext():
+                response = self._build_response(request)
+        except Exception:
+            with self._stats_lock:
+                self.requests_failed += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                self._computing -= 1
+        
+        self.scoring_histogram.record(elapsed)
+        with self._stats_lock:
+            self.requests_served += 1
+        
+        response = {**response, "timings": {"compute": elapsed}}
+        if recorder is not None:
+            response["spans"] = recorder.spans
+        return response
+    
+    def _build_response(self, request: Dict) -> Dict:
         context = request.get("context", "")
         keywords = request.get("keywords", [])
         category_name = request.get("category", "")
@@ -125,17 +637,30 @@ class PhilosopherNode:
             f"mots-clés={keywords}, catégorie='{category_name}'"
         )
         
-        best_quote = select_best_quote(
-            quotes=self.quotes,
-            context=context,
-            keywords=keywords,
-            category_name=category_name,
-            philosopher_weights=self.weight_categories
-        )
+        cache_key = (self.corpus_version, request_fingerprint(context, keywords, category_name))
+        with trace_span("cache_lookup"):
+            cached = self.cache.get(cache_key)
+            annotate(hit=cached is not None)
+        if cached is not None:
+            self.logger.info(
+                f"Réponse servie depuis le cache: vote={cached['vote']}, score={cached['score']}"
+            )
+            return cached
+        
+        with trace_span("score", engine=self.scoring_engine, quotes=len(self.quotes)):
+            response = self._compute_response(context, keywords, category_name)
+            annotate(vote=response["vote"], score=response["score"])
+        self.cache.put(cache_key, response)
+        return response
+    
+    def _compute_response(
+        self, context: str, keywords: List[str], category_name: str
+    ) -> Dict:
+        best_quote = self._select_best_quote(context, keywords, category_name)
         
         if not best_quote:
             self.logger.warning("Aucune citation trouvée!")
-            return self._format_no_quote_response()
+            return self._no_quote_response()
         
         score = best_quote.get("relevance_score", 0.0)
         vote = determine_vote(score, ACCEPT_THRESHOLD)
@@ -147,7 +672,7 @@ class PhilosopherNode:
             f"score={score}, vote={vote}"
         )
         
-        response = format_response_message(
+        response = build_response_message(
             philosopher_id=self.philosopher_id,
             philosopher_name=self.name,
             quote=best_quote,
@@ -158,6 +683,33 @@ class PhilosopherNode:
         
         return response
     
+    def _select_best_quote(
+        self, context: str, keywords: List[str], category_name: str
+    ) -> Optional[Dict]:
+        if self.scorer is not None:
+            return self.scorer.select_best_quote(
+                context=context,
+                keywords=keywords,
+                category_name=category_name,
+                philosopher_weights=self.weight_categories
+            )
+        
+        if self.index is not None:
+            return self.index.select_best_quote(
+                context=context,
+                keywords=keywords,
+                category_name=category_name,
+                philosopher_weights=self.weight_categories
+            )
+        
+        return select_best_quote(
+            quotes=self.quotes,
+            context=context,
+            keywords=keywords,
+            category_name=category_name,
+            philosopher_weights=self.weight_categories
+        )
+    
     def _generate_reasoning(
         self, quote: Dict, score: float, vote: str
     ) -> str:
@@ -201,8 +753,8 @@ class PhilosopherNode:
         
         return f"Score de pertinence: {score}"
     
-    def _format_no_quote_response(self) -> str:
-        return json.dumps({
+    def _no_quote_response(self) -> Dict:
+        return {
             "type": "RESPONSE",
             "philosopher_id": self.philosopher_id,
             "philosopher_name": self.name,
@@ -210,40 +762,86 @@ class PhilosopherNode:
             "score": 0.0,
             "vote": "Abstain",
             "reasoning": "Aucune citation appropriée trouvée"
-        })
+        }
     
     def stop(self):
         """Arrête le nœud"""
         self.running = False
+        
+        for conn in list(self._connections.values()):
+            self._close_connection(conn)
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._selector:
+            self._selector.close()
+            self._selector = None
+        for sock in (self._wakeup_recv, self._wakeup_send):
+            if sock:
+                sock.close()
+        self._wakeup_recv = self._wakeup_send = None
+        
         if self.socket:
             try:
                 self.socket.close()
                 self.logger.info(f" {self.name} arrêté")
             except:
                 pass
+            self.socket = None
 
 
-def run_node(philosopher_id: int):
-    node = PhilosopherNode(philosopher_id)
+def run_node(philosopher_id: int, **options) -> int:
+    node = PhilosopherNode(philosopher_id, **options)
+    
+    def handle_signal(signum, frame):
+        # Premier Ctrl+C: vidage normal; le second interrompt sans attendre
+        if signum == signal.SIGINT and node._shutdown_requested:
+            raise KeyboardInterrupt
+        node.logger.info(f"Signal {signal.Signals(signum).name} reçu, arrêt propre demandé")
+        node.request_shutdown()
+    
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
     try:
         node.start()
     except KeyboardInterrupt:
         print(f"\n{node.name} interrompu par l'utilisateur")
     finally:
         node.stop()
-
+    return 1 if node.start_error else 0
 
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        phil_id = int(sys.argv[1])
-        if phil_id not in PHILOSOPHERS:
-            print(f"Erreur: ID philosophe invalide {phil_id}. Doit être 1-6")
-            sys.exit(1)
-        
-        print(f"Démarrage du nœud {PHILOSOPHERS[phil_id]['name']}...")
-        run_node(phil_id)
-    else:
+    parser = argparse.ArgumentParser(description="Nœud philosophe PhiloNodes")
+    parser.add_argument("philosopher_id", type=int, nargs="?", default=None,
+                        help="Identifiant du philosophe (1-6)")
+    parser.add_argument("--mode", choices=["selector", "legacy"], default=None,
+                        help="Boucle serveur (défaut: NODE_SERVER_MODE)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Threads de scoring (défaut: NODE_WORKER_POOL_SIZE)")
+    parser.add_argument("--engine", choices=["linear", "index", "numpy"], default=None,
+                        help="Moteur de scoring (défaut: SCORING_ENGINE)")
+    parser.add_argument("--reuse-port", action="store_true",
+                        help="Active SO_REUSEPORT pour partager le port entre plusieurs processus")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Nombre de processus partageant le port (renseigné par le superviseur)")
+    args = parser.parse_args()
+    
+    if args.philosopher_id is None:
         print("Usage: python node_philosopher.py <philosopher_id>")
         print("Démarrage de Kant (nœud 2) par défaut...")
-        run_node(2)
\ No newline at end of file
+        args.philosopher_id = 2
+    elif args.philosopher_id not in PHILOSOPHERS:
+        print(f"Erreur: ID philosophe invalide {args.philosopher_id}. Doit être 1-6")
+        raise SystemExit(1)
+    else:
+        print(f"Démarrage du nœud {PHILOSOPHERS[args.philosopher_id]['name']}...")
+    
+    raise SystemExit(run_node(
+        args.philosopher_id,
+        server_mode=args.mode,
+        worker_pool_size=args.workers,
+        scoring_engine=args.engine,
+        reuse_port=args.reuse_port,
+        processes=args.processes
+    ))
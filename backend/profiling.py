@@ -1,12 +1,17 @@
 import time
 import json
 import logging
+import math
+import threading
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from collections import deque
 import statistics
 import functools
 
+from config import HISTOGRAM_WINDOWS
+from histogram import LatencyHistogram, WindowedHistogram
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,29 +27,111 @@ class ProfileResult:
     node_timings: Dict[int, float]
     context: str
     timestamp: float
+    node_phase_timings: Dict[int, Dict[str, float]] = field(default_factory=dict)
+
+
+def node_timings_from(responses: Dict[int, Optional[Dict]]) -> Dict[int, float]:
+    """Total per-node time taken from each response's "timings" (0.0 for failures)"""
+    return {
+        phil_id: (response or {}).get("timings", {}).get("total", 0.0)
+        for phil_id, response in responses.items()
+    }
+
+
+def node_phase_timings_from(responses: Dict[int, Optional[Dict]]) -> Dict[int, Dict[str, float]]:
+    return {
+        phil_id: dict(response["timings"])
+        for phil_id, response in responses.items()
+        if response and "timings" in response
+    }
+
+
+class MethodTotals:
+    """Running totals for one broadcast method, updated as each result is recorded"""
+    
+    def __init__(self):
+        self.squared_durations = 0.0
+        self.success_rates = 0.0
+        self.total_requests = 0
+        self.total_successes = 0
+        self.node_phases: Dict[int, Dict[str, List[float]]] = {}
+    
+    def add(self, result: ProfileResult):
+        self.squared_durations += result.duration ** 2
+        if result.active_nodes > 0:
+            self.success_rates += result.successful_responses / result.active_nodes * 100
+        self.total_requests += result.active_nodes
+        self.total_successes += result.successful_responses
+        for phil_id, phases in result.node_phase_timings.items():
+            node_phases = self.node_phases.setdefault(phil_id, {})
+            for phase, value in phases.items():
+                total = node_phases.setdefault(phase, [0.0, 0])
+                total[0] += value
+                total[1] += 1
 
 
 class Profiler:
     def __init__(self, max_history: int = 100):
         self.max_history = max_history
         self.results = deque(maxlen=max_history)
-        self.sequential_results = deque(maxlen=max_history)
-        self.parallel_results = deque(maxlen=max_history)
+        self.method_results: Dict[str, deque] = {
+            "sequential": deque(maxlen=max_history),
+            "parallel": deque(maxlen=max_history)
+        }
+        self.sequential_results = self.method_results["sequential"]
+        self.parallel_results = self.method_results["parallel"]
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.window_histograms: Dict[str, Dict[int, WindowedHistogram]] = {}
+        self.node_histograms: Dict[str, Dict[int, LatencyHistogram]] = {}
+        self.totals: Dict[str, MethodTotals] = {}
+        self._lock = threading.Lock()
+        for method in self.method_results:
+            self._ensure_histograms(method)
         logger.info("Profiler initialized")
+    
+    def _ensure_histograms(self, method: str):
+        if method not in self.histograms:
+            self.histograms[method] = LatencyHistogram()
+            self.window_histograms[method] = {
+                window: WindowedHistogram(window) for window in HISTOGRAM_WINDOWS
+            }
+            self.node_histograms[method] = {}
+            self.totals[method] = MethodTotals()
         
     def record_result(self, result: ProfileResult):
-        self.results.append(result)
-        
-        if result.method == "sequential":
-            self.sequential_results.append(result)
-            logger.info(f"Recorded sequential result: {result.duration:.3f}s")
-        elif result.method == "parallel":
-            self.parallel_results.append(result)
-            logger.info(f"Recorded parallel result: {result.duration:.3f}s")
+        with self._lock:
+            self.results.append(result)
+            self.method_results.setdefault(result.method, deque(maxlen=self.max_history)).append(result)
+            self._record_histograms(result)
+        logger.info(f"Recorded {result.method} result: {result.duration:.3f}s")
+    
+    def _record_histograms(self, result: ProfileResult):
+        self._ensure_histograms(result.method)
+        self.histograms[result.method].record(result.duration)
+        self.totals[result.method].add(result)
+        for histogram in self.window_histograms[result.method].values():
+            histogram.record(result.duration, now=result.end_time)
+        
+        node_histograms = self.node_histograms[result.method]
+        for phil_id, duration in result.node_timings.items():
+            # Failed nodes report 0.0: they would drag every percentile down
+            if duration > 0:
+                if phil_id not in node_histograms:
+                    node_histograms[phil_id] = LatencyHistogram()
+                node_histograms[phil_id].record(duration)
     
     def get_statistics(self) -> Dict[str, Any]:
-        seq_stats = self._calculate_stats(list(self.sequential_results))
-        par_stats = self._calculate_stats(list(self.parallel_results))
+        with self._lock:
+            methods = list(self.method_results)
+            method_stats = {
+                method: {
+                    **self._calculate_stats(method),
+                    **self._latency_stats(method)
+                }
+                for method in methods
+            }
+        seq_stats = method_stats["sequential"]
+        par_stats = method_stats["parallel"]
         
         comparison = {}
         if seq_stats["count"] > 0 and par_stats["count"] > 0:
@@ -59,13 +146,44 @@ class Profiler:
             }
         
         return {
-            "sequential": seq_stats,
-            "parallel": par_stats,
+            **method_stats,
             "comparison": comparison
         }
     
-    def _calculate_stats(self, results: List[ProfileResult]) -> Dict[str, Any]:
-        if not results:
+    def _latency_stats(self, method: str) -> Dict[str, Any]:
+        """Percentiles over the whole run and the sliding windows, per method and per node"""
+        now = time.time()
+        return {
+            "latency": self.histograms[method].summary(),
+            "latency_windows": {
+                f"{window}s": histogram.snapshot(now).summary()
+                for window, histogram in self.window_histograms[method].items()
+            },
+            "node_latency": {
+                phil_id: histogram.summary()
+                for phil_id, histogram in sorted(self.node_histograms[method].items())
+            }
+        }
+    
+    def get_node_latency(self) -> Dict[int, Dict[str, Any]]:
+        """Per-node percentiles across every broadcast method"""
+        by_node: Dict[int, List[LatencyHistogram]] = {}
+        with self._lock:
+            for node_histograms in self.node_histograms.values():
+                for phil_id, histogram in node_histograms.items():
+                    by_node.setdefault(phil_id, []).append(histogram)
+        
+        return {
+            phil_id: LatencyHistogram.merged(histograms).summary()
+            for phil_id, histograms in sorted(by_node.items())
+        }
+    
+    def _calculate_stats(self, method: str) -> Dict[str, Any]:
+        """Whole-run summary read from the method's histogram and running totals (no rescan)"""
+        histogram = self.histograms[method]
+        totals = self.totals[method]
+        count = histogram.count
+        if count == 0:
             return {
                 "count": 0,
                 "avg_duration": 0,
@@ -74,29 +192,36 @@ class Profiler:
                 "std_duration": 0,
                 "avg_success_rate": 0,
                 "total_requests": 0,
-                "total_successes": 0
+                "total_successes": 0,
+                "node_phases": {}
             }
         
-        durations = [r.duration for r in results]
-        success_rates = [
-            (r.successful_responses / r.active_nodes * 100) if r.active_nodes > 0 else 0 
-            for r in results
-        ]
+        mean = histogram.total / count
+        variance = (totals.squared_durations - count * mean ** 2) / (count - 1) if count > 1 else 0.0
         
         return {
-            "count": len(results),
-            "avg_duration": round(statistics.mean(durations), 4),
-            "min_duration": round(min(durations), 4),
-            "max_duration": round(max(durations), 4),
-            "std_duration": round(statistics.stdev(durations), 4) if len(durations) > 1 else 0,
-            "avg_success_rate": round(statistics.mean(success_rates), 2),
-            "total_requests": sum(r.active_nodes for r in results),
-            "total_successes": sum(r.successful_responses for r in results)
+            "count": count,
+            "avg_duration": round(mean, 4),
+            "min_duration": round(histogram.min, 4),
+            "max_duration": round(histogram.max, 4),
+            "std_duration": round(math.sqrt(max(variance, 0.0)), 4),
+            "avg_success_rate": round(totals.success_rates / count, 2),
+            "total_requests": totals.total_requests,
+            "total_successes": totals.total_successes,
+            "node_phases": {
+                phil_id: {
+                    phase: round(total / samples, 6)
+                    for phase, (total, samples) in phases.items()
+                }
+                for phil_id, phases in sorted(totals.node_phases.items())
+            }
         }
     
     def get_chart_data(self) -> Dict[str, Any]:
-        seq_list = list(self.sequential_results)
-        par_list = list(self.parallel_results)
+        with self._lock:
+            seq_list = list(self.sequential_results)
+            par_list = list(self.parallel_results)
+            method_lists = {method: list(results) for method, results in self.method_results.items()}
         
         max_len = max(len(seq_list), len(par_list))
         labels = [f"Test {i+1}" for i in range(max_len)]
@@ -119,6 +244,10 @@ class Profiler:
             "labels": labels,
             "sequential_durations": seq_durations,
             "parallel_durations": par_durations,
+            "durations_by_method": {
+                method: [r.duration for r in results]
+                for method, results in method_lists.items()
+            },
             "sequential_success": seq_success,
             "parallel_success": par_success,
             "node_comparison": node_comparison
@@ -166,6 +295,7 @@ class Profiler:
         data = {
             "statistics": self.get_statistics(),
             "chart_data": self.get_chart_data(),
+            "node_latency": self.get_node_latency(),
             "raw_results": [
                 {
                     **asdict(r),
@@ -182,9 +312,16 @@ class Profiler:
         return filepath
     
     def clear_results(self):
-        self.results.clear()
-        self.sequential_results.clear()
-        self.parallel_results.clear()
+        with self._lock:
+            self.results.clear()
+            for results in self.method_results.values():
+                results.clear()
+            for method in self.histograms:
+                self.histograms[method].clear()
+                for histogram in self.window_histograms[method].values():
+                    histogram.clear()
+                self.node_histograms[method].clear()
+                self.totals[method] = MethodTotals()
         logger.info("Profiling results cleared")
 
 
@@ -207,10 +344,6 @@ def profile_broadcast(method: str):
             successful = sum(1 for r in responses.values() if r is not None)
             failed = len(responses) - successful
             
-            node_timings = {}
-            for phil_id in responses.keys():
-                node_timings[phil_id] = 0.0
-            
             result = ProfileResult(
                 method=method,
                 start_time=start_time,
@@ -219,9 +352,10 @@ def profile_broadcast(method: str):
                 active_nodes=len(responses),
                 successful_responses=successful,
                 failed_responses=failed,
-                node_timings=node_timings,
+                node_timings=node_timings_from(responses),
                 context=context or "",
-                timestamp=time.time()
+                timestamp=time.time(),
+                node_phase_timings=node_phase_timings_from(responses)
             )
             
             profiler.record_result(result)
@@ -0,0 +1,78 @@
+import math
+from typing import Dict, Iterable, List, Optional
+
+from config import PROMETHEUS_BUCKETS
+from histogram import LatencyHistogram
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+def _format_labels(labels: Optional[Dict[str, str]]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+class MetricsWriter:
+    """Construit une exposition au format texte Prometheus (HELP/TYPE émis une fois par famille)"""
+
+    def __init__(self, prefix: str = "philonodes"):
+        self.prefix = prefix
+        self._lines: List[str] = []
+        self._declared = set()
+
+    def _declare(self, name: str, metric_type: str, help_text: str) -> str:
+        full_name = f"{self.prefix}_{name}"
+        if full_name not in self._declared:
+            self._declared.add(full_name)
+            self._lines.append(f"# HELP {full_name} {help_text}")
+            self._lines.append(f"# TYPE {full_name} {metric_type}")
+        return full_name
+
+    def _sample(self, name: str, value: float, labels: Optional[Dict[str, str]] = None):
+        self._lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    def counter(self, name: str, help_text: str, value: float, labels: Optional[Dict[str, str]] = None):
+        self._sample(self._declare(name, "counter", help_text), value, labels)
+
+    def gauge(self, name: str, help_text: str, value: float, labels: Optional[Dict[str, str]] = None):
+        self._sample(self._declare(name, "gauge", help_text), value, labels)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        histogram: LatencyHistogram,
+        labels: Optional[Dict[str, str]] = None,
+        bounds: Iterable[float] = PROMETHEUS_BUCKETS
+    ):
+        """Projette un LatencyHistogram sur des buckets `le` cumulés fixes (arrondis par excès, voir cumulative_counts)"""
+        full_name = self._declare(name, "histogram", help_text)
+        labels = labels or {}
+        bounds = list(bounds)
+
+        for bound, count in zip(bounds, histogram.cumulative_counts(bounds)):
+            self._sample(f"{full_name}_bucket", count, {**labels, "le": _format_value(float(bound))})
+        self._sample(f"{full_name}_bucket", histogram.count, {**labels, "le": "+Inf"})
+        self._sample(f"{full_name}_sum", histogram.total, labels)
+        self._sample(f"{full_name}_count", histogram.count, labels)
+
+    def render(self) -> str:
+        return "\n".join(self._lines) + "\n"
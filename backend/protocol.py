@@ -0,0 +1,74 @@
+import json
+import struct
+from typing import Dict, List, Tuple
+
+from config import MAX_FRAME_SIZE
+
+# En-tête d'une trame: longueur du payload JSON puis identifiant de requête.
+# MAX_FRAME_SIZE < 2**24, le premier octet d'une trame est donc toujours nul,
+# ce qui la distingue d'un message legacy qui commence par "{".
+FRAME_HEADER = struct.Struct("!II")
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class LegacyNodeError(ProtocolError):
+    """Le nœud ne parle que le protocole JSON brut (version 1)"""
+
+
+def is_framed(first_bytes: bytes) -> bool:
+    return len(first_bytes) > 0 and first_bytes[0] == 0
+
+
+def decode_payload(payload: bytes) -> Dict:
+    try:
+        message = json.loads(payload.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ProtocolError(f"Payload de trame invalide: {e}")
+    if not isinstance(message, dict):
+        raise ProtocolError("Payload de trame invalide: objet JSON attendu")
+    return message
+
+
+def encode_frame(request_id: int, message: Dict) -> bytes:
+    return encode_raw_frame(request_id, json.dumps(message).encode('utf-8'))
+
+
+def encode_raw_frame(request_id: int, payload: bytes) -> bytes:
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ProtocolError(f"Trame trop volumineuse: {len(payload)} octets")
+    return FRAME_HEADER.pack(len(payload), request_id) + payload
+
+
+class FrameDecoder:
+    def __init__(self):
+        self.buffer = bytearray()
+    
+    def feed(self, data: bytes) -> List[Tuple[int, Dict]]:
+        return [
+            (request_id, decode_payload(payload))
+            for request_id, payload in self.feed_raw(data)
+        ]
+    
+    def feed_raw(self, data: bytes) -> List[Tuple[int, bytes]]:
+        """Comme feed, sans décoder les payloads JSON"""
+        self.buffer += data
+        frames = []
+        
+        while len(self.buffer) >= FRAME_HEADER.size:
+            length, request_id = FRAME_HEADER.unpack_from(self.buffer)
+            if length > MAX_FRAME_SIZE:
+                raise ProtocolError(f"Trame trop volumineuse: {length} octets")
+            
+            end = FRAME_HEADER.size + length
+            if len(self.buffer) < end:
+                break
+            
+            payload = bytes(self.buffer[FRAME_HEADER.size:end])
+            del self.buffer[:end]
+            
+            frames.append((request_id, payload))
+        
+        return frames
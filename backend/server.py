@@ -1,7 +1,10 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import AsyncIterator, Awaitable, Callable, Optional, List
+import itertools
+import json
 import logging
 import time
 from collections import deque
@@ -9,11 +12,22 @@ import asyncio
 
 from config import (
     API_TITLE, API_VERSION, API_DESCRIPTION, 
-    CORS_ORIGINS, PHILOSOPHERS
+    CORS_ORIGINS, PHILOSOPHERS,
+    CONSENSUS_CACHE_SIZE, CONSENSUS_CACHE_TTL, EVENT_METRICS_INTERVAL,
+    LONG_POLL_MAX_TIMEOUT
 )
 from socket_manager import SocketManager
-from consensus import ConsensusProtocol
-from profiling import profiler
+from async_socket_manager import AsyncSocketManager
+from consensus import ConsensusProtocol, ConsensusSession, quote_score_bounds
+from profiling import profiler, ProfileResult
+from cache import LRUCache
+from coalescing import RequestCoalescer
+from utils import request_fingerprint
+from prometheus import MetricsWriter, CONTENT_TYPE as PROMETHEUS_CONTENT_TYPE
+from histogram import LatencyHistogram
+from tracing import tracer, trace_span, annotate, current_trace_id
+from events import event_broker
+from history_store import MemoryHistoryStore, create_history_store
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,7 +35,8 @@ logging.basicConfig(
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 logger = logging.getLogger(__name__)
-recommendations_history = deque(maxlen=100)
+# Remplacé au démarrage par le backend configuré: importer le module n'ouvre pas la base
+history_store = MemoryHistoryStore()
 
 node_metrics = {
     phil_id: {
@@ -34,21 +49,34 @@ node_metrics = {
         "last_seen": None,
         "votes_accept": 0,
         "votes_reject": 0,
-        "connection_status": "unknown"
+        "connection_status": "unknown",
+        "last_phase_timings": {},
+        "phase_totals": {},
+        "avg_phase_timings": {}
     }
     for phil_id in PHILOSOPHERS.keys()
 }
 
 message_log = deque(maxlen=50)
+message_sequence = itertools.count(1)
 
 global_metrics = {
+    "total_requests": 0,
+    "requests_by_method": {},
     "total_consensus_sessions": 0,
     "successful_consensus": 0,
     "failed_consensus": 0,
     "total_processing_time": 0.0,
-    "avg_processing_time": 0.0
+    "avg_processing_time": 0.0,
+    "cache_hits": 0,
+    "cache_misses": 0
 }
 
+consensus_cache = LRUCache(CONSENSUS_CACHE_SIZE, CONSENSUS_CACHE_TTL)
+consensus_cache_membership = None
+request_coalescer = RequestCoalescer()
+published_node_status = {}
+
 
 app = FastAPI(
     title=API_TITLE,
@@ -65,34 +93,55 @@ app.add_middleware(
 )
 
 socket_manager = SocketManager()
+async_socket_manager = AsyncSocketManager(
+    active_nodes=socket_manager.active_nodes,
+    latency=socket_manager.latency,
+    philosophers=socket_manager.philosophers,
+    host=socket_manager.host
+)
 consensus_protocol = ConsensusProtocol()
 
 @app.on_event("startup")
 async def startup_event():
+    global history_store
     logger.info("Démarrage du serveur...")
+    history_store = await asyncio.to_thread(create_history_store)
     socket_manager.scan_all_nodes()
     active, total = socket_manager.get_nodes_count()
     logger.info(f"Serveur prêt! {active}/{total} nœuds actifs")
     
+    publish_node_status()
+    
     asyncio.create_task(periodic_heartbeat())
+    asyncio.create_task(publish_metrics_deltas())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await async_socket_manager.close()
+    socket_manager.close()
+    history_store.close()
 
 async def periodic_heartbeat():
     while True:
         await asyncio.sleep(5)
-        socket_manager.scan_all_nodes()
+        await asyncio.to_thread(socket_manager.scan_all_nodes)
+        sync_consensus_cache()
         
         for phil_id in PHILOSOPHERS.keys():
             is_active = phil_id in socket_manager.active_nodes
             node_metrics[phil_id]["connection_status"] = "connected" if is_active else "disconnected"
             if is_active:
                 node_metrics[phil_id]["last_seen"] = time.time()
+        publish_node_status()
 
 
 class RecommendationRequest(BaseModel):
     context: Optional[str] = Field(None, description="Contexte textuel")
     keywords: List[str] = Field(default_factory=list, description="Mots-clés")
     category: Optional[str] = Field(None, description="Catégorie")
-    method: Optional[str] = Field("parallel", description="Method: 'sequential' or 'parallel'")
+    method: Optional[str] = Field("parallel", description="Method: 'sequential', 'parallel', 'async' or 'embedded'")
+    use_cache: bool = Field(True, description="Réutiliser un consensus récent pour la même requête")
+    early_termination: bool = Field(False, description="Conclure dès que l'issue du consensus est certaine")
 
 class QuoteResponse(BaseModel):
     winner: Optional[dict] = Field(description="Citation gagnante")
@@ -101,17 +150,92 @@ class QuoteResponse(BaseModel):
     processing_time: float = Field(description="Temps de traitement")
     active_nodes: int = Field(description="Nœuds actifs")
     node_timings: Optional[dict] = Field(description="Temps de réponse par nœud")
+    cached: bool = Field(False, description="Résultat servi depuis le cache du coordinateur")
+    coalesced: bool = Field(False, description="Résultat partagé avec une requête identique en cours")
+    early_termination: Optional[dict] = Field(None, description="Détail de la terminaison anticipée")
+    trace_id: Optional[str] = Field(None, description="Identifiant de trace (voir /traces/{trace_id})")
 
 def log_message(message_type: str, source: str, target: str, content: str):
-    message_log.appendleft({
+    entry = {
+        "seq": next(message_sequence),
         "timestamp": time.time(),
         "type": message_type,
         "source": source,
         "target": target,
         "content": content
-    })
+    }
+    message_log.appendleft(entry)
+    event_broker.publish("message", entry)
+
+async def wait_for_entries(event_type: str, fetch: Callable[[], Awaitable[list]], timeout: float) -> list:
+    """
+    Long-polling: renvoie les entrées de `fetch` dès qu'il y en a, en attendant
+    au plus `timeout` secondes la publication d'un événement `event_type`
+    """
+    timeout = min(max(timeout, 0.0), LONG_POLL_MAX_TIMEOUT)
+    # Abonnement avant la première lecture: une entrée ajoutée entre les deux n'est pas manquée
+    subscription = event_broker.subscribe([event_type])
+    try:
+        entries = await fetch()
+        if entries or timeout == 0:
+            return entries
+        try:
+            await asyncio.wait_for(subscription.queue.get(), timeout)
+        except TimeoutError:
+            return entries
+        return await fetch()
+    finally:
+        event_broker.unsubscribe(subscription)
+
+def publish_node_status():
+    """Publie l'état du cluster quand la disponibilité d'un nœud change"""
+    current = {phil_id: phil_id in socket_manager.active_nodes for phil_id in PHILOSOPHERS}
+    changed = [phil_id for phil_id, active in current.items() if published_node_status.get(phil_id) != active]
+    if changed:
+        published_node_status.update(current)
+        event_broker.publish("node_status", {**build_status(), "changed": changed})
+
+def metrics_snapshot() -> dict:
+    active, total = socket_manager.get_nodes_count()
+    return {
+        **{key: value for key, value in global_metrics.items() if key != "requests_by_method"},
+        "requests_by_method": dict(global_metrics["requests_by_method"]),
+        "active_nodes": active,
+        "nodes": {
+            phil_id: {
+                "successful_responses": metrics["successful_responses"],
+                "failed_responses": metrics["failed_responses"],
+                "avg_response_time": metrics["avg_response_time"],
+                "connection_status": metrics["connection_status"]
+            }
+            for phil_id, metrics in node_metrics.items()
+        }
+    }
 
-def update_node_metrics(phil_id: int, response_time: float, success: bool, vote: str):
+async def publish_metrics_deltas():
+    """Publie, tant qu'il y a des abonnés, les métriques qui ont changé depuis le dernier envoi"""
+    previous = {}
+    while True:
+        await asyncio.sleep(EVENT_METRICS_INTERVAL)
+        if not event_broker.subscriber_count:
+            previous = {}
+            continue
+        
+        snapshot = metrics_snapshot()
+        delta = {key: value for key, value in snapshot.items() if key != "nodes" and previous.get(key) != value}
+        nodes = {
+            phil_id: metrics for phil_id, metrics in snapshot["nodes"].items()
+            if previous.get("nodes", {}).get(phil_id) != metrics
+        }
+        if nodes:
+            delta["nodes"] = nodes
+        if delta:
+            event_broker.publish("metrics", delta)
+        previous = snapshot
+
+def update_node_metrics(
+    phil_id: int, response_time: float, success: bool, vote: str, phases: Optional[dict] = None
+):
     metrics = node_metrics[phil_id]
     
     metrics["total_requests"] += 1
@@ -121,6 +245,15 @@ def update_node_metrics(phil_id: int, response_time: float, success: bool, vote:
         metrics["avg_response_time"] = metrics["total_response_time"] / metrics["successful_responses"]
         metrics["last_response_time"] = response_time
         
+        if phases:
+            metrics["last_phase_timings"] = phases
+            for phase, value in phases.items():
+                metrics["phase_totals"][phase] = metrics["phase_totals"].get(phase, 0.0) + value
+            metrics["avg_phase_timings"] = {
+                phase: round(total / metrics["successful_responses"], 6)
+                for phase, total in metrics["phase_totals"].items()
+            }
+        
         if vote == "Accept":
             metrics["votes_accept"] += 1
         elif vote == "Reject":
@@ -130,6 +263,31 @@ def update_node_metrics(phil_id: int, response_time: float, success: bool, vote:
     
     metrics["last_seen"] = time.time()
 
+def sync_consensus_cache():
+    global consensus_cache_membership
+    
+    if consensus_cache_membership != socket_manager.membership_version:
+        if consensus_cache_membership is not None and len(consensus_cache):
+            logger.info("Composition du cluster modifiée, cache de consensus invalidé")
+        consensus_cache.clear()
+        consensus_cache_membership = socket_manager.membership_version
+
+def record_cache_hit(request: RecommendationRequest, result: dict, start_time: float, active: int):
+    end_time = time.time()
+    votes = len(result["votes_detail"])
+    profiler.record_result(ProfileResult(
+        method="cached",
+        start_time=start_time,
+        end_time=end_time,
+        duration=end_time - start_time,
+        active_nodes=active,
+        successful_responses=votes,
+        failed_responses=0,
+        node_timings={},
+        context=request.context or "",
+        timestamp=end_time
+    ))
+
 @app.get("/")
 async def root():
     active, total = socket_manager.get_nodes_count()
@@ -138,63 +296,169 @@ async def root():
         "version": API_VERSION,
         "status": "running",
         "active_nodes": f"{active}/{total}",
-        "stored_recommendations": len(recommendations_history),
+        "stored_recommendations": history_store.count(),
         "total_messages": len(message_log)
     }
 
 
-@app.post("/recommend", response_model=QuoteResponse)
-async def recommend_quote(request: RecommendationRequest):
-    start_time = time.time()
-    
-    logger.info(f"Nouvelle demande [{request.method}]: contexte='{request.context}'")
-    
-    log_message("REQUEST", "Client", "Coordinateur", f"Contexte: {request.context}")
-    
-    active, total = socket_manager.get_nodes_count()
-    if active == 0:
-        logger.error("Aucun nœud actif!")
-        raise HTTPException(status_code=503, detail="Aucun nœud actif")
-    
-    node_timings = {}
-    
+async def run_consensus(
+    request: RecommendationRequest, cache_key: tuple, session: Optional[ConsensusSession] = None
+) -> dict:
     log_message("BROADCAST", "Coordinateur", "Tous les nœuds", "Distribution de la requête")
     
-    if request.method == "sequential":
-        responses = socket_manager.broadcast_request(
-            request.context, request.keywords, request.category
-        )
-    else:
-        responses = socket_manager.broadcast_request_parallel(
-            request.context, request.keywords, request.category
+    if session is None and request.early_termination and request.method != "embedded":
+        session = await ConsensusSession.for_request_async(
+            consensus_protocol, request.context, request.keywords, request.category
         )
+    early_termination = session is not None and session.early_termination
     
+    with trace_span("broadcast", method=request.method, early_termination=early_termination):
+        if request.method == "sequential":
+            responses = await asyncio.to_thread(
+                socket_manager.broadcast_request,
+                request.context, request.keywords, request.category,
+                session=session
+            )
+        elif request.method == "async":
+            responses = await async_socket_manager.broadcast_request_async(
+                request.context, request.keywords, request.category,
+                session=session
+            )
+        elif request.method == "embedded":
+            responses = await asyncio.to_thread(
+                socket_manager.broadcast_request_embedded,
+                request.context, request.keywords, request.category
+            )
+            if session is not None:
+                session.expect(responses.keys())
+                for phil_id, response in responses.items():
+                    session.add_response(phil_id, response)
+        else:
+            responses = await asyncio.to_thread(
+                socket_manager.broadcast_request_parallel,
+                request.context, request.keywords, request.category,
+                session=session
+            )
+    
+    node_timings = {}
     for phil_id, response in responses.items():
         if response:
             log_message("TCP_RECV", f"Nœud {phil_id}", "Coordinateur", 
                        f"Vote: {response.get('vote')}, Score: {response.get('score')}")
-            update_node_metrics(phil_id, 0.0, True, response.get('vote', 'Abstain'))
+            timings = response.get("timings") or {}
+            node_timings[phil_id] = timings
+            update_node_metrics(
+                phil_id, timings.get("total", 0.0), True, response.get('vote', 'Abstain'), timings
+            )
         else:
             log_message("TCP_TIMEOUT", f"Nœud {phil_id}", "Coordinateur", "Pas de réponse")
             update_node_metrics(phil_id, 0.0, False, "Timeout")
     
     log_message("CONSENSUS_START", "Coordinateur", "Protocole", "Calcul du consensus")
-    result = consensus_protocol.aggregate_votes(responses)
+    with trace_span("consensus", votes=sum(1 for r in responses.values() if r)):
+        if session is not None:
+            result = session.finalize()
+            if result["early_termination"]["terminated"]:
+                log_message("CONSENSUS_EARLY", "Protocole", "Coordinateur",
+                           f"Issue certaine ({session.final_reason}), "
+                           f"{len(session.pending)} réponse(s) ignorée(s)")
+        else:
+            result = consensus_protocol.aggregate_votes(responses)
+        annotate(quorum_reached=result["consensus"]["quorum_reached"])
+    result["node_timings"] = node_timings
     log_message("CONSENSUS_END", "Protocole", "Coordinateur", 
                f"Quorum: {result['consensus']['quorum_reached']}")
     
-    processing_time = round(time.time() - start_time, 3)
+    if responses and all(responses.values()):
+        consensus_cache.put(cache_key, result)
+    
+    return result
+
+
+@app.post("/recommend", response_model=QuoteResponse)
+async def recommend_quote(request: RecommendationRequest):
+    with tracer.trace("recommend", method=request.method, context=request.context or ""):
+        return await _recommend_quote(request)
+
+
+def begin_recommendation(request: RecommendationRequest) -> tuple:
+    """Comptabilise la demande, vérifie les nœuds et consulte le cache: (active, cache_key, résultat en cache)"""
+    logger.info(f"Nouvelle demande [{request.method}]: contexte='{request.context}'")
+    
+    log_message("REQUEST", "Client", "Coordinateur", f"Contexte: {request.context}")
     
-    global_metrics["total_consensus_sessions"] += 1
-    global_metrics["total_processing_time"] += processing_time
-    global_metrics["avg_processing_time"] = round(
-        global_metrics["total_processing_time"] / global_metrics["total_consensus_sessions"], 3
+    global_metrics["total_requests"] += 1
+    by_method = global_metrics["requests_by_method"]
+    by_method[request.method] = by_method.get(request.method, 0) + 1
+    
+    active, total = socket_manager.get_nodes_count()
+    if request.method == "embedded":
+        active = total
+    elif active == 0:
+        logger.error("Aucun nœud actif!")
+        raise HTTPException(status_code=503, detail="Aucun nœud actif")
+    
+    sync_consensus_cache()
+    cache_key = (
+        "embedded" if request.method == "embedded" else socket_manager.membership_version,
+        request_fingerprint(request.context or "", request.keywords, request.category or ""),
+        request.early_termination
     )
+    result = consensus_cache.get(cache_key) if request.use_cache else None
     
-    if result["consensus"]["quorum_reached"]:
-        global_metrics["successful_consensus"] += 1
+    if result is not None:
+        global_metrics["cache_hits"] += 1
+        log_message("CACHE_HIT", "Coordinateur", "Client", "Consensus réutilisé depuis le cache")
+    elif request.use_cache:
+        global_metrics["cache_misses"] += 1
+    
+    return active, cache_key, result
+
+
+async def _recommend_quote(request: RecommendationRequest) -> dict:
+    start_time = time.time()
+    
+    active, cache_key, result = begin_recommendation(request)
+    cached = result is not None
+    coalesced = False
+    
+    if cached:
+        record_cache_hit(request, result, start_time, active)
     else:
-        global_metrics["failed_consensus"] += 1
+        result, coalesced = await request_coalescer.run(
+            cache_key + (request.method,),
+            lambda: run_consensus(request, cache_key)
+        )
+        if coalesced:
+            log_message("COALESCED", "Coordinateur", "Client", "Requête rattachée à une diffusion en cours")
+    
+    return complete_recommendation(request, result, start_time, active, cached, coalesced)
+
+
+def complete_recommendation(
+    request: RecommendationRequest,
+    result: dict,
+    start_time: float,
+    active: int,
+    cached: bool,
+    coalesced: bool
+) -> dict:
+    """Met à jour les métriques et l'historique, et construit la réponse client"""
+    node_timings = {} if cached else result.get("node_timings", {})
+    annotate(cached=cached, coalesced=coalesced)
+    processing_time = round(time.time() - start_time, 3)
+    
+    if not cached and not coalesced:
+        global_metrics["total_consensus_sessions"] += 1
+        global_metrics["total_processing_time"] += processing_time
+        global_metrics["avg_processing_time"] = round(
+            global_metrics["total_processing_time"] / global_metrics["total_consensus_sessions"], 3
+        )
+        
+        if result["consensus"]["quorum_reached"]:
+            global_metrics["successful_consensus"] += 1
+        else:
+            global_metrics["failed_consensus"] += 1
     
     response_data = {
         "winner": result["winner"],
@@ -202,7 +466,11 @@ async def recommend_quote(request: RecommendationRequest):
         "votes_detail": result["votes_detail"],
         "processing_time": processing_time,
         "active_nodes": active,
-        "node_timings": node_timings
+        "node_timings": node_timings,
+        "cached": cached,
+        "coalesced": coalesced,
+        "early_termination": result.get("early_termination"),
+        "trace_id": current_trace_id()
     }
     
     recommendation_entry = {
@@ -216,10 +484,14 @@ async def recommend_quote(request: RecommendationRequest):
         "consensus": result["consensus"],
         "votes_detail": result["votes_detail"],
         "processing_time": processing_time,
-        "node_timings": node_timings
+        "node_timings": node_timings,
+        "cached": cached,
+        "coalesced": coalesced,
+        "trace_id": current_trace_id()
     }
     
-    recommendations_history.appendleft(recommendation_entry)
+    history_store.append(recommendation_entry)
+    event_broker.publish("recommendation", recommendation_entry)
     
     log_message("RESPONSE", "Coordinateur", "Client", 
                f"Consensus atteint" if result["winner"] else "Pas de consensus")
@@ -230,21 +502,159 @@ async def recommend_quote(request: RecommendationRequest):
     return response_data
 
 
+@app.post("/recommend/stream")
+async def recommend_quote_stream(request: RecommendationRequest):
+    """
+    Variante NDJSON de /recommend: une ligne "start", une ligne "vote" par
+    philosophe dès que sa réponse arrive, puis une ligne "result" identique
+    à la réponse de /recommend
+    """
+    start_time = time.time()
+    active, cache_key, cached_result = begin_recommendation(request)
+    return StreamingResponse(
+        stream_recommendation(request, start_time, active, cache_key, cached_result),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def ndjson(payload: dict) -> str:
+    return json.dumps(payload, default=str) + "\n"
+
+
+def vote_event(phil_id: int, response: Optional[dict], tally: dict, start_time: float) -> dict:
+    if response is None:
+        vote = {
+            "philosopher_id": phil_id,
+            "philosopher_name": PHILOSOPHERS[phil_id]["name"],
+            "vote": None,
+            "error": "Pas de réponse"
+        }
+    else:
+        vote = {
+            **ConsensusProtocol.vote_detail(phil_id, response),
+            "quote": response.get("quote"),
+            "timings": response.get("timings")
+        }
+    return {"type": "vote", **vote, "tally": tally, "elapsed": round(time.time() - start_time, 3)}
+
+
+async def stream_recommendation(
+    request: RecommendationRequest,
+    start_time: float,
+    active: int,
+    cache_key: tuple,
+    cached_result: Optional[dict]
+) -> AsyncIterator[str]:
+    with tracer.trace("recommend_stream", method=request.method, context=request.context or ""):
+        yield ndjson({
+            "type": "start",
+            "active_nodes": active,
+            "cached": cached_result is not None,
+            "trace_id": current_trace_id()
+        })
+        
+        if cached_result is not None:
+            record_cache_hit(request, cached_result, start_time, active)
+            for vote in cached_result["votes_detail"]:
+                yield ndjson({"type": "vote", **vote, "elapsed": round(time.time() - start_time, 3)})
+            yield ndjson({
+                "type": "result",
+                **complete_recommendation(request, cached_result, start_time, active, True, False)
+            })
+            return
+        
+        # Les réponses arrivent depuis les threads de diffusion (ou la boucle en mode async)
+        loop = asyncio.get_running_loop()
+        arrivals: asyncio.Queue = asyncio.Queue()
+        session = await ConsensusSession.for_request_async(
+            consensus_protocol,
+            request.context,
+            request.keywords,
+            request.category,
+            early_termination=request.early_termination,
+            listener=lambda phil_id, response: loop.call_soon_threadsafe(
+                arrivals.put_nowait, (phil_id, response, session.tally())
+            )
+        )
+        consensus = asyncio.create_task(run_consensus(request, cache_key, session))
+        
+        while True:
+            arrival = asyncio.ensure_future(arrivals.get())
+            done, _ = await asyncio.wait({arrival, consensus}, return_when=asyncio.FIRST_COMPLETED)
+            if arrival not in done:
+                arrival.cancel()
+                break
+            yield ndjson(vote_event(*arrival.result(), start_time))
+        
+        while not arrivals.empty():
+            yield ndjson(vote_event(*arrivals.get_nowait(), start_time))
+        
+        try:
+            result = consensus.result()
+        except Exception as e:
+            logger.error(f"Échec du consensus en streaming: {e}")
+            yield ndjson({"type": "error", "detail": str(e)})
+            return
+        
+        yield ndjson({
+            "type": "result",
+            **complete_recommendation(request, result, start_time, active, False, False)
+        })
+
+
 @app.get("/recommendations")
-async def get_recommendations(limit: int = 50):
-    recommendations_list = list(recommendations_history)[:limit]
+async def get_recommendations(
+    limit: int = 50,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    quote_id: Optional[int] = None,
+    category: Optional[str] = None,
+    since: Optional[int] = None,
+    timeout: float = 0.0
+):
+    """
+    Historique, du plus récent au plus ancien. Avec `since` (curseur renvoyé par
+    l'appel précédent), seules les entrées plus récentes sont renvoyées, dans
+    l'ordre chronologique, en attendant jusqu'à `timeout` secondes s'il n'y en a pas.
+    """
+    if since is not None:
+        if any(value is not None for value in (start, end, quote_id, category)):
+            raise HTTPException(status_code=400, detail="since ne se combine pas avec les filtres")
+        
+        recommendations_list = await wait_for_entries(
+            "recommendation",
+            lambda: asyncio.to_thread(history_store.after, since, limit),
+            timeout
+        )
+        # Un curseur en avance sur l'historique (historique recréé) est ramené au dernier numéro attribué
+        cursor = recommendations_list[-1]["seq"] if recommendations_list else min(since, history_store.sequence)
+        return {
+            "total": history_store.count(),
+            "returned": len(recommendations_list),
+            "cursor": cursor,
+            "has_more": cursor < history_store.sequence,
+            "recommendations": recommendations_list
+        }
+    
+    if any(value is not None for value in (start, end, quote_id, category)):
+        recommendations_list = await asyncio.to_thread(
+            history_store.query, start, end, quote_id, category, limit
+        )
+    else:
+        recommendations_list = await asyncio.to_thread(history_store.recent, limit)
     
     return {
-        "total": len(recommendations_history),
+        "total": history_store.count(),
         "returned": len(recommendations_list),
+        "cursor": history_store.sequence,
         "recommendations": recommendations_list
     }
 
 
 @app.delete("/recommendations")
 async def clear_recommendations():
-    count = len(recommendations_history)
-    recommendations_history.clear()
+    count = await asyncio.to_thread(history_store.clear)
     logger.info(f"Historique effacé ({count} entrées)")
     
     return {
@@ -253,6 +663,85 @@ async def clear_recommendations():
     }
 
 
+@app.get("/metrics")
+async def get_prometheus_metrics():
+    writer = MetricsWriter()
+    
+    writer.counter("recommend_requests_total", "Requêtes /recommend reçues", global_metrics["total_requests"])
+    for method, count in sorted(global_metrics["requests_by_method"].items()):
+        writer.counter("recommend_requests_by_method_total", "Requêtes /recommend par méthode de diffusion",
+                       count, {"method": method})
+    for outcome in ("successful", "failed"):
+        writer.counter("consensus_total", "Sessions de consensus exécutées, par issue",
+                       global_metrics[f"{outcome}_consensus"], {"result": outcome})
+    writer.counter("consensus_processing_seconds_total", "Temps cumulé des sessions de consensus",
+                   global_metrics["total_processing_time"])
+    
+    active, total = socket_manager.get_nodes_count()
+    writer.gauge("nodes_active", "Nœuds actifs selon le dernier heartbeat", active)
+    writer.gauge("nodes_total", "Nœuds configurés", total)
+    writer.gauge("membership_version", "Version de la composition du cluster", socket_manager.membership_version)
+    
+    for method, histogram in sorted(profiler.histograms.items()):
+        writer.histogram("broadcast_duration_seconds", "Durée des diffusions par méthode",
+                         histogram, {"method": method})
+    
+    node_labels = {
+        phil_id: {"node": str(phil_id), "name": PHILOSOPHERS[phil_id]["name"]}
+        for phil_id in node_metrics
+    }
+    for phil_id, metrics in node_metrics.items():
+        writer.gauge("node_up", "Nœud joignable (1) ou non (0)",
+                     metrics["connection_status"] == "connected", node_labels[phil_id])
+    for phil_id, metrics in node_metrics.items():
+        writer.counter("node_requests_total", "Requêtes envoyées au nœud", metrics["total_requests"], node_labels[phil_id])
+    for outcome in ("successful", "failed"):
+        for phil_id, metrics in node_metrics.items():
+            writer.counter("node_responses_total", "Réponses du nœud, par issue",
+                           metrics[f"{outcome}_responses"], {**node_labels[phil_id], "result": outcome})
+    for vote in ("accept", "reject"):
+        for phil_id, metrics in node_metrics.items():
+            writer.counter("node_votes_total", "Votes émis par le nœud",
+                           metrics[f"votes_{vote}"], {**node_labels[phil_id], "vote": vote})
+    
+    latency_stats = {phil_id: socket_manager.latency.get_stats(phil_id) for phil_id in node_metrics}
+    for key, help_text in (("timeouts", "Timeouts vers le nœud"), ("hedges", "Requêtes de couverture envoyées"),
+                           ("hedge_wins", "Requêtes de couverture gagnantes")):
+        for phil_id, stats in latency_stats.items():
+            writer.counter(f"node_{key}_total", help_text, stats[key], node_labels[phil_id])
+    for phil_id, stats in latency_stats.items():
+        writer.gauge("node_effective_timeout_seconds", "Timeout adaptatif courant du nœud",
+                     stats["effective_timeout"], node_labels[phil_id])
+    
+    node_histograms = {}
+    for histograms in profiler.node_histograms.values():
+        for phil_id, histogram in histograms.items():
+            node_histograms.setdefault(phil_id, []).append(histogram)
+    for phil_id, histograms in sorted(node_histograms.items()):
+        writer.histogram("node_latency_seconds", "Latence de bout en bout par nœud",
+                         LatencyHistogram.merged(histograms), node_labels.get(phil_id, {"node": str(phil_id)}))
+    
+    cache_stats = consensus_cache.get_stats()
+    writer.counter("consensus_cache_hits_total", "Consensus servis depuis le cache", global_metrics["cache_hits"])
+    writer.counter("consensus_cache_misses_total", "Consensus absents du cache", global_metrics["cache_misses"])
+    writer.gauge("consensus_cache_entries", "Entrées du cache de consensus", cache_stats["size"])
+    
+    coalescing = request_coalescer.get_stats()
+    writer.counter("coalescing_leaders_total", "Diffusions réellement lancées par le regroupement", coalescing["leaders"])
+    writer.counter("coalescing_coalesced_total", "Requêtes rattachées à une diffusion en cours", coalescing["coalesced"])
+    writer.gauge("coalescing_in_flight", "Diffusions regroupées en cours", coalescing["in_flight"])
+    
+    pool_stats = socket_manager.get_pool_stats()
+    for key in ("hits", "misses", "reconnects", "evictions", "health_check_failures"):
+        for phil_id, stats in sorted(pool_stats["nodes"].items()):
+            writer.counter(f"pool_{key}_total", f"Pool de connexions: {key}", stats[key], node_labels[phil_id])
+    for key in ("open_connections", "in_flight"):
+        for phil_id, stats in sorted(pool_stats["nodes"].items()):
+            writer.gauge(f"pool_{key}", f"Pool de connexions: {key}", stats[key], node_labels[phil_id])
+    
+    return Response(content=writer.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
 @app.get("/metrics/nodes")
 async def get_node_metrics():
     metrics_with_names = {}
@@ -264,6 +753,7 @@ async def get_node_metrics():
             "port": phil_config["port"],
             "school": phil_config["school"],
             **metrics,
+            **socket_manager.latency.get_stats(phil_id),
             "success_rate": round(
                 (metrics["successful_responses"] / metrics["total_requests"] * 100) 
                 if metrics["total_requests"] > 0 else 0, 1
@@ -276,13 +766,41 @@ async def get_node_metrics():
     }
 
 
+@app.get("/metrics/node-stats")
+async def get_node_stats():
+    stats = await asyncio.to_thread(socket_manager.collect_node_stats)
+    return {
+        **stats,
+        "timestamp": time.time()
+    }
+
+
 @app.get("/metrics/messages")
-async def get_message_log(limit: int = 50):
-    messages = list(message_log)[:limit]
+async def get_message_log(limit: int = 50, since: Optional[int] = None, timeout: float = 0.0):
+    """Journal des messages; `since` et `timeout` fonctionnent comme pour /recommendations"""
+    latest = message_log[0]["seq"] if message_log else 0
+    if since is None:
+        messages = list(itertools.islice(message_log, limit))
+        return {
+            "total": len(message_log),
+            "returned": len(messages),
+            "cursor": latest,
+            "messages": messages
+        }
+    
+    async def newer_messages():
+        newer = list(itertools.takewhile(lambda entry: entry["seq"] > since, message_log))
+        newer.reverse()
+        return newer[:limit]
     
+    messages = await wait_for_entries("message", newer_messages, timeout)
+    latest = message_log[0]["seq"] if message_log else 0
+    cursor = messages[-1]["seq"] if messages else min(since, latest)
     return {
         "total": len(message_log),
         "returned": len(messages),
+        "cursor": cursor,
+        "has_more": cursor < latest,
         "messages": messages
     }
 
@@ -295,7 +813,20 @@ async def get_global_metrics():
         "success_rate": round(
             (global_metrics["successful_consensus"] / global_metrics["total_consensus_sessions"] * 100)
             if global_metrics["total_consensus_sessions"] > 0 else 0, 1
-        )
+        ),
+        "consensus_cache": consensus_cache.get_stats(),
+        "score_bounds": quote_score_bounds.get_stats(),
+        "coalescing": request_coalescer.get_stats(),
+        "events": event_broker.get_stats(),
+        "history": history_store.get_stats()
+    }
+
+
+@app.get("/metrics/pool")
+async def get_pool_metrics():
+    return {
+        **socket_manager.get_pool_stats(),
+        "timestamp": time.time()
     }
 
 
@@ -303,10 +834,33 @@ async def get_global_metrics():
 async def get_profiling_data():
     return {
         "statistics": profiler.get_statistics(),
-        "chart_data": profiler.get_chart_data()
+        "chart_data": profiler.get_chart_data(),
+        "node_latency": profiler.get_node_latency()
+    }
+
+
+@app.get("/traces")
+async def list_traces(limit: int = 50):
+    return {
+        "traces": tracer.list_traces(limit),
+        "timestamp": time.time()
     }
 
 
+@app.get("/traces/{trace_id}")
+async def get_trace(trace_id: str, format: str = "chrome"):
+    if format == "spans":
+        spans = tracer.get_spans(trace_id)
+        if spans is None:
+            raise HTTPException(status_code=404, detail="Trace inconnue ou expirée")
+        return {"trace_id": trace_id, "spans": spans}
+    
+    trace = tracer.export_chrome(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace inconnue ou expirée")
+    return trace
+
+
 @app.post("/profiling/export")
 async def export_profiling_data():
     filepath = profiler.export_results()
@@ -324,8 +878,30 @@ async def clear_profiling_data():
     }
 
 
+@app.get("/events")
+async def stream_events(
+    types: Optional[str] = None,
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID")
+):
+    """
+    Flux Server-Sent Events: recommendation, message, node_status, metrics
+    (filtrables par `types`, séparés par des virgules). À la reconnexion, le
+    navigateur envoie Last-Event-ID et les événements manqués sont rejoués.
+    """
+    subscription = event_broker.subscribe(types.split(",") if types else None, last_event_id)
+    return StreamingResponse(
+        event_broker.stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/status")
 async def get_status():
+    return build_status()
+
+
+def build_status() -> dict:
     active, total = socket_manager.get_nodes_count()
     
     all_philosophers = []
@@ -352,7 +928,7 @@ async def get_status():
             "quorum_threshold": f"{consensus_protocol.quorum_threshold * 100}%",
             "min_votes_required": consensus_protocol.min_votes_required
         },
-        "stored_recommendations": len(recommendations_history),
+        "stored_recommendations": history_store.count(),
         "message_log_size": len(message_log)
     }
 
@@ -360,7 +936,9 @@ async def get_status():
 @app.post("/scan")
 async def scan_nodes():
     logger.info("Scan manuel des nœuds")
-    availability = socket_manager.scan_all_nodes()
+    availability = await asyncio.to_thread(socket_manager.scan_all_nodes)
+    sync_consensus_cache()
+    publish_node_status()
     active, total = socket_manager.get_nodes_count()
     
     return {
@@ -1,20 +1,32 @@
 import socket
 import json
 import logging
+import contextvars
+import threading
 from typing import Dict, List, Optional, Tuple
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
 from config import (
     HOST, PHILOSOPHERS, SOCKET_TIMEOUT, 
-    CONNECTION_RETRY, MSG_TYPE_REQUEST
+    CONNECTION_RETRY, MSG_TYPE_REQUEST, MSG_TYPE_HEARTBEAT, MSG_TYPE_STATS,
+    LEGACY_PROTOCOL_VERSION, NODE_MAX_MESSAGE_SIZE, REQUEST_DEADLINE, NODE_STATS_PROBES
 )
-from utils import parse_message
+from utils import parse_message, merge_timings
+from node_connection import NodeConnection
+from connection_pool import ConnectionPool
+from protocol import ProtocolError, LegacyNodeError
+from embedded_nodes import EmbeddedCluster
+from consensus import ConsensusSession
+from latency_tracker import LatencyTracker, jittered_backoff
+from histogram import LatencyHistogram
+from tracing import tracer, trace_span, annotate, current_context
 
 logger = logging.getLogger(__name__)
 
 try:
-    from profiling import profiler, ProfileResult
+    from profiling import profiler, ProfileResult, node_timings_from, node_phase_timings_from
     PROFILING_ENABLED = True
     logger.info("Profiling module loaded successfully")
 except ImportError:
@@ -24,11 +36,151 @@ except ImportError:
 
 class SocketManager:
  
-    def __init__(self):
-        self.philosophers = PHILOSOPHERS
+    def __init__(self, philosophers: Optional[Dict[int, Dict]] = None, host: str = HOST):
+        self.philosophers = philosophers or PHILOSOPHERS
+        self.host = host
         self.active_nodes = {}          
+        self.membership_version = 0
+        
+        self.protocol_versions: Dict[int, int] = {}
+        self.pool = ConnectionPool(self.host, self.philosophers)
+        self.embedded: Optional[EmbeddedCluster] = None
+        self._embedded_lock = threading.Lock()
+        self.latency = LatencyTracker(self.philosophers.keys())
         logger.info("SocketManager initialisé")
     
+    def _get_connection(self, philosopher_id: int) -> Optional[NodeConnection]:
+        if self.protocol_versions.get(philosopher_id) == LEGACY_PROTOCOL_VERSION:
+            return None
+        
+        try:
+            conn = self.pool.acquire(philosopher_id)
+        except LegacyNodeError as e:
+            name = self.philosophers[philosopher_id]["name"]
+            logger.info(f"Nœud {name} détecté en protocole v{LEGACY_PROTOCOL_VERSION}: {e}")
+            self.protocol_versions[philosopher_id] = LEGACY_PROTOCOL_VERSION
+            return None
+        
+        self.protocol_versions[philosopher_id] = conn.protocol_version
+        return conn
+    
+    def _drop_connection(self, philosopher_id: int, forget_version: bool = False):
+        self.pool.close_node(philosopher_id)
+        if forget_version:
+            self.protocol_versions.pop(philosopher_id, None)
+    
+    def _exchange(
+        self, philosopher_id: int, message: Dict, timeout: float, hedge: bool = False
+    ) -> Optional[Dict]:
+        connect_start = time.perf_counter()
+        conn = self._get_connection(philosopher_id)
+        if conn is None:
+            return self._legacy_exchange(philosopher_id, message, timeout)
+        connect_time = time.perf_counter() - connect_start
+        
+        if hedge:
+            response = self._hedged_request(philosopher_id, conn, message, timeout)
+        else:
+            try:
+                response = conn.request(message, timeout)
+            except (ConnectionError, ProtocolError):
+                self.pool.discard(philosopher_id, conn)
+                raise
+        return merge_timings(response, connect=connect_time)
+    
+    def _hedged_request(
+        self, philosopher_id: int, conn: NodeConnection, message: Dict, timeout: float
+    ) -> Optional[Dict]:
+        """Envoie un doublon sur une autre connexion si la réponse dépasse le p95 du nœud"""
+        start = time.time()
+        hedge_delay = self.latency.hedge_delay(philosopher_id)
+        try:
+            attempts = [(conn, conn.submit(message))]
+        except (ConnectionError, ProtocolError):
+            self.pool.discard(philosopher_id, conn)
+            raise
+        last_error = None
+        
+        try:
+            pending = {attempts[0][1]}
+            hedge_at = start + hedge_delay if hedge_delay is not None and hedge_delay < timeout else None
+            
+            while pending:
+                now = time.time()
+                wake_at = min(start + timeout, hedge_at) if hedge_at else start + timeout
+                done, pending = wait(pending, timeout=max(wake_at - now, 0), return_when=FIRST_COMPLETED)
+                
+                for attempt_conn, future in attempts:
+                    if future not in done:
+                        continue
+                    error = future.exception()
+                    if error is None:
+                        if attempt_conn is not conn:
+                            self.latency.record_hedge(philosopher_id, won=True)
+                        return merge_timings(future.result(), **NodeConnection.phase_timings(future))
+                    if isinstance(error, (ConnectionError, ProtocolError)):
+                        self.pool.discard(philosopher_id, attempt_conn)
+                    last_error = error
+                
+                if hedge_at and time.time() >= hedge_at:
+                    hedge_at = None
+                    try:
+                        hedge_conn = self.pool.acquire(philosopher_id, exclude=conn)
+                        hedge_future = hedge_conn.submit(message)
+                    except (ConnectionError, ProtocolError, OSError) as e:
+                        logger.debug(f"Requête de couverture impossible vers le nœud {philosopher_id}: {e}")
+                    else:
+                        attempts.append((hedge_conn, hedge_future))
+                        pending.add(hedge_future)
+                        self.latency.record_hedge(philosopher_id)
+                        logger.debug(f"Requête de couverture envoyée au nœud {philosopher_id}")
+                elif time.time() >= start + timeout:
+                    break
+        finally:
+            for attempt_conn, future in attempts:
+                attempt_conn.discard(future.request_id)
+        
+        if last_error is not None and not pending:
+            raise last_error
+        raise FutureTimeoutError()
+    
+    def _legacy_exchange(self, philosopher_id: int, message: Dict, timeout: float) -> Optional[Dict]:
+        port = self.philosophers[philosopher_id]["port"]
+        
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(timeout)
+            start = time.perf_counter()
+            sock.connect((self.host, port))
+            connected = time.perf_counter()
+            sock.sendall(json.dumps(message).encode('utf-8'))
+            sent = time.perf_counter()
+            
+            buffer = bytearray()
+            while len(buffer) <= NODE_MAX_MESSAGE_SIZE:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                buffer += chunk
+            received = time.perf_counter()
+        finally:
+            sock.close()
+        
+        if not buffer:
+            return None
+        response = parse_message(buffer.decode('utf-8'))
+        if not isinstance(response, dict):
+            return response
+        
+        compute = response.get("timings", {}).get("compute", 0.0)
+        return merge_timings(
+            response,
+            connect=connected - start,
+            send=sent - connected,
+            receive=max(received - sent - compute, 0.0),
+            parse=time.perf_counter() - received
+        )
+    
     def check_node_availability(self, philosopher_id: int) -> bool:
         if philosopher_id not in self.philosophers:
             return False
@@ -37,17 +189,11 @@ class SocketManager:
         name = self.philosophers[philosopher_id]["name"]
         
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1.0)
-            sock.connect((HOST, port))
-            
-            heartbeat = json.dumps({"type": "HEARTBEAT"})
-            sock.sendall(heartbeat.encode('utf-8'))
-            
-            response = sock.recv(1024).decode('utf-8')
-            sock.close()
+            response = self._exchange(philosopher_id, {"type": MSG_TYPE_HEARTBEAT}, 1.0)
             
             if response:
+                if philosopher_id not in self.active_nodes:
+                    self.membership_version += 1
                 self.active_nodes[philosopher_id] = {
                     "name": name,
                     "port": port,
@@ -58,14 +204,17 @@ class SocketManager:
                 
         except (socket.timeout, ConnectionRefusedError, Exception) as e:
             logger.warning(f"Nœud {name} (port {port}) indisponible: {e}")
+            self._drop_connection(philosopher_id, forget_version=True)
             if philosopher_id in self.active_nodes:
                 del self.active_nodes[philosopher_id]
+                self.membership_version += 1
             return False
         
         return False
     
     def scan_all_nodes(self) -> Dict[int, bool]:
         logger.info("Scan de tous les 6 nœuds philosophes...")
+        self.pool.evict_idle()
         
         availability = {}
         for phil_id in self.philosophers.keys():
@@ -77,12 +226,151 @@ class SocketManager:
         
         return availability
     
+    def get_node_stats(self, philosopher_id: int, timeout: float = 1.0) -> Optional[Dict]:
+        name = self.philosophers[philosopher_id]["name"]
+        try:
+            response = self._exchange(philosopher_id, {"type": MSG_TYPE_STATS}, timeout)
+        except Exception as e:
+            logger.warning(f"Statistiques indisponibles pour {name}: {e}")
+            return None
+        
+        # Les nœuds antérieurs au message STATS ferment la connexion sans répondre
+        if not response or response.get("type") != "STATS_ACK":
+            return None
+        response.pop("timings", None)
+        
+        processes = response.get("processes", 1)
+        if processes <= 1:
+            return response
+        
+        # Avec SO_REUSEPORT, chaque connexion aboutit à l'un des workers: on en
+        # ouvre de nouvelles jusqu'à avoir entendu chaque processus
+        workers = {response["pid"]: response}
+        for _ in range(processes * NODE_STATS_PROBES):
+            if len(workers) >= processes:
+                break
+            probe = self._probe_node_stats(philosopher_id, timeout)
+            if probe is not None:
+                workers.setdefault(probe["pid"], probe)
+        if len(workers) < processes:
+            logger.warning(f"Statistiques de {name}: {len(workers)}/{processes} workers joints")
+        return self._merge_worker_stats(list(workers.values()))
+    
+    def _probe_node_stats(self, philosopher_id: int, timeout: float) -> Optional[Dict]:
+        """STATS sur une connexion neuve, hors du pool"""
+        port = self.philosophers[philosopher_id]["port"]
+        conn = NodeConnection(philosopher_id, self.host, port, timeout)
+        try:
+            conn.connect()
+            response = conn.request({"type": MSG_TYPE_STATS}, timeout)
+        except Exception as e:
+            logger.debug(f"Sonde STATS vers le port {port} échouée: {e}")
+            return None
+        finally:
+            conn.close()
+        
+        if response.get("type") != "STATS_ACK":
+            return None
+        response.pop("timings", None)
+        return response
+    
+    @staticmethod
+    def _merge_worker_stats(workers: List[Dict]) -> Dict:
+        """Statistiques d'un philosophe servi par plusieurs processus: compteurs sommés, histogrammes fusionnés"""
+        merged = dict(workers[0])
+        for key in ("requests_served", "requests_failed", "in_flight", "computing"):
+            merged[key] = sum(worker[key] for worker in workers)
+        merged["uptime"] = max(worker["uptime"] for worker in workers)
+        
+        scoring = LatencyHistogram.merged(
+            LatencyHistogram.from_dict(worker["scoring_histogram"]) for worker in workers
+        )
+        merged["scoring"] = scoring.summary()
+        merged["scoring_histogram"] = scoring.to_dict()
+        
+        cache = dict(workers[0]["cache"])
+        for key in ("size", "max_size", "hits", "misses", "evictions", "expirations", "invalidations"):
+            cache[key] = sum(worker["cache"][key] for worker in workers)
+        lookups = cache["hits"] + cache["misses"]
+        cache["hit_rate"] = round(cache["hits"] / lookups * 100, 1) if lookups else 0.0
+        merged["cache"] = cache
+        
+        del merged["pid"]
+        merged["workers_reporting"] = len(workers)
+        merged["workers"] = [
+            {
+                "pid": worker["pid"],
+                "uptime": worker["uptime"],
+                "requests_served": worker["requests_served"],
+                "in_flight": worker["in_flight"]
+            }
+            for worker in sorted(workers, key=lambda worker: worker["pid"])
+        ]
+        return merged
+    
+    def collect_node_stats(self) -> Dict:
+        """Interroge les nœuds actifs en parallèle et agrège leurs compteurs internes"""
+        node_ids = list(self.active_nodes.keys())
+        stats: Dict[int, Optional[Dict]] = {phil_id: None for phil_id in self.philosophers}
+        
+        if node_ids:
+            with ThreadPoolExecutor(max_workers=len(node_ids)) as executor:
+                for phil_id, node_stats in zip(node_ids, executor.map(self.get_node_stats, node_ids)):
+                    stats[phil_id] = node_stats
+        
+        scoring = LatencyHistogram()
+        reporting = [node for node in stats.values() if node]
+        for phil_id, node in stats.items():
+            if not node:
+                continue
+            node_scoring = LatencyHistogram.from_dict(node.pop("scoring_histogram"))
+            scoring.merge(node_scoring)
+            
+            # Ce que le coordinateur observe moins ce que le nœud passe à calculer
+            observed = self.latency.percentile(phil_id, 50, min_samples=1)
+            node["coordinator_latency_p50"] = round(observed, 6) if observed is not None else None
+            node["overhead_p50"] = (
+                round(max(observed - node_scoring.percentile(50), 0.0), 6)
+                if observed is not None and node_scoring.count else None
+            )
+        
+        cache_hits = sum(node["cache"]["hits"] for node in reporting)
+        cache_lookups = cache_hits + sum(node["cache"]["misses"] for node in reporting)
+        
+        return {
+            "nodes": stats,
+            "cluster": {
+                "nodes_reporting": len(reporting),
+                "requests_served": sum(node["requests_served"] for node in reporting),
+                "requests_failed": sum(node["requests_failed"] for node in reporting),
+                "in_flight": sum(node["in_flight"] for node in reporting),
+                "cache_hits": cache_hits,
+                "cache_hit_rate": round(cache_hits / cache_lookups * 100, 1) if cache_lookups else 0.0,
+                "corpus_quotes": sum(node["corpus"]["quotes"] for node in reporting),
+                "scoring": scoring.summary()
+            }
+        }
+    
     def send_request_to_node(
         self, 
         philosopher_id: int, 
         context: Optional[str],
         keywords: List[str],
-        category_name: Optional[str]
+        category_name: Optional[str],
+        deadline: Optional[float] = None
+    ) -> Optional[Dict]:
+        with trace_span("node_request", node=philosopher_id):
+            return self._send_request_to_node(
+                philosopher_id, context, keywords, category_name, deadline
+            )
+    
+    def _send_request_to_node(
+        self, 
+        philosopher_id: int, 
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str],
+        deadline: Optional[float] = None
     ) -> Optional[Dict]:
         if philosopher_id not in self.philosophers:
             logger.error(f"ID philosophe invalide: {philosopher_id}")
@@ -90,6 +378,8 @@ class SocketManager:
         
         port = self.philosophers[philosopher_id]["port"]
         name = self.philosophers[philosopher_id]["name"]
+        call_start = time.time()
+        deadline = deadline or call_start + REQUEST_DEADLINE
         
         request = {
             "type": MSG_TYPE_REQUEST,
@@ -97,42 +387,51 @@ class SocketManager:
             "keywords": keywords,
             "category": category_name or ""
         }
-        
-        request_json = json.dumps(request)
+        trace = current_context()
+        if trace:
+            request["trace"] = trace
         
         for attempt in range(CONNECTION_RETRY):
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                logger.warning(f"Échéance atteinte pour {name} avant la tentative {attempt + 1}")
+                break
+            
+            timeout = min(self.latency.timeout_for(philosopher_id), remaining)
+            started = time.time()
             try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(SOCKET_TIMEOUT)
-                sock.connect((HOST, port))
-                
-                sock.sendall(request_json.encode('utf-8'))
-                logger.debug(f"Requête envoyée à {name} (tentative {attempt + 1})")
-                
-                response_data = sock.recv(4096).decode('utf-8')
-                sock.close()
+                logger.debug(f"Requête envoyée à {name} (tentative {attempt + 1}, timeout {timeout:.3f}s)")
+                response = self._exchange(philosopher_id, request, timeout, hedge=True)
                 
-                if not response_data:
+                if not response:
                     logger.warning(f"Réponse vide de {name}")
                     continue
                 
-                response = parse_message(response_data)
-                
-                if response:
-                    logger.info(
-                        f"Réponse reçue de {name}: "
-                        f"vote={response.get('vote')}, score={response.get('score')}"
-                    )
-                    return response
+                self.latency.record(philosopher_id, time.time() - started)
+                merge_timings(response, total=time.time() - call_start)
+                tracer.add_spans(response.pop("spans", None))
+                annotate(attempts=attempt + 1, vote=response.get("vote"))
+                logger.info(
+                    f"Réponse reçue de {name}: "
+                    f"vote={response.get('vote')}, score={response.get('score')}"
+                )
+                return response
                 
-            except socket.timeout:
+            except (socket.timeout, FutureTimeoutError):
+                self.latency.record_timeout(philosopher_id, time.time() - started)
                 logger.warning(f"Timeout en attendant {name} (tentative {attempt + 1})")
                 if attempt < CONNECTION_RETRY - 1:
-                    time.sleep(0.5)
+                    time.sleep(jittered_backoff(attempt, deadline - time.time()))
                     
             except ConnectionRefusedError:
                 logger.error(f"Connexion refusée par {name} sur le port {port}")
+                self._drop_connection(philosopher_id, forget_version=True)
                 break
+            
+            except (ConnectionError, ProtocolError) as e:
+                logger.warning(f"Connexion perdue avec {name} (tentative {attempt + 1}): {e}")
+                if attempt < CONNECTION_RETRY - 1:
+                    time.sleep(jittered_backoff(attempt, deadline - time.time()))
                 
             except Exception as e:
                 logger.error(f"Erreur de communication avec {name}: {e}")
@@ -145,14 +444,18 @@ class SocketManager:
         self,
         context: Optional[str],
         keywords: List[str],
-        category_name: Optional[str]
+        category_name: Optional[str],
+        session: Optional[ConsensusSession] = None
     ) -> Dict[int, Optional[Dict]]:
-        logger.info(f"[SEQUENTIAL] Diffusion de la requête à {len(self.active_nodes)} nœuds actifs...")
+        node_ids = list(self.active_nodes.keys())
+        logger.info(f"[SEQUENTIAL] Diffusion de la requête à {len(node_ids)} nœuds actifs...")
         start_time = time.time()
         
         responses = {}
+        if session is not None:
+            session.expect(node_ids)
         
-        for phil_id in self.active_nodes.keys():
+        for phil_id in node_ids:
             response = self.send_request_to_node(
                 philosopher_id=phil_id,
                 context=context,
@@ -160,12 +463,15 @@ class SocketManager:
                 category_name=category_name
             )
             responses[phil_id] = response
+            
+            if session is not None and session.add_response(phil_id, response):
+                break
         
         elapsed = time.time() - start_time
         successful = sum(1 for r in responses.values() if r is not None)
         
         logger.info(
-            f"[SEQUENTIAL] Diffusion terminée: {successful}/{len(self.active_nodes)} nœuds "
+            f"[SEQUENTIAL] Diffusion terminée: {successful}/{len(node_ids)} nœuds "
             f"ont répondu en {elapsed:.3f}s"
         )
         
@@ -176,12 +482,13 @@ class SocketManager:
                     start_time=start_time,
                     end_time=time.time(),
                     duration=elapsed,
-                    active_nodes=len(responses),
+                    active_nodes=len(node_ids),
                     successful_responses=successful,
                     failed_responses=len(responses) - successful,
-                    node_timings={phil_id: 0.0 for phil_id in responses.keys()},
+                    node_timings=node_timings_from(responses),
                     context=context or "",
-                    timestamp=time.time()
+                    timestamp=time.time(),
+                    node_phase_timings=node_phase_timings_from(responses)
                 )
                 profiler.record_result(result)
                 logger.info(f"[PROFILING] Sequential result recorded: {elapsed:.3f}s")
@@ -195,12 +502,16 @@ class SocketManager:
         context: Optional[str],
         keywords: List[str],
         category_name: Optional[str],
-        max_workers: int = 6
+        max_workers: int = 6,
+        session: Optional[ConsensusSession] = None
     ) -> Dict[int, Optional[Dict]]:
-        logger.info(f"[PARALLEL] Diffusion de la requête à {len(self.active_nodes)} nœuds actifs...")
+        node_ids = list(self.active_nodes.keys())
+        logger.info(f"[PARALLEL] Diffusion de la requête à {len(node_ids)} nœuds actifs...")
         start_time = time.time()
         
         responses = {}
+        if session is not None:
+            session.expect(node_ids)
         
         def send_to_node(phil_id: int) -> Tuple[int, Optional[Dict]]:
             response = self.send_request_to_node(
@@ -211,10 +522,11 @@ class SocketManager:
             )
             return (phil_id, response)
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
             future_to_phil = {
-                executor.submit(send_to_node, phil_id): phil_id 
-                for phil_id in self.active_nodes.keys()
+                executor.submit(contextvars.copy_context().run, send_to_node, phil_id): phil_id 
+                for phil_id in node_ids
             }
             
             for future in as_completed(future_to_phil):
@@ -225,12 +537,19 @@ class SocketManager:
                     phil_id = future_to_phil[future]
                     logger.error(f"Exception lors de la requête parallèle au nœud {phil_id}: {e}")
                     responses[phil_id] = None
+                
+                if session is not None and session.add_response(phil_id, responses[phil_id]):
+                    break
+        finally:
+            # Sans consensus anticipé toutes les tâches sont déjà terminées;
+            # sinon les retardataires finissent en arrière-plan et sont ignorés
+            executor.shutdown(wait=False, cancel_futures=True)
         
         elapsed = time.time() - start_time
         successful = sum(1 for r in responses.values() if r is not None)
         
         logger.info(
-            f"[PARALLEL] Diffusion terminée: {successful}/{len(self.active_nodes)} nœuds "
+            f"[PARALLEL] Diffusion terminée: {successful}/{len(node_ids)} nœuds "
             f"ont répondu en {elapsed:.3f}s"
         )
         
@@ -241,12 +560,13 @@ class SocketManager:
                     start_time=start_time,
                     end_time=time.time(),
                     duration=elapsed,
-                    active_nodes=len(responses),
+                    active_nodes=len(node_ids),
                     successful_responses=successful,
                     failed_responses=len(responses) - successful,
-                    node_timings={phil_id: 0.0 for phil_id in responses.keys()},
+                    node_timings=node_timings_from(responses),
                     context=context or "",
-                    timestamp=time.time()
+                    timestamp=time.time(),
+                    node_phase_timings=node_phase_timings_from(responses)
                 )
                 profiler.record_result(result)
                 logger.info(f"[PROFILING] Parallel result recorded: {elapsed:.3f}s")
@@ -255,6 +575,81 @@ class SocketManager:
         
         return responses
     
+    def _get_embedded(self) -> EmbeddedCluster:
+        """Crée le cluster embarqué à la première utilisation, une seule fois même en concurrence"""
+        if self.embedded is None:
+            with self._embedded_lock:
+                if self.embedded is None:
+                    self.embedded = EmbeddedCluster(self.philosophers)
+        return self.embedded
+    
+    def broadcast_request_embedded(
+        self,
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str]
+    ) -> Dict[int, Optional[Dict]]:
+        embedded = self._get_embedded()
+        
+        logger.info(f"[EMBEDDED] Diffusion de la requête à {len(self.philosophers)} cœurs embarqués...")
+        start_time = time.time()
+        
+        request = {
+            "type": MSG_TYPE_REQUEST,
+            "context": context or "",
+            "keywords": keywords,
+            "category": category_name or ""
+        }
+        trace = current_context()
+        if trace:
+            request["trace"] = trace
+        
+        futures = {
+            phil_id: embedded.submit(phil_id, request)
+            for phil_id in self.philosophers.keys()
+        }
+        
+        responses = {}
+        for phil_id, future in futures.items():
+            try:
+                responses[phil_id] = merge_timings(
+                    future.result(timeout=SOCKET_TIMEOUT), total=time.time() - start_time
+                )
+                tracer.add_spans(responses[phil_id].pop("spans", None))
+            except Exception as e:
+                logger.error(f"Exception lors du traitement embarqué pour le nœud {phil_id}: {e}")
+                responses[phil_id] = None
+        
+        elapsed = time.time() - start_time
+        successful = sum(1 for r in responses.values() if r is not None)
+        
+        logger.info(
+            f"[EMBEDDED] Diffusion terminée: {successful}/{len(responses)} cœurs "
+            f"ont répondu en {elapsed:.3f}s"
+        )
+        
+        if PROFILING_ENABLED:
+            try:
+                result = ProfileResult(
+                    method="embedded",
+                    start_time=start_time,
+                    end_time=time.time(),
+                    duration=elapsed,
+                    active_nodes=len(responses),
+                    successful_responses=successful,
+                    failed_responses=len(responses) - successful,
+                    node_timings=node_timings_from(responses),
+                    context=context or "",
+                    timestamp=time.time(),
+                    node_phase_timings=node_phase_timings_from(responses)
+                )
+                profiler.record_result(result)
+                logger.info(f"[PROFILING] Embedded result recorded: {elapsed:.3f}s")
+            except Exception as e:
+                logger.error(f"Error recording profiling result: {e}")
+        
+        return responses
+    
     def get_active_nodes_info(self) -> List[Dict]:
         return [
             {
@@ -268,6 +663,18 @@ class SocketManager:
     
     def get_nodes_count(self) -> Tuple[int, int]:
         return len(self.active_nodes), len(self.philosophers)
+    
+    def get_pool_stats(self) -> Dict:
+        stats = self.pool.get_stats()
+        stats["protocol_versions"] = dict(self.protocol_versions)
+        return stats
+    
+    def close(self):
+        self.pool.close_all()
+        with self._embedded_lock:
+            embedded, self.embedded = self.embedded, None
+        if embedded is not None:
+            embedded.close()
 
 
 if __name__ == "__main__":
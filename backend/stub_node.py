@@ -0,0 +1,476 @@
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import socket
+import struct
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Union
+
+from config import (
+    HOST, PHILOSOPHERS, ACCEPT_THRESHOLD,
+    MSG_TYPE_REQUEST, MSG_TYPE_HEARTBEAT, MSG_TYPE_HELLO, MSG_TYPE_HELLO_ACK,
+    MSG_TYPE_STATS, MSG_TYPE_SHUTDOWN, PROTOCOL_VERSION, LEGACY_PROTOCOL_VERSION,
+    NODE_BACKLOG, NODE_MAX_MESSAGE_SIZE
+)
+from utils import build_response_message, determine_vote
+from histogram import LatencyHistogram
+from tracing import SpanRecorder
+from protocol import FrameDecoder, ProtocolError, encode_raw_frame, is_framed
+
+logger = logging.getLogger(__name__)
+
+LatencySpec = Union[float, str, Callable[[random.Random], float]]
+
+
+def latency_sampler(spec: LatencySpec) -> Callable[[random.Random], float]:
+    """
+    Distribution de latence: constante (0.01), fonction rng -> secondes, ou
+    chaîne "const:0.01", "uniform:0.005:0.02", "normal:0.01:0.002",
+    "lognormal:0.01:0.5" (médiane, sigma) ou "exp:0.01" (moyenne).
+    """
+    if callable(spec):
+        return spec
+    if isinstance(spec, (int, float)):
+        return lambda rng: float(spec)
+
+    kind, *params = spec.split(":")
+    values = [float(p) for p in params]
+    if kind == "const":
+        return lambda rng: values[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return lambda rng: max(rng.gauss(values[0], values[1]), 0.0)
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    if kind == "exp":
+        return lambda rng: rng.expovariate(1.0 / values[0])
+    raise ValueError(f"Distribution de latence inconnue: {spec}")
+
+
+class StubNode:
+    """
+    Faux nœud philosophe parlant le même protocole que PhilosopherNode (v2
+    tramé ou v1 JSON brut), avec latence et pannes injectées de façon
+    reproductible: chaque requête tire ses aléas d'un RNG dérivé de
+    (seed, philosophe, numéro de requête), donc une même séquence de
+    requêtes produit toujours les mêmes réponses et les mêmes pannes.
+    """
+
+    def __init__(
+        self,
+        philosopher_id: int,
+        port: int = 0,
+        host: str = HOST,
+        latency: LatencySpec = 0.0,
+        drop_rate: float = 0.0,
+        refuse_rate: float = 0.0,
+        garble_rate: float = 0.0,
+        partial_rate: float = 0.0,
+        script: Optional[List[Dict]] = None,
+        legacy: bool = False,
+        seed: int = 0
+    ):
+        self.philosopher_id = philosopher_id
+        self.name = PHILOSOPHERS[philosopher_id]["name"]
+        self.host = host
+        self.port = port
+        self.sample_latency = latency_sampler(latency)
+        self.drop_rate = drop_rate
+        self.refuse_rate = refuse_rate
+        self.garble_rate = garble_rate
+        self.partial_rate = partial_rate
+        self.script = script
+        self.legacy = legacy
+        self.seed = seed
+
+        self.socket = None
+        self.running = False
+        self.started_at = time.time()
+        self.scoring_histogram = LatencyHistogram()
+        self.counters = {
+            "requests": 0, "responses": 0, "dropped": 0,
+            "garbled": 0, "partial": 0, "refused": 0
+        }
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._accept_rng = random.Random(f"{seed}:{philosopher_id}:accept")
+        self._clients: List[socket.socket] = []
+
+    def start(self) -> "StubNode":
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(NODE_BACKLOG)
+        self.port = sock.getsockname()[1]
+        self.socket = sock
+        self.running = True
+
+        threading.Thread(
+            target=self._accept_loop, name=f"stub-{self.philosopher_id}", daemon=True
+        ).start()
+        logger.info(f"Nœud factice {self.name} démarré sur le port {self.port}")
+        return self
+
+    def stop(self):
+        """Ferme l'écoute et les connexions: les connexions suivantes sont refusées"""
+        self.running = False
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+        with self._lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            self._close(client)
+
+    def _accept_loop(self):
+        listener = self.socket
+        while self.running:
+            try:
+                client, _ = listener.accept()
+            except OSError:
+                return
+
+            with self._lock:
+                refused = self._accept_rng.random() < self.refuse_rate
+                if refused:
+                    self.counters["refused"] += 1
+                else:
+                    self._clients.append(client)
+            if refused:
+                # RST immédiat plutôt qu'une fermeture propre
+                client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+                client.close()
+                continue
+
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _serve(self, client: socket.socket):
+        send_lock = threading.Lock()
+        try:
+            data = client.recv(65536)
+            if not data:
+                return
+            if not is_framed(data):
+                self._serve_legacy(client, data)
+                return
+            if self.legacy:
+                # Un nœud v1 ne comprend pas la poignée de main tramée
+                return
+
+            decoder = FrameDecoder()
+            while data:
+                for request_id, message in decoder.feed(data):
+                    self._dispatch(client, send_lock, message, request_id)
+                data = client.recv(65536)
+        except (OSError, ProtocolError):
+            pass
+        finally:
+            with self._lock:
+                if client in self._clients:
+                    self._clients.remove(client)
+            self._close(client)
+
+    def _serve_legacy(self, client: socket.socket, data: bytes):
+        buffer = bytearray(data)
+        while len(buffer) <= NODE_MAX_MESSAGE_SIZE:
+            try:
+                message = json.loads(buffer.decode('utf-8'))
+                break
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                chunk = client.recv(65536)
+                if not chunk:
+                    return
+                buffer += chunk
+        else:
+            return
+
+        if isinstance(message, dict):
+            self._dispatch(client, threading.Lock(), message, None)
+
+    def _dispatch(
+        self, client: socket.socket, send_lock: threading.Lock, message: Dict, request_id: Optional[int]
+    ):
+        msg_type = message.get("type")
+
+        if msg_type == MSG_TYPE_REQUEST:
+            with self._lock:
+                self.counters["requests"] += 1
+                sequence = self.counters["requests"]
+                self._in_flight += 1
+            rng = random.Random(f"{self.seed}:{self.philosopher_id}:{sequence}")
+            if request_id is None:
+                self._respond(client, send_lock, message, request_id, rng, sequence)
+            else:
+                threading.Thread(
+                    target=self._respond,
+                    args=(client, send_lock, message, request_id, rng, sequence),
+                    daemon=True
+                ).start()
+
+        elif msg_type == MSG_TYPE_HELLO and request_id is not None:
+            self._send(client, send_lock, request_id, {
+                "type": MSG_TYPE_HELLO_ACK,
+                "version": min(message.get("version", 1), PROTOCOL_VERSION),
+                "philosopher_id": self.philosopher_id,
+                "philosopher": self.name
+            })
+
+        elif msg_type == MSG_TYPE_HEARTBEAT:
+            self._send(client, send_lock, request_id, {
+                "type": "HEARTBEAT_ACK",
+                "philosopher": self.name,
+                "status": "en vie"
+            })
+
+        elif msg_type == MSG_TYPE_STATS:
+            self._send(client, send_lock, request_id, {"type": "STATS_ACK", **self.get_stats()})
+
+        elif msg_type == MSG_TYPE_SHUTDOWN:
+            self.stop()
+
+    def _respond(
+        self,
+        client: socket.socket,
+        send_lock: threading.Lock,
+        request: Dict,
+        request_id: Optional[int],
+        rng: random.Random,
+        sequence: int
+    ):
+        start = time.perf_counter()
+        latency = self.sample_latency(rng)
+        fault = rng.random()
+        response = self._scripted_response(request, rng, sequence)
+
+        trace = request.get("trace")
+        if trace:
+            recorder = SpanRecorder(
+                trace["trace_id"], trace.get("parent_id"), self.name, self.philosopher_id
+            )
+            with recorder.span("handle_request", philosopher=self.name, stub=True):
+                time.sleep(latency)
+            response["spans"] = recorder.spans
+        else:
+            time.sleep(latency)
+
+        elapsed = time.perf_counter() - start
+        self.scoring_histogram.record(elapsed)
+        response["timings"] = {"compute": elapsed}
+
+        try:
+            if fault < self.drop_rate:
+                self._count("dropped")
+            elif fault < self.drop_rate + self.garble_rate:
+                self._count("garbled")
+                self._send_bytes(client, send_lock, request_id, b'{"type": "RESPONSE", "vote": ')
+            elif fault < self.drop_rate + self.garble_rate + self.partial_rate:
+                self._count("partial")
+                payload = json.dumps(response).encode('utf-8')
+                data = encode_raw_frame(request_id, payload) if request_id is not None else payload
+                with send_lock:
+                    client.sendall(data[:len(data) // 2])
+                self._close(client)
+            else:
+                self._count("responses")
+                self._send(client, send_lock, request_id, response)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _scripted_response(self, request: Dict, rng: random.Random, sequence: int) -> Dict:
+        """Réponse suivante du script (cyclique), ou vote tiré au hasard sans script"""
+        if self.script:
+            entry = self.script[(sequence - 1) % len(self.script)]
+            score = entry.get("score", 0.0)
+            vote = entry.get("vote") or determine_vote(score, ACCEPT_THRESHOLD)
+            quote_id = entry.get("quote_id", 1)
+        else:
+            score = round(rng.uniform(0.0, 10.0), 2)
+            vote = determine_vote(score, ACCEPT_THRESHOLD)
+            quote_id = rng.randint(1, 5)
+
+        if vote == "Abstain" or quote_id is None:
+            return {
+                "type": "RESPONSE",
+                "philosopher_id": self.philosopher_id,
+                "philosopher_name": self.name,
+                "quote": None,
+                "score": 0.0,
+                "vote": "Abstain",
+                "reasoning": "Réponse factice"
+            }
+
+        quote = {
+            "quoteId": quote_id,
+            "philosopherId": self.philosopher_id,
+            "quote": f"Citation factice #{quote_id}",
+            "source": "stub",
+            "categoryName": request.get("category") or None
+        }
+        return build_response_message(
+            self.philosopher_id, self.name, quote, score, vote, "Réponse factice"
+        )
+
+    def _send(self, client: socket.socket, send_lock: threading.Lock, request_id: Optional[int], message: Dict):
+        self._send_bytes(client, send_lock, request_id, json.dumps(message).encode('utf-8'))
+
+    def _send_bytes(
+        self, client: socket.socket, send_lock: threading.Lock, request_id: Optional[int], payload: bytes
+    ):
+        if request_id is None:
+            with send_lock:
+                client.sendall(payload)
+            self._close(client)
+            return
+        with send_lock:
+            client.sendall(encode_raw_frame(request_id, payload))
+
+    def _count(self, counter: str):
+        with self._lock:
+            self.counters[counter] += 1
+
+    @staticmethod
+    def _close(client: socket.socket):
+        try:
+            client.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        client.close()
+
+    def get_stats(self) -> Dict:
+        """Mêmes champs que PhilosopherNode.get_stats, plus les pannes injectées"""
+        with self._lock:
+            counters = dict(self.counters)
+            in_flight = self._in_flight
+
+        return {
+            "philosopher_id": self.philosopher_id,
+            "philosopher": self.name,
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started_at, 1),
+            "server_mode": "stub",
+            "scoring_engine": "stub",
+            "protocol_version": LEGACY_PROTOCOL_VERSION if self.legacy else PROTOCOL_VERSION,
+            "requests_served": counters["responses"],
+            "requests_failed": counters["dropped"] + counters["garbled"] + counters["partial"],
+            "in_flight": in_flight,
+            "computing": in_flight,
+            "scoring": self.scoring_histogram.summary(),
+            "scoring_histogram": self.scoring_histogram.to_dict(),
+            "cache": {"size": 0, "hits": 0, "misses": 0},
+            "corpus": {"quotes": 0, "version": 0, "terms": None},
+            "faults": counters
+        }
+
+
+class StubCluster:
+    """
+    Ensemble de nœuds factices dans le processus courant. `defaults` s'applique
+    à tous les nœuds, `nodes` surcharge la configuration par philosophe:
+
+        with StubCluster({3: {"drop_rate": 0.5}}, defaults={"latency": "exp:0.01"}) as cluster:
+            manager = SocketManager(cluster.philosophers, cluster.host)
+    """
+
+    def __init__(
+        self,
+        nodes: Optional[Dict[int, Dict]] = None,
+        defaults: Optional[Dict] = None,
+        philosopher_ids: Optional[List[int]] = None,
+        host: str = HOST,
+        seed: int = 0,
+        use_config_ports: bool = False
+    ):
+        self.host = host
+        nodes = nodes or {}
+        self.nodes: Dict[int, StubNode] = {}
+        for phil_id in philosopher_ids or list(PHILOSOPHERS.keys()):
+            options = {"seed": seed, **(defaults or {}), **nodes.get(phil_id, {})}
+            if use_config_ports:
+                options.setdefault("port", PHILOSOPHERS[phil_id]["port"])
+            self.nodes[phil_id] = StubNode(phil_id, host=host, **options)
+
+    @property
+    def philosophers(self) -> Dict[int, Dict]:
+        """Configuration PHILOSOPHERS pointant sur les ports des nœuds factices"""
+        return {
+            phil_id: {**PHILOSOPHERS[phil_id], "port": node.port}
+            for phil_id, node in self.nodes.items()
+        }
+
+    def start(self) -> "StubCluster":
+        for node in self.nodes.values():
+            node.start()
+        return self
+
+    def stop(self):
+        for node in self.nodes.values():
+            node.stop()
+
+    def get_stats(self) -> Dict[int, Dict]:
+        return {phil_id: node.get_stats() for phil_id, node in self.nodes.items()}
+
+    def __enter__(self) -> "StubCluster":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Nœuds philosophes factices sur les ports de config.py (latence et pannes injectées)"
+    )
+    parser.add_argument("--ids", default=None, help="Philosophes à simuler, ex: 1,2,3 (défaut: tous)")
+    parser.add_argument("--latency", default="0", help="Distribution de latence, ex: lognormal:0.01:0.5")
+    parser.add_argument("--drop", type=float, default=0.0, help="Probabilité de ne jamais répondre")
+    parser.add_argument("--refuse", type=float, default=0.0, help="Probabilité de couper une connexion entrante")
+    parser.add_argument("--garble", type=float, default=0.0, help="Probabilité d'une réponse JSON invalide")
+    parser.add_argument("--partial", type=float, default=0.0, help="Probabilité d'une réponse tronquée")
+    parser.add_argument("--script", default=None,
+                        help="Fichier JSON: liste de {vote, score, quote_id} rejouée en boucle")
+    parser.add_argument("--legacy", action="store_true", help="Ne parle que le protocole v1")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    latency = float(args.latency) if args.latency.replace(".", "", 1).isdigit() else args.latency
+    script = None
+    if args.script:
+        with open(args.script, encoding="utf-8") as f:
+            script = json.load(f)
+
+    cluster = StubCluster(
+        philosopher_ids=[int(i) for i in args.ids.split(",")] if args.ids else None,
+        defaults={
+            "latency": latency,
+            "drop_rate": args.drop,
+            "refuse_rate": args.refuse,
+            "garble_rate": args.garble,
+            "partial_rate": args.partial,
+            "script": script,
+            "legacy": args.legacy
+        },
+        seed=args.seed,
+        use_config_ports=True
+    ).start()
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("\nArrêt des nœuds factices")
+    finally:
+        cluster.stop()
@@ -0,0 +1,254 @@
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from config import (
+    HOST, PHILOSOPHERS, MSG_TYPE_SHUTDOWN, NODE_DRAIN_TIMEOUT,
+    SUPERVISOR_WORKERS, SUPERVISOR_POLL_INTERVAL, SUPERVISOR_RESTART_BACKOFF,
+    SUPERVISOR_MAX_BACKOFF, SUPERVISOR_STABLE_AFTER
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+logger = logging.getLogger("Superviseur")
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+NODE_SCRIPT = os.path.join(BACKEND_DIR, "node_philosopher.py")
+
+
+class WorkerProcess:
+    """Un processus nœud surveillé (un philosophe peut en avoir plusieurs)"""
+
+    def __init__(self, philosopher_id: int, index: int):
+        self.philosopher_id = philosopher_id
+        self.index = index
+        self.process: Optional[subprocess.Popen] = None
+        self.started_at = 0.0
+        self.restarts = 0
+        self.failures = 0
+        self.next_start = 0.0
+
+    @property
+    def label(self) -> str:
+        return f"{PHILOSOPHERS[self.philosopher_id]['name']}#{self.index}"
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+
+class NodeSupervisor:
+
+    def __init__(
+        self,
+        philosopher_ids: Optional[List[int]] = None,
+        workers: Optional[int] = None,
+        server_mode: Optional[str] = None,
+        scoring_engine: Optional[str] = None,
+        drain_timeout: float = NODE_DRAIN_TIMEOUT
+    ):
+        self.philosopher_ids = philosopher_ids or list(PHILOSOPHERS.keys())
+        self.workers = workers or SUPERVISOR_WORKERS
+        self.server_mode = server_mode
+        self.scoring_engine = scoring_engine
+        self.drain_timeout = drain_timeout
+
+        if self.workers > 1 and not hasattr(socket, "SO_REUSEPORT"):
+            logger.warning("SO_REUSEPORT indisponible sur cette plateforme, un seul worker par nœud")
+            self.workers = 1
+
+        self.processes: Dict[int, List[WorkerProcess]] = {
+            phil_id: [WorkerProcess(phil_id, i) for i in range(self.workers)]
+            for phil_id in self.philosopher_ids
+        }
+        self.running = False
+
+    def _command(self, worker: WorkerProcess) -> List[str]:
+        command = [sys.executable, NODE_SCRIPT, str(worker.philosopher_id)]
+        if self.server_mode:
+            command += ["--mode", self.server_mode]
+        if self.scoring_engine:
+            command += ["--engine", self.scoring_engine]
+        if self.workers > 1:
+            command += ["--reuse-port", "--processes", str(self.workers)]
+        return command
+
+    def _spawn(self, worker: WorkerProcess):
+        # Nœuds hors du groupe de processus du terminal: Ctrl+C n'atteint que le
+        # superviseur, qui les vide ensuite un par un via SHUTDOWN
+        if os.name == "nt":
+            isolation = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        else:
+            isolation = {"start_new_session": True}
+        worker.process = subprocess.Popen(self._command(worker), cwd=BACKEND_DIR, **isolation)
+        worker.started_at = time.time()
+        logger.info(f"Nœud {worker.label} démarré (pid {worker.process.pid})")
+
+    def start(self):
+        self.running = True
+        logger.info(
+            f"Démarrage de {len(self.philosopher_ids)} philosophes "
+            f"x {self.workers} worker(s)"
+        )
+        for workers in self.processes.values():
+            for worker in workers:
+                self._spawn(worker)
+
+    def poll(self):
+        now = time.time()
+
+        for workers in self.processes.values():
+            for worker in workers:
+                if worker.process is None:
+                    if now >= worker.next_start:
+                        worker.restarts += 1
+                        self._spawn(worker)
+                    continue
+
+                code = worker.process.poll()
+                if code is None:
+                    if now - worker.started_at >= SUPERVISOR_STABLE_AFTER:
+                        worker.failures = 0
+                    continue
+
+                worker.process = None
+                if code == 0:
+                    logger.info(f"Nœud {worker.label} arrêté proprement, pas de redémarrage")
+                    worker.next_start = float("inf")
+                    continue
+
+                worker.failures += 1
+                delay = min(
+                    SUPERVISOR_RESTART_BACKOFF * 2 ** (worker.failures - 1),
+                    SUPERVISOR_MAX_BACKOFF
+                )
+                worker.next_start = now + delay
+                logger.warning(
+                    f"Nœud {worker.label} terminé (code {code}), "
+                    f"redémarrage dans {delay:.1f}s"
+                )
+
+    def run(self):
+        self.start()
+        try:
+            while self.running:
+                self.poll()
+                time.sleep(SUPERVISOR_POLL_INTERVAL)
+        finally:
+            self.drain()
+
+    def _send_shutdown(self, philosopher_id: int) -> bool:
+        port = PHILOSOPHERS[philosopher_id]["port"]
+        try:
+            with socket.create_connection((HOST, port), timeout=1.0) as sock:
+                sock.sendall(json.dumps({"type": MSG_TYPE_SHUTDOWN}).encode('utf-8'))
+            return True
+        except OSError:
+            return False
+
+    def drain(self):
+        """Arrêt propre: SHUTDOWN à chaque worker, puis SIGTERM/SIGKILL aux retardataires"""
+        self.running = False
+        deadline = time.time() + self.drain_timeout
+        logger.info("Vidage des nœuds...")
+
+        for phil_id, workers in self.processes.items():
+            for worker in workers:
+                worker.next_start = float("inf")
+
+            # Chaque worker ferme son socket d'écoute dès réception de SHUTDOWN:
+            # les connexions suivantes atteignent donc les workers restants
+            while any(w.alive for w in workers) and time.time() < deadline:
+                if not self._send_shutdown(phil_id):
+                    break
+                time.sleep(0.1)
+
+        for worker in self._all_workers():
+            if worker.alive:
+                try:
+                    worker.process.wait(max(deadline - time.time(), 0.1))
+                except subprocess.TimeoutExpired:
+                    logger.warning(f"Nœud {worker.label} ne répond pas, envoi de SIGTERM")
+                    worker.process.terminate()
+
+        for worker in self._all_workers():
+            if worker.alive:
+                try:
+                    worker.process.wait(self.drain_timeout)
+                except subprocess.TimeoutExpired:
+                    logger.error(f"Nœud {worker.label} forcé à s'arrêter")
+                    worker.process.kill()
+                    worker.process.wait()
+
+        logger.info("Tous les nœuds sont arrêtés")
+
+    def _all_workers(self) -> List[WorkerProcess]:
+        return [worker for workers in self.processes.values() for worker in workers]
+
+    def get_status(self) -> Dict[int, List[Dict]]:
+        return {
+            phil_id: [
+                {
+                    "worker": worker.index,
+                    "pid": worker.process.pid if worker.alive else None,
+                    "alive": worker.alive,
+                    "restarts": worker.restarts,
+                    "uptime": round(time.time() - worker.started_at, 1) if worker.alive else 0.0
+                }
+                for worker in workers
+            ]
+            for phil_id, workers in self.processes.items()
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Superviseur des nœuds philosophes")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Processus par philosophe (SO_REUSEPORT si > 1)")
+    parser.add_argument("--only", default=None,
+                        help="Liste d'identifiants à lancer, ex: 1,3,5")
+    parser.add_argument("--mode", choices=["selector", "legacy"], default=None,
+                        help="Boucle serveur des nœuds")
+    parser.add_argument("--engine", choices=["linear", "index", "numpy"], default=None,
+                        help="Moteur de scoring des nœuds")
+    parser.add_argument("--drain-timeout", type=float, default=NODE_DRAIN_TIMEOUT,
+                        help="Délai maximal de vidage à l'arrêt (secondes)")
+    args = parser.parse_args()
+
+    philosopher_ids = None
+    if args.only:
+        philosopher_ids = [int(phil_id) for phil_id in args.only.split(",")]
+        unknown = [phil_id for phil_id in philosopher_ids if phil_id not in PHILOSOPHERS]
+        if unknown:
+            parser.error(f"ID philosophe invalide: {unknown}")
+
+    supervisor = NodeSupervisor(
+        philosopher_ids=philosopher_ids,
+        workers=args.workers,
+        server_mode=args.mode,
+        scoring_engine=args.engine,
+        drain_timeout=args.drain_timeout
+    )
+
+    def handle_signal(signum, frame):
+        logger.info("Signal d'arrêt reçu")
+        supervisor.running = False
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    supervisor.run()
+
+
+if __name__ == "__main__":
+    main()
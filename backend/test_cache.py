@@ -0,0 +1,145 @@
+import pytest
+
+import cache as cache_module
+from cache import LRUCache
+from node_philosopher import PhilosopherNode
+from utils import request_fingerprint
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache_module.time, "time", fake.time)
+    return fake
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.get_stats()["evictions"] == 1
+    assert len(cache) == 2
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUCache(max_size=10, ttl=5.0)
+    cache.put("a", 1)
+    clock.now += 4.9
+    assert cache.get("a") == 1
+    clock.now += 0.2
+    assert cache.get("a") is None
+
+    stats = cache.get_stats()
+    assert stats["expirations"] == 1
+    assert stats["size"] == 0
+
+
+def test_put_refreshes_value_and_expiry(clock):
+    cache = LRUCache(max_size=10, ttl=5.0)
+    cache.put("a", 1)
+    clock.now += 4.0
+    cache.put("a", 2)
+    clock.now += 4.0
+    assert cache.get("a") == 2
+
+
+def test_clear_counts_an_invalidation_and_stats_track_hits():
+    cache = LRUCache(max_size=10)
+    cache.clear()
+    cache.put("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    cache.clear()
+
+    stats = cache.get_stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 50.0
+    assert cache.get("a") is None
+
+
+def test_equivalent_requests_share_a_fingerprint():
+    base = request_fingerprint("Le  bonheur\tsimple", ["Vertu", "joie"], "Wisdom")
+    assert request_fingerprint("le bonheur simple", ["joie", "vertu"], "Wisdom") == base
+    assert request_fingerprint("le bonheur simple", ["joie", "vertu"], "Freedom") != base
+    assert request_fingerprint("le bonheur", ["joie", "vertu"], "Wisdom") != base
+
+
+def test_node_cache_is_invalidated_when_the_corpus_is_reloaded():
+    node = PhilosopherNode(1, scoring_engine="index")
+    request = {"type": "REQUEST", "context": "le bonheur", "keywords": ["vertu"], "category": "Wisdom"}
+
+    first = node._build_response(request)
+    again = node._build_response({**request, "context": "Le Bonheur", "keywords": ["VERTU"]})
+    assert again is first
+    assert node.cache.get_stats()["hits"] == 1
+
+    version = node.corpus_version
+    node.reload_quotes()
+    assert node.corpus_version == version + 1
+    assert len(node.cache) == 0
+
+    reloaded = node._build_response(request)
+    assert reloaded is not first
+    assert reloaded["quote"] == first["quote"]
+
+
+@pytest.fixture
+def coordinator(monkeypatch):
+    import asyncio
+    import server
+    from socket_manager import SocketManager
+    from stub_node import StubCluster
+
+    with StubCluster() as cluster:
+        manager = SocketManager(cluster.philosophers, cluster.host)
+        manager.scan_all_nodes()
+        monkeypatch.setattr(server, "socket_manager", manager)
+        monkeypatch.setattr(server, "consensus_cache", LRUCache(16))
+        monkeypatch.setattr(server, "consensus_cache_membership", None)
+
+        def recommend(**fields):
+            return asyncio.run(server.recommend_quote(server.RecommendationRequest(**fields)))
+
+        def served():
+            return sum(stats["requests_served"] for stats in cluster.get_stats().values())
+
+        yield server, manager, recommend, served
+        manager.close()
+
+
+def test_coordinator_reuses_consensus_for_equivalent_requests(coordinator):
+    server, manager, recommend, served = coordinator
+    first = recommend(context="le bonheur", keywords=["vertu", "joie"])
+    broadcast = served()
+
+    again = recommend(context="Le  Bonheur", keywords=["joie", "Vertu"])
+    assert served() == broadcast
+    assert again["winner"] == first["winner"]
+    assert server.consensus_cache.get_stats()["hits"] == 1
+
+    recommend(context="le bonheur", keywords=["vertu", "joie"], use_cache=False)
+    assert served() == broadcast + len(manager.active_nodes)
+
+
+def test_membership_change_invalidates_the_consensus_cache(coordinator):
+    server, manager, recommend, served = coordinator
+    recommend(context="la liberté", keywords=["choix"])
+    broadcast = served()
+
+    manager.membership_version += 1
+    recommend(context="la liberté", keywords=["choix"])
+    assert served() == broadcast + len(manager.active_nodes)
+    assert server.consensus_cache.get_stats()["invalidations"] == 1
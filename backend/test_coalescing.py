@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from coalescing import RequestCoalescer
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_calls_with_the_same_key_share_one_execution():
+    async def scenario():
+        coalescer = RequestCoalescer()
+        calls = []
+        release = asyncio.Event()
+
+        async def compute():
+            calls.append(1)
+            await release.wait()
+            return {"winner": 42}
+
+        callers = [asyncio.ensure_future(coalescer.run("key", compute)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        return coalescer, calls, await asyncio.gather(*callers)
+
+    coalescer, calls, results = run(scenario())
+    assert len(calls) == 1
+    assert [joined for _, joined in results] == [False, True, True, True, True]
+    assert all(result is results[0][0] for result, _ in results)
+
+    stats = coalescer.get_stats()
+    assert (stats["leaders"], stats["coalesced"], stats["max_waiters"], stats["in_flight"]) == (1, 4, 4, 0)
+
+
+def test_different_keys_and_later_calls_run_separately():
+    async def scenario():
+        coalescer = RequestCoalescer()
+        calls = []
+
+        async def compute(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value
+
+        first = await asyncio.gather(
+            coalescer.run("a", lambda: compute("a")),
+            coalescer.run("b", lambda: compute("b"))
+        )
+        later = await coalescer.run("a", lambda: compute("a2"))
+        return calls, first, later
+
+    calls, first, later = run(scenario())
+    assert sorted(calls) == ["a", "a2", "b"]
+    assert first == [("a", False), ("b", False)]
+    assert later == ("a2", False)
+
+
+def test_failure_is_shared_and_not_cached():
+    async def scenario():
+        coalescer = RequestCoalescer()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("nœud injoignable")
+
+        results = await asyncio.gather(
+            coalescer.run("key", failing), coalescer.run("key", failing), return_exceptions=True
+        )
+        retry = await coalescer.run("key", lambda: asyncio.sleep(0, result="ok"))
+        return results, retry
+
+    results, retry = run(scenario())
+    assert all(isinstance(error, RuntimeError) for error in results)
+    assert retry == ("ok", False)
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_execution():
+    async def scenario():
+        coalescer = RequestCoalescer()
+        release = asyncio.Event()
+
+        async def compute():
+            await release.wait()
+            return "done"
+
+        leader = asyncio.ensure_future(coalescer.run("key", compute))
+        waiter = asyncio.ensure_future(coalescer.run("key", compute))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return await leader
+
+    assert run(scenario()) == ("done", False)
@@ -0,0 +1,72 @@
+import threading
+import time
+
+import pytest
+
+from connection_pool import ConnectionPool
+from stub_node import StubCluster
+
+
+@pytest.fixture
+def cluster():
+    with StubCluster(philosopher_ids=[1]) as cluster:
+        yield cluster
+
+
+def slow_health_checks(pool, delay):
+    check = pool._is_healthy
+
+    def slow(conn):
+        time.sleep(delay)
+        return check(conn)
+
+    pool._is_healthy = slow
+
+
+def test_health_check_runs_outside_the_node_lock(cluster):
+    pool = ConnectionPool(cluster.host, cluster.philosophers, max_size=4, health_check_interval=0.0)
+    stale = pool.acquire(1)
+    slow_health_checks(pool, 0.5)
+
+    acquired = {}
+
+    def acquire(name):
+        start = time.time()
+        acquired[name] = (pool.acquire(1), time.time() - start)
+
+    prober = threading.Thread(target=acquire, args=("prober",))
+    prober.start()
+    time.sleep(0.1)
+    acquire("other")
+    prober.join()
+
+    other, waited = acquired["other"]
+    assert other is not stale
+    assert waited < 0.3
+    assert acquired["prober"][0] is stale
+    pool.close_all()
+
+
+def test_failed_health_check_replaces_the_connection(cluster):
+    pool = ConnectionPool(cluster.host, cluster.philosophers, health_check_interval=0.0)
+    stale = pool.acquire(1)
+    pool._is_healthy = lambda conn: False
+
+    fresh = pool.acquire(1)
+    stats = pool.get_stats(1)
+    assert fresh is not stale and not stale.alive
+    assert stats["health_check_failures"] == 1
+    assert stats["reconnects"] == 1
+    assert stats["open_connections"] == 1
+    pool.close_all()
+
+
+def test_hedge_never_reuses_the_primary_connection(cluster):
+    pool = ConnectionPool(cluster.host, cluster.philosophers, max_size=1)
+    primary = pool.acquire(1)
+
+    assert pool.acquire(1) is primary
+    hedge = pool.acquire(1, exclude=primary)
+    assert hedge is not primary and hedge.alive
+    assert pool.acquire(1, exclude=hedge) is primary
+    pool.close_all()
@@ -0,0 +1,98 @@
+import itertools
+import random
+
+from config import ACCEPT_THRESHOLD
+from consensus import ConsensusProtocol, ConsensusSession
+
+
+protocol = ConsensusProtocol()
+
+
+def response(philosopher_id, vote, score, quote_id=None):
+    return {
+        "philosopher_name": f"phil-{philosopher_id}",
+        "vote": vote,
+        "score": score,
+        "quote": {"quoteId": quote_id if quote_id is not None else philosopher_id * 100}
+    }
+
+
+def outcome(result):
+    winner = result["winner"]
+    return result["consensus"]["quorum_reached"], winner["quote_id"] if winner else None
+
+
+def test_pending_nodes_that_time_out_do_not_count_against_quorum():
+    bounds = {1: 9.0, 2: 9.0, 3: 2.0, 4: 2.0, 5: 9.0, 6: 9.0}
+    session = ConsensusSession(protocol, score_bounds=bounds)
+    session.expect(bounds)
+
+    session.add_response(1, response(1, "Accept", 5.0))
+    session.add_response(2, response(2, "Accept", 4.0))
+    session.add_response(5, response(5, "Reject", 1.0))
+    assert not session.add_response(6, response(6, "Reject", 1.0))
+
+    # 3 et 4 ne peuvent pas accepter, mais s'ils n'envoient rien le quorum est atteint
+    session.add_response(3, None)
+    assert session.add_response(4, None)
+
+    result = session.finalize()
+    expected = protocol.aggregate_votes(dict(session.responses))
+    assert result["early_termination"]["terminated"] is False
+    assert outcome(result) == outcome(expected) == (True, 100)
+
+
+def test_finalize_never_overrides_aggregate_votes():
+    bounds = {1: 9.0, 2: 9.0, 3: 2.0, 4: 2.0}
+    session = ConsensusSession(protocol, score_bounds=bounds)
+    session.expect(bounds)
+
+    session.add_response(1, response(1, "Reject", 1.0))
+    assert session.add_response(2, response(2, "Reject", 1.0))
+
+    result = session.finalize()
+    assert result["early_termination"]["reason"] == "quorum_unreachable"
+    assert result["early_termination"]["skipped"] == [3, 4]
+    assert outcome(result) == outcome(protocol.aggregate_votes(session.responses))
+
+
+def random_response(rng, philosopher_id, bound):
+    if rng.random() < 0.2:
+        return None
+    score = round(rng.uniform(0.0, bound), 2)
+    vote = "Accept" if score >= ACCEPT_THRESHOLD and rng.random() < 0.8 else rng.choice(["Reject", "Abstain"])
+    return response(philosopher_id, vote, score)
+
+
+def test_early_verdict_holds_whatever_the_skipped_nodes_do():
+    rng = random.Random(12)
+    ids = list(range(1, 7))
+    owners = {phil_id * 100: phil_id for phil_id in ids}
+    early = 0
+
+    for _ in range(3000):
+        bounds = {phil_id: rng.choice([2.0, 4.0, 6.0, 9.0]) for phil_id in ids}
+        order = rng.sample(ids, len(ids))
+        replies = {phil_id: random_response(rng, phil_id, bounds[phil_id]) for phil_id in ids}
+
+        session = ConsensusSession(protocol, score_bounds=bounds, quote_owners=owners)
+        session.expect(ids)
+        received = {}
+        for phil_id in order:
+            received[phil_id] = replies[phil_id]
+            if session.add_response(phil_id, replies[phil_id]):
+                break
+        result = session.finalize()
+        skipped = result["early_termination"]["skipped"]
+        if not skipped:
+            continue
+        early += 1
+
+        # Chaque nœud ignoré peut répondre ou non: toutes les combinaisons donnent la même issue
+        for present in itertools.product([False, True], repeat=len(skipped)):
+            responses = dict(received)
+            for phil_id, answered in zip(skipped, present):
+                responses[phil_id] = replies[phil_id] if answered else None
+            assert outcome(protocol.aggregate_votes(responses)) == outcome(result)
+
+    assert early > 0
@@ -0,0 +1,117 @@
+import random
+import statistics
+
+import pytest
+
+from histogram import LatencyHistogram, WindowedHistogram
+from profiling import Profiler, ProfileResult
+
+
+def test_cumulative_counts_include_values_at_or_below_each_bound():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(-4, 1.5) for _ in range(5000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    bounds = [0.0005, 0.001, 0.005, 0.01, 0.025, 0.1, 0.5, 1.0, 5.0]
+    counts = histogram.cumulative_counts(bounds)
+
+    assert counts == sorted(counts)
+    for bound, count in zip(bounds, counts):
+        assert count >= sum(1 for v in values if v <= bound)
+        assert count <= sum(1 for v in values if v <= bound * (1 + histogram.precision))
+
+
+def test_cumulative_counts_count_a_value_equal_to_the_bound():
+    histogram = LatencyHistogram()
+    histogram.record(0.25)
+    assert histogram.cumulative_counts([0.1, 0.25, 1.0]) == [0, 1, 1]
+
+
+def test_cumulative_counts_beyond_the_layout():
+    histogram = LatencyHistogram(min_value=0.001, max_value=1.0)
+    for value in (0.0001, 0.5, 0.9):
+        histogram.record(value)
+    assert histogram.cumulative_counts([0.001, 0.6, 100.0]) == [1, 2, 3]
+
+
+def exact_percentile(values, percent):
+    ordered = sorted(values)
+    rank = max(int(-(-percent / 100 * len(ordered) // 1)), 1)
+    return ordered[rank - 1]
+
+
+def test_percentiles_stay_within_the_relative_precision():
+    rng = random.Random(8)
+    values = [rng.lognormvariate(-3, 1.0) for _ in range(20000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    for percent in (1, 50, 90, 99, 99.9, 100):
+        expected = exact_percentile(values, percent)
+        assert abs(histogram.percentile(percent) - expected) <= expected * histogram.precision
+    assert min(values) <= histogram.percentile(0.001) and histogram.percentile(100) <= max(values)
+    assert histogram.summary()["count"] == len(values)
+
+
+def test_empty_histogram_reports_nothing():
+    summary = LatencyHistogram().summary()
+    assert summary["count"] == 0
+    assert summary["mean"] is None and summary["p99"] is None
+
+
+def test_merge_and_serialization_preserve_counts():
+    rng = random.Random(5)
+    parts = [LatencyHistogram() for _ in range(3)]
+    combined = LatencyHistogram()
+    for _ in range(3000):
+        value = rng.expovariate(20)
+        rng.choice(parts).record(value)
+        combined.record(value)
+
+    merged = LatencyHistogram.merged(LatencyHistogram.from_dict(part.to_dict()) for part in parts)
+    assert merged.buckets == combined.buckets
+    assert merged.summary() == combined.summary()
+
+
+def test_merge_rejects_a_different_layout():
+    with pytest.raises(ValueError):
+        LatencyHistogram().merge(LatencyHistogram(precision=0.05))
+
+
+def test_windowed_histogram_forgets_expired_slots():
+    histogram = WindowedHistogram(window=10.0, slots=5)
+    histogram.record(0.1, now=100.0)
+    histogram.record(0.2, now=105.0)
+    histogram.record(0.3, now=109.0)
+
+    assert histogram.snapshot(now=109.5).count == 3
+    assert histogram.snapshot(now=111.0).count == 2
+    assert histogram.snapshot(now=125.0).count == 0
+
+
+def test_profiler_statistics_follow_recorded_results():
+    profiler = Profiler(max_history=5)
+    durations = [0.1, 0.4, 0.2, 0.8, 0.3, 0.6, 0.5]
+    for i, duration in enumerate(durations):
+        profiler.record_result(ProfileResult(
+            method="parallel", start_time=i, end_time=i + duration, duration=duration,
+            active_nodes=4, successful_responses=3 if i % 2 else 4, failed_responses=0,
+            node_timings={1: duration / 2}, context="", timestamp=i,
+            node_phase_timings={1: {"compute": duration / 4}}
+        ))
+
+    stats = profiler.get_statistics()["parallel"]
+    assert stats["count"] == len(durations)
+    assert stats["avg_duration"] == round(statistics.mean(durations), 4)
+    assert stats["std_duration"] == round(statistics.stdev(durations), 4)
+    assert (stats["min_duration"], stats["max_duration"]) == (0.1, 0.8)
+    assert stats["total_requests"] == 28 and stats["total_successes"] == 25
+    assert stats["node_phases"][1]["compute"] == round(statistics.mean(durations) / 4, 6)
+    assert stats["latency"]["count"] == len(durations)
+    assert profiler.get_statistics()["sequential"]["count"] == 0
+
+    profiler.clear_results()
+    assert profiler.get_statistics()["parallel"]["count"] == 0
@@ -0,0 +1,100 @@
+import json
+from concurrent.futures import wait
+
+import pytest
+
+from config import MAX_FRAME_SIZE, MSG_TYPE_HEARTBEAT, MSG_TYPE_REQUEST
+from node_connection import NodeConnection
+from protocol import (
+    FRAME_HEADER, FrameDecoder, LegacyNodeError, ProtocolError,
+    encode_frame, encode_raw_frame, is_framed
+)
+from stub_node import StubCluster
+
+
+def test_frames_split_across_reads_are_reassembled():
+    message = {"type": "REQUEST", "context": "le bonheur è", "keywords": ["vertu"] * 50}
+    data = encode_frame(7, message)
+    decoder = FrameDecoder()
+
+    frames = []
+    for i in range(len(data)):
+        frames += decoder.feed(data[i:i + 1])
+        if i < len(data) - 1:
+            assert frames == []
+    assert frames == [(7, message)]
+    assert decoder.buffer == bytearray()
+
+
+def test_several_frames_in_one_read_keep_their_request_ids():
+    messages = [(3, {"n": 1}), (1, {"n": 2}), (3, {"n": 3}), (2, {})]
+    data = b"".join(encode_frame(request_id, message) for request_id, message in messages)
+    tail = encode_frame(9, {"n": 4})
+
+    decoder = FrameDecoder()
+    assert decoder.feed(data + tail[:5]) == messages
+    assert decoder.feed(tail[5:]) == [(9, {"n": 4})]
+
+
+def test_feed_raw_leaves_payloads_undecoded():
+    payload = json.dumps({"type": "PING"}).encode("utf-8")
+    assert FrameDecoder().feed_raw(encode_raw_frame(4, payload)) == [(4, payload)]
+
+
+def test_oversized_frames_are_rejected():
+    with pytest.raises(ProtocolError):
+        encode_raw_frame(1, b" " * (MAX_FRAME_SIZE + 1))
+    with pytest.raises(ProtocolError):
+        FrameDecoder().feed(FRAME_HEADER.pack(MAX_FRAME_SIZE + 1, 1))
+
+
+@pytest.mark.parametrize("payload", [b"[1, 2]", b"{not json", b"\xff\xfe"])
+def test_invalid_payloads_raise_protocol_error(payload):
+    with pytest.raises(ProtocolError):
+        FrameDecoder().feed(encode_raw_frame(1, payload))
+
+
+def test_framed_and_legacy_messages_are_told_apart():
+    assert is_framed(encode_frame(1, {"type": "HELLO"}))
+    assert not is_framed(b'{"type": "REQUEST"}')
+    assert not is_framed(b"")
+
+
+def test_connection_multiplexes_concurrent_requests():
+    with StubCluster({1: {"latency": "exp:0.02"}}, philosopher_ids=[1]) as cluster:
+        conn = NodeConnection(1, cluster.host, cluster.nodes[1].port, 2.0)
+        conn.connect()
+        try:
+            request = {"type": MSG_TYPE_REQUEST, "context": "le bonheur", "keywords": ["vertu"], "category": ""}
+            futures = []
+            for i in range(20):
+                message = request if i % 2 == 0 else {"type": MSG_TYPE_HEARTBEAT}
+                futures.append((message["type"], conn.submit(message)))
+
+            done, not_done = wait([future for _, future in futures], timeout=5.0)
+            assert not not_done
+            assert len({future.request_id for _, future in futures}) == 20
+            for sent_type, future in futures:
+                response = future.result()
+                assert (response.get("type") == "HEARTBEAT_ACK") == (sent_type == MSG_TYPE_HEARTBEAT)
+            assert conn.in_flight == 0
+        finally:
+            conn.close()
+
+
+def test_closing_a_connection_fails_pending_requests():
+    with StubCluster({1: {"latency": 1.0}}, philosopher_ids=[1]) as cluster:
+        conn = NodeConnection(1, cluster.host, cluster.nodes[1].port, 2.0)
+        conn.connect()
+        future = conn.submit({"type": MSG_TYPE_REQUEST, "context": "", "keywords": [], "category": ""})
+        conn.close()
+        with pytest.raises(ConnectionError):
+            future.result(timeout=1.0)
+        assert not conn.alive
+
+
+def test_legacy_node_refuses_the_handshake():
+    with StubCluster({1: {"legacy": True}}, philosopher_ids=[1]) as cluster:
+        conn = NodeConnection(1, cluster.host, cluster.nodes[1].port, 2.0)
+        with pytest.raises(LegacyNodeError):
+            conn.connect()
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from config import PHILOSOPHERS, QUOTES_JSON
+from quote_index import QuoteIndex
+from utils import load_json_file, get_philosopher_quotes, select_best_quote
+
+
+QUOTES = load_json_file(QUOTES_JSON)
+
+
+def sample_queries(quotes, count, seed):
+    rng = random.Random(seed)
+    words = [w for q in quotes for w in q["quote"].lower().split()] + ["ab", "de", "é", "Bonheur"]
+    keywords = [k for q in quotes for k in q.get("keywords", [])] + ["a", "ver", "zzz", "VERTU"]
+    categories = sorted({q["categoryName"] for q in quotes}) + [None, "wisdom", "dom"]
+    queries = [(None, [], None), ("", [], None), ("la vie", [], None)]
+    for _ in range(count):
+        context = " ".join(rng.sample(words, rng.randint(0, 6))) or None
+        queries.append((context, rng.sample(keywords, rng.randint(0, 4)), rng.choice(categories)))
+    return queries
+
+
+@pytest.mark.parametrize("philosopher_id", sorted(PHILOSOPHERS))
+def test_index_selects_the_same_quote_as_the_linear_scan(philosopher_id):
+    quotes = get_philosopher_quotes(QUOTES, philosopher_id)
+    weights = PHILOSOPHERS[philosopher_id]["weight_categories"]
+    index = QuoteIndex(quotes)
+
+    for context, keywords, category in sample_queries(quotes, 150, philosopher_id):
+        expected = select_best_quote(quotes, context, keywords, category, weights)
+        found = index.select_best_quote(context, keywords, category, weights)
+        if expected is None:
+            assert found is None
+        else:
+            assert found["quoteId"] == expected["quoteId"]
+            assert found["relevance_score"] == expected["relevance_score"]
+
+
+def test_matching_terms_weights_exact_and_substring_matches():
+    index = QuoteIndex([
+        {"quoteId": 1, "quote": "", "keywords": ["vertu", "vertueux"], "categoryName": "Ethics"},
+        {"quoteId": 2, "quote": "", "keywords": ["ver", "liberté"], "categoryName": "Freedom"}
+    ])
+    terms = {index.terms[t]: w for t, w in index.matching_terms("vertu").items()}
+    assert terms == {"vertu": 2, "vertueux": 1, "ver": 1}
+    assert {index.terms[t] for t in index.matching_terms("e")} == {"vertu", "vertueux", "ver", "liberté"}
+
+
+def test_quotes_with_text_finds_substrings_of_any_length():
+    texts = ["Le bonheur est ici", "Rien n'est perdu", "connais-toi toi-même"]
+    index = QuoteIndex([
+        {"quoteId": i, "quote": text, "keywords": [], "categoryName": "X"}
+        for i, text in enumerate(texts)
+    ])
+    for word in ("bonheur", "est", "onh", "toi-m", "n'es", "ie", "r e", "ur est", "absent"):
+        expected = {i for i, text in enumerate(texts) if word in text.lower()}
+        assert index.quotes_with_text(word) == expected, word
+
+
+def test_empty_index_has_no_best_quote():
+    assert QuoteIndex([]).select_best_quote("le bonheur", ["vertu"], None) is None
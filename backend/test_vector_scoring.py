@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from config import PHILOSOPHERS, QUOTES_JSON
+from quote_index import QuoteIndex
+from utils import load_json_file, get_philosopher_quotes, select_best_quote
+from vector_scoring import NUMPY_AVAILABLE, VectorizedScorer
+
+pytestmark = pytest.mark.skipif(not NUMPY_AVAILABLE, reason="NumPy non installé")
+
+QUOTES = load_json_file(QUOTES_JSON)
+
+
+def sample_queries(quotes, count, seed):
+    rng = random.Random(seed)
+    words = [w for q in quotes for w in q["quote"].lower().split()] + ["ab", "é"]
+    keywords = [k for q in quotes for k in q.get("keywords", [])] + ["a", "zzz"]
+    categories = sorted({q["categoryName"] for q in quotes}) + [None, "dom"]
+    return [(None, [], None)] + [
+        (
+            " ".join(rng.sample(words, rng.randint(0, 6))) or None,
+            rng.sample(keywords, rng.randint(0, 4)),
+            rng.choice(categories)
+        )
+        for _ in range(count)
+    ]
+
+
+@pytest.mark.parametrize("philosopher_id", sorted(PHILOSOPHERS))
+def test_batch_selects_the_same_quotes_as_the_linear_scan(philosopher_id):
+    quotes = get_philosopher_quotes(QUOTES, philosopher_id)
+    weights = PHILOSOPHERS[philosopher_id]["weight_categories"]
+    scorer = VectorizedScorer(quotes, QuoteIndex(quotes))
+    queries = sample_queries(quotes, 100, philosopher_id)
+
+    for (context, keywords, category), found in zip(queries, scorer.select_best_quotes(queries, weights)):
+        expected = select_best_quote(quotes, context, keywords, category, weights)
+        if expected is None:
+            assert found is None
+        else:
+            assert found["quoteId"] == expected["quoteId"]
+            assert found["relevance_score"] == expected["relevance_score"]
+
+
+def test_single_request_matches_its_batch_row():
+    quotes = get_philosopher_quotes(QUOTES, 1)
+    scorer = VectorizedScorer(quotes)
+    queries = sample_queries(quotes, 20, 7)
+    batch = scorer.select_best_quotes(queries)
+    assert [scorer.select_best_quote(*query) for query in queries] == batch
+
+
+def test_empty_corpus():
+    assert VectorizedScorer([]).select_best_quotes([("le bonheur", ["vertu"], None)]) == [None]
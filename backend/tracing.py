@@ -0,0 +1,207 @@
+import contextvars
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from config import TRACING_ENABLED, TRACE_HISTORY_SIZE
+
+COORDINATOR_PROCESS = "Coordinateur"
+
+# (SpanRecorder, span) courant dans le thread ou la tâche asyncio
+_active_span = contextvars.ContextVar("active_span", default=None)
+
+
+def new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class SpanRecorder:
+    """Collecte les spans d'une trace produits dans un processus (coordinateur ou nœud)"""
+
+    def __init__(
+        self,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        process: str = COORDINATOR_PROCESS,
+        process_id: int = 0
+    ):
+        self.trace_id = trace_id
+        self.parent_id = parent_id
+        self.process = process
+        self.process_id = process_id
+        self.spans: List[Dict] = []
+
+    @contextmanager
+    def span(self, name: str, parent_id: Optional[str] = None, **attributes) -> Iterator[Dict]:
+        record = {
+            "name": name,
+            "trace_id": self.trace_id,
+            "span_id": new_id(),
+            "parent_id": parent_id or self.parent_id,
+            "process": self.process,
+            "process_id": self.process_id,
+            "thread_id": threading.get_ident(),
+            "start": time.time(),
+            "duration": 0.0,
+            "attributes": attributes
+        }
+        token = _active_span.set((self, record))
+        started = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record["attributes"]["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            record["duration"] = time.perf_counter() - started
+            _active_span.reset(token)
+            self.spans.append(record)
+
+
+@contextmanager
+def trace_span(name: str, **attributes) -> Iterator[Optional[Dict]]:
+    """Span enfant du span courant, sans effet hors d'une trace"""
+    active = _active_span.get()
+    if active is None:
+        yield None
+        return
+
+    recorder, parent = active
+    with recorder.span(name, parent["span_id"], **attributes) as record:
+        yield record
+
+
+def annotate(**attributes):
+    """Ajoute des attributs au span courant"""
+    active = _active_span.get()
+    if active is not None:
+        active[1]["attributes"].update(attributes)
+
+
+def current_context() -> Optional[Dict[str, str]]:
+    """Contexte à propager dans un message REQUEST"""
+    active = _active_span.get()
+    if active is None:
+        return None
+    recorder, span = active
+    return {"trace_id": recorder.trace_id, "parent_id": span["span_id"]}
+
+
+def current_trace_id() -> Optional[str]:
+    active = _active_span.get()
+    return active[0].trace_id if active else None
+
+
+class Tracer:
+    """Traces récentes du coordinateur, enrichies des spans renvoyés par les nœuds"""
+
+    def __init__(self, max_traces: int = TRACE_HISTORY_SIZE, enabled: bool = TRACING_ENABLED):
+        self.max_traces = max_traces
+        self.enabled = enabled
+        self._traces: "OrderedDict[str, SpanRecorder]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def trace(self, name: str, **attributes) -> Iterator[Optional[Dict]]:
+        """Ouvre une nouvelle trace dont `name` est le span racine"""
+        if not self.enabled:
+            yield None
+            return
+
+        recorder = SpanRecorder(new_id())
+        with self._lock:
+            self._traces[recorder.trace_id] = recorder
+            while len(self._traces) > self.max_traces:
+                self._traces.popitem(last=False)
+
+        with recorder.span(name, **attributes) as root:
+            yield root
+
+    def add_spans(self, spans: Optional[List[Dict]]):
+        """Rattache des spans distants (nœuds) à leur trace si elle est encore conservée"""
+        for span in spans or []:
+            with self._lock:
+                recorder = self._traces.get(span.get("trace_id"))
+            if recorder is not None:
+                recorder.spans.append(span)
+
+    def get_spans(self, trace_id: str) -> Optional[List[Dict]]:
+        with self._lock:
+            recorder = self._traces.get(trace_id)
+        if recorder is None:
+            return None
+        return sorted(recorder.spans, key=lambda span: span["start"])
+
+    def list_traces(self, limit: int = 50) -> List[Dict]:
+        with self._lock:
+            recorders = list(self._traces.values())[-limit:]
+
+        summaries = []
+        for recorder in reversed(recorders):
+            spans = list(recorder.spans)
+            root = next((span for span in spans if span["parent_id"] is None), None)
+            summaries.append({
+                "trace_id": recorder.trace_id,
+                "name": root["name"] if root else None,
+                "start": root["start"] if root else None,
+                "duration": round(root["duration"], 6) if root else None,
+                "complete": root is not None,
+                "spans": len(spans),
+                "processes": sorted({span["process"] for span in spans}),
+                "attributes": root["attributes"] if root else {}
+            })
+        return summaries
+
+    def export_chrome(self, trace_id: str) -> Optional[Dict]:
+        """Trace au format Chrome trace-event (chrome://tracing, Perfetto)"""
+        spans = self.get_spans(trace_id)
+        if spans is None:
+            return None
+
+        events = []
+        processes: Dict[int, str] = {}
+        threads: Dict[tuple, int] = {}
+        for span in spans:
+            pid = span["process_id"]
+            processes.setdefault(pid, span["process"])
+            tid = threads.setdefault((pid, span["thread_id"]), len(threads) + 1)
+            events.append({
+                "name": span["name"],
+                "cat": span["process"],
+                "ph": "X",
+                "ts": round(span["start"] * 1_000_000, 3),
+                "dur": round(span["duration"] * 1_000_000, 3),
+                "pid": pid,
+                "tid": tid,
+                "args": {
+                    "span_id": span["span_id"],
+                    "parent_id": span["parent_id"],
+                    **span["attributes"]
+                }
+            })
+
+        for pid, name in processes.items():
+            events.append({
+                "name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                "args": {"name": name}
+            })
+            events.append({
+                "name": "process_sort_index", "ph": "M", "pid": pid, "tid": 0,
+                "args": {"sort_index": pid}
+            })
+
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"trace_id": trace_id}
+        }
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+
+tracer = Tracer()
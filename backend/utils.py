@@ -1,4 +1,5 @@
 import json
+import hashlib
 import logging
 from typing import List, Dict, Any, Optional
 
@@ -100,6 +101,19 @@ def calculate_relevance_score(
     category_score = calculate_category_match(quote, category_name)
     context_score = calculate_context_match(quote, context)
     
+    return combine_scores(
+        keyword_score, category_score, context_score,
+        category_name, philosopher_weights
+    )
+
+
+def combine_scores(
+    keyword_score: float,
+    category_score: float,
+    context_score: float,
+    category_name: Optional[str],
+    philosopher_weights: Optional[Dict[str, float]] = None
+) -> float:
     weights = {
         "keywords": 0.4,
         "category": 0.4,
@@ -159,6 +173,22 @@ def format_request_message(
     return json.dumps(message)
 
 
+def request_fingerprint(
+    context: Optional[str],
+    keywords: List[str],
+    category_name: Optional[str]
+) -> str:
+    """Empreinte normalisée d'une requête: deux requêtes de même empreinte ont les mêmes scores"""
+    normalized = [
+        " ".join((context or "").lower().split()),
+        sorted(k.lower() for k in keywords),
+        category_name or ""
+    ]
+    return hashlib.sha1(
+        json.dumps(normalized, ensure_ascii=False).encode('utf-8')
+    ).hexdigest()
+
+
 def format_response_message(
     philosopher_id: int,
     philosopher_name: str,
@@ -167,6 +197,19 @@ def format_response_message(
     vote: str,
     reasoning: str = ""
 ) -> str:
+    return json.dumps(build_response_message(
+        philosopher_id, philosopher_name, quote, score, vote, reasoning
+    ))
+
+
+def build_response_message(
+    philosopher_id: int,
+    philosopher_name: str,
+    quote: Dict,
+    score: float,
+    vote: str,
+    reasoning: str = ""
+) -> Dict:
     message = {
         "type": "RESPONSE",
         "philosopher_id": philosopher_id,
@@ -183,7 +226,7 @@ def format_response_message(
         "vote": vote,
         "reasoning": reasoning
     }
-    return json.dumps(message)
+    return message
 
 
 def parse_message(message_str: str) -> Optional[Dict]:
@@ -195,6 +238,14 @@ def parse_message(message_str: str) -> Optional[Dict]:
         return None
 
 
+def merge_timings(response: Dict, **phases: float) -> Dict:
+    """Ajoute des phases (en secondes) au dictionnaire "timings" d'une réponse de nœud"""
+    timings = dict(response.get("timings") or {})
+    timings.update(phases)
+    response["timings"] = {phase: round(value, 6) for phase, value in timings.items()}
+    return response
+
+
 def determine_vote(score: float, accept_threshold: float = 5.0) -> str:
     return "Accept" if score >= accept_threshold else "Reject"
 
@@ -0,0 +1,177 @@
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from utils import calculate_category_match
+from quote_index import QuoteIndex
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+ScoringRequest = Tuple[Optional[str], List[str], Optional[str]]
+
+
+class VectorizedScorer:
+    """
+    Moteur de scoring NumPy: le corpus est encodé en tableaux au chargement
+    (incidence terme x citation au format COO, identifiants de catégorie) et
+    toutes les citations d'une ou plusieurs requêtes sont scorées d'un coup.
+    """
+
+    def __init__(self, quotes: List[Dict], index: Optional[QuoteIndex] = None):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("NumPy n'est pas installé")
+
+        self.quotes = quotes
+        self.index = index or QuoteIndex(quotes)
+        self.num_quotes = len(quotes)
+        self.num_terms = len(self.index.terms)
+
+        term_ids, quote_ids, counts = [], [], []
+        for term_id, postings in enumerate(self.index.postings):
+            for quote_idx, count in postings.items():
+                term_ids.append(term_id)
+                quote_ids.append(quote_idx)
+                counts.append(count)
+
+        self.post_terms = np.array(term_ids, dtype=np.int64)
+        self.post_quotes = np.array(quote_ids, dtype=np.int64)
+        self.post_counts = np.array(counts, dtype=np.float64)
+        self.term_offsets = np.concatenate((
+            [0], np.cumsum([len(postings) for postings in self.index.postings])
+        )).astype(np.int64)
+
+        self.category_names = sorted(set(self.index.categories))
+        category_lookup = {name: i for i, name in enumerate(self.category_names)}
+        self.category_ids = np.array(
+            [category_lookup[name] for name in self.index.categories], dtype=np.int64
+        )
+        self._category_examples = [
+            quotes[self.index.categories.index(name)] for name in self.category_names
+        ]
+
+        logger.debug(
+            f"Moteur vectoriel: {self.num_quotes} citations, "
+            f"{self.num_terms} termes, {len(self.post_terms)} postings"
+        )
+
+    def _request_vectors(self, context: Optional[str], keywords: List[str]):
+        keyword_weights = np.zeros(self.num_terms)
+        for keyword, occurrences in Counter(k.lower() for k in keywords).items():
+            for term_id, weight in self.index.matching_terms(keyword).items():
+                keyword_weights[term_id] += weight * occurrences
+
+        context_words = context.lower().split() if context else []
+        context_weights = np.zeros(self.num_terms)
+        text_hits = np.zeros(self.num_quotes)
+        for word, occurrences in Counter(context_words).items():
+            if len(word) < 3:
+                continue
+            hits = list(self.index.quotes_with_text(word))
+            text_hits[hits] += occurrences
+            for term_id in self.index.matching_terms(word):
+                context_weights[term_id] += 0.5 * occurrences
+
+        return keyword_weights, context_weights, text_hits, len(context_words)
+
+    def _scatter(self, term_weights):
+        """Produit (B, T) x incidence (T, Q) via un bincount sur les postings actifs"""
+        batch = term_weights.shape[0]
+        active = np.flatnonzero(term_weights.any(axis=0))
+        starts = self.term_offsets[active]
+        lengths = self.term_offsets[active + 1] - starts
+        postings = np.arange(lengths.sum()) + np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+
+        values = term_weights[:, self.post_terms[postings]] * self.post_counts[postings]
+        flat_index = (np.arange(batch)[:, None] * self.num_quotes + self.post_quotes[postings]).ravel()
+        return np.bincount(
+            flat_index, weights=values.ravel(), minlength=batch * self.num_quotes
+        ).reshape(batch, self.num_quotes)
+
+    def score_batch(
+        self,
+        requests: List[ScoringRequest],
+        philosopher_weights: Optional[Dict[str, float]] = None
+    ):
+        """Matrice (B, Q) des scores non arrondis"""
+        batch = len(requests)
+        keyword_weights = np.zeros((batch, self.num_terms))
+        context_weights = np.zeros((batch, self.num_terms))
+        text_hits = np.zeros((batch, self.num_quotes))
+        context_lengths = np.zeros(batch)
+        keyword_lengths = np.zeros(batch)
+        category_scores = np.zeros((batch, len(self.category_names)))
+        boosts = np.ones(batch)
+
+        for b, (context, keywords, category_name) in enumerate(requests):
+            (keyword_weights[b], context_weights[b],
+             text_hits[b], context_lengths[b]) = self._request_vectors(context, keywords)
+            keyword_lengths[b] = len(keywords)
+            category_scores[b] = [
+                calculate_category_match(example, category_name)
+                for example in self._category_examples
+            ]
+            if philosopher_weights and category_name:
+                boosts[b] = philosopher_weights.get(category_name, 1.0)
+
+        keyword_matches = self._scatter(keyword_weights)
+        context_matches = self._scatter(context_weights) + text_hits
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            keyword_scores = np.where(
+                keyword_lengths[:, None] > 0,
+                np.minimum(keyword_matches / (keyword_lengths[:, None] * 2) * 10, 10.0),
+                5.0
+            )
+            context_scores = np.where(
+                context_lengths[:, None] > 0,
+                np.minimum(context_matches / context_lengths[:, None] * 10, 10.0),
+                5.0
+            )
+
+        quote_category_scores = category_scores[:, self.category_ids] * boosts[:, None]
+
+        return (
+            keyword_scores * 0.4 +
+            quote_category_scores * 0.4 +
+            context_scores * 0.2
+        )
+
+    def select_best_quotes(
+        self,
+        requests: List[ScoringRequest],
+        philosopher_weights: Optional[Dict[str, float]] = None
+    ) -> List[Optional[Dict]]:
+        if not self.quotes:
+            return [None] * len(requests)
+
+        raw_scores = self.score_batch(requests, philosopher_weights)
+        best = np.argmax(np.round(raw_scores, 2), axis=1)
+
+        results = []
+        for b, quote_idx in enumerate(best):
+            score = round(float(raw_scores[b, quote_idx]), 2)
+            if score <= 0.0:
+                results.append(None)
+                continue
+            best_quote = self.quotes[quote_idx].copy()
+            best_quote["relevance_score"] = score
+            results.append(best_quote)
+        return results
+
+    def select_best_quote(
+        self,
+        context: Optional[str],
+        keywords: List[str],
+        category_name: Optional[str],
+        philosopher_weights: Optional[Dict[str, float]] = None
+    ) -> Optional[Dict]:
+        return self.select_best_quotes(
+            [(context, keywords, category_name)], philosopher_weights
+        )[0]
@@ -6,8 +6,9 @@
     logs: [],
     recordedProcesses: [],
     capturedStates: [],
-    lastRecommendationTimestamp: 0,
+    lastRecommendationSeq: 0,
     isCapturing: false,
+    pollTimers: [],
     };
 
     const philosopherImages = {
@@ -42,9 +43,7 @@
         .getElementById("captureBtn")
         .addEventListener("click", captureCurrentState);
 
-    setInterval(updateStatus, 2000);
-
-    setInterval(checkForNewRecommendations, 1000);
+    connectEvents();
 
     addLog(
         "REQUEST",
@@ -124,60 +123,118 @@
     }
     }
 
+    function connectEvents() {
+    // Flux SSE du coordinateur; le polling ne sert que si le flux est indisponible
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+
+    const source = new EventSource(
+        `${API_BASE}/events?types=recommendation,node_status`
+    );
+
+    source.addEventListener("open", () => {
+        stopPolling();
+        updateStatus();
+        checkForNewRecommendations();
+    });
+    source.addEventListener("error", () => {
+        setOffline();
+        startPolling();
+    });
+    source.addEventListener("recommendation", (event) => {
+        handleRecommendation(JSON.parse(event.data));
+    });
+    source.addEventListener("node_status", (event) => {
+        applyStatus(JSON.parse(event.data));
+    });
+    source.addEventListener("overflow", () => {
+        updateStatus();
+        checkForNewRecommendations();
+    });
+    }
+
+    function startPolling() {
+    if (state.pollTimers.length > 0) return;
+    state.pollTimers = [
+        setInterval(updateStatus, 2000),
+        setInterval(checkForNewRecommendations, 1000),
+    ];
+    }
+
+    function stopPolling() {
+    state.pollTimers.forEach(clearInterval);
+    state.pollTimers = [];
+    }
+
     async function updateStatus() {
     try {
         const response = await fetch(`${API_BASE}/status`);
-        const data = await response.json();
+        applyStatus(await response.json());
+    } catch (error) {
+        setOffline();
+    }
+    }
 
-        document.getElementById("systemStatus").className = "status-dot online";
-        document.getElementById("statusText").textContent = "Système en ligne";
-        document.getElementById(
+    function applyStatus(data) {
+    document.getElementById("systemStatus").className = "status-dot online";
+    document.getElementById("statusText").textContent = "Système en ligne";
+    document.getElementById(
         "activeNodes"
-        ).textContent = `${data.active_nodes}/${data.total_nodes}`;
+    ).textContent = `${data.active_nodes}/${data.total_nodes}`;
 
-        updatePhilosophers(data.philosophers);
-    } catch (error) {
-        document.getElementById("systemStatus").className = "status-dot offline";
-        document.getElementById("statusText").textContent = "Système hors ligne";
+    updatePhilosophers(data.philosophers);
     }
+
+    function setOffline() {
+    document.getElementById("systemStatus").className = "status-dot offline";
+    document.getElementById("statusText").textContent = "Système hors ligne";
     }
 
     async function checkForNewRecommendations() {
+    // Curseur: seules les entrées postérieures à la dernière vue sont renvoyées
     try {
-        const response = await fetch(`${API_BASE}/recommendations?limit=1`);
+        const response = await fetch(
+        `${API_BASE}/recommendations?since=${state.lastRecommendationSeq}&limit=10`
+        );
         const data = await response.json();
 
         if (data.recommendations && data.recommendations.length > 0) {
-        const latest = data.recommendations[0];
-
-        if (latest.timestamp > state.lastRecommendationTimestamp) {
-            state.lastRecommendationTimestamp = latest.timestamp;
-
-            state.recordedProcesses.unshift(latest);
-            if (state.recordedProcesses.length > 10) {
-            state.recordedProcesses.pop();
-            }
-
-            addLog(
-            "REQUEST",
-            "Nouveau processus détecté",
-            "Enregistrement automatique en cours..."
-            );
-            displayRecommendationProcess(latest);
-        }
+        handleRecommendation(
+            data.recommendations[data.recommendations.length - 1]
+        );
         }
+        state.lastRecommendationSeq = data.cursor;
     } catch (error) {
         console.error("Error checking recommendations:", error);
     }
     }
 
+    function handleRecommendation(latest) {
+    if (latest.seq <= state.lastRecommendationSeq) return;
+    state.lastRecommendationSeq = latest.seq;
+
+    state.recordedProcesses.unshift(latest);
+    if (state.recordedProcesses.length > 10) {
+        state.recordedProcesses.pop();
+    }
+
+    addLog(
+        "REQUEST",
+        "Nouveau processus détecté",
+        "Enregistrement automatique en cours..."
+    );
+    displayRecommendationProcess(latest);
+    }
+
     async function loadRecentRecommendations() {
     try {
         const response = await fetch(`${API_BASE}/recommendations?limit=10`);
         const data = await response.json();
 
+        state.lastRecommendationSeq = data.cursor;
         if (data.recommendations && data.recommendations.length > 0) {
-        state.lastRecommendationTimestamp = data.recommendations[0].timestamp;
         state.recordedProcesses = data.recommendations;
 
         displayRecommendationProcess(data.recommendations[0]);
@@ -340,6 +340,43 @@ const API_BASE = 'http://127.0.0.1:8000';
             status.className = 'status' + (isError ? ' error' : '');
         }
 
+        let pollTimer = null;
+        let refreshTimer = null;
+
+        function scheduleRefresh() {
+            // Regroupe les recommandations rapprochées en un seul rechargement
+            if (refreshTimer) return;
+            refreshTimer = setTimeout(() => {
+                refreshTimer = null;
+                refreshData();
+            }, 1000);
+        }
+
+        function startPolling() {
+            if (!pollTimer) pollTimer = setInterval(refreshData, 5000);
+        }
+
+        function stopPolling() {
+            clearInterval(pollTimer);
+            pollTimer = null;
+        }
+
+        function connectEvents() {
+            if (!window.EventSource) {
+                startPolling();
+                return;
+            }
+
+            const source = new EventSource(`${API_BASE}/events?types=recommendation`);
+            source.addEventListener('open', () => {
+                stopPolling();
+                scheduleRefresh();
+            });
+            source.addEventListener('error', startPolling);
+            source.addEventListener('recommendation', scheduleRefresh);
+            source.addEventListener('overflow', scheduleRefresh);
+        }
+
         initCharts();
         refreshData();
-        setInterval(refreshData, 5000);
\ No newline at end of file
+        connectEvents();
\ No newline at end of file